@@ -1,4 +1,5 @@
 from django.contrib import admin
+from django.db.models import Exists, OuterRef
 from django.utils.html import format_html
 from .models import UserProfile, Application, NewsArticle, BlogPost
 
@@ -15,17 +16,19 @@ class ApplicationAdmin(admin.ModelAdmin):
     search_fields = ['confirmation_number', 'first_name', 'last_name', 'email', 'national_id_number']
     readonly_fields = ['confirmation_number', 'created_at', 'updated_at', 'payment_proof_hash', 'duplicate_receipt_check']
     
+    def get_queryset(self, request):
+        # Checked for the whole changelist page in the same query
+        duplicates = Application.objects.filter(
+            payment_proof_hash=OuterRef('payment_proof_hash')
+        ).exclude(pk=OuterRef('pk'))
+        return super().get_queryset(request).annotate(has_duplicate_receipt=Exists(duplicates))
+    
     def payment_duplicate_warning(self, obj):
         """Show warning icon if payment receipt is duplicated"""
-        if obj.payment_proof_hash:
-            duplicate_count = Application.objects.filter(
-                payment_proof_hash=obj.payment_proof_hash
-            ).exclude(pk=obj.pk).count()
-            
-            if duplicate_count > 0:
-                return format_html(
-                    '<span style="color: red; font-weight: bold;">⚠️ DUPLICATE</span>'
-                )
+        if obj.payment_proof_hash and obj.has_duplicate_receipt:
+            return format_html(
+                '<span style="color: red; font-weight: bold;">⚠️ DUPLICATE</span>'
+            )
         return '✓'
     payment_duplicate_warning.short_description = 'Payment Check'
     
@@ -76,6 +79,10 @@ class ApplicationAdmin(admin.ModelAdmin):
             'fields': ('created_at', 'updated_at')
         }),
     )
+    
+    def save_model(self, request, obj, form, change):
+        obj.event_actor = request.user
+        super().save_model(request, obj, form, change)
 
 
 
@@ -0,0 +1,270 @@
+"""
+Async views for endpoints that mostly wait on Paystack or SMTP
+
+Under the ASGI worker (see Procfile) these run on the event loop, so a
+request waiting on an outbound call does not hold a worker and many payment
+callbacks can be in flight per process. Database work runs in the sync
+thread through Django's async ORM wrappers.
+
+DRF 3.14 cannot run async views, so ``async_api_view`` provides the parts of
+``@api_view`` these endpoints need: method check, JSON object body parsing,
+session authentication and DRF throttles, with errors in the
+``{'error': ...}`` shape the frontend reads.
+"""
+import functools
+import json
+import logging
+from collections.abc import Mapping
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import User
+from django.contrib.auth.tokens import default_token_generator
+from django.http import JsonResponse
+from django.utils import timezone
+from django.utils.encoding import force_bytes
+from django.utils.http import urlsafe_base64_encode
+from decouple import config
+from immigration_portal.replicas import use_primary
+
+from .mail import asend_mail
+from .models import Application
+from .serializers import ApplicationSerializer
+from .throttles import PasswordResetAccountThrottle, PasswordResetIPThrottle
+
+logger = logging.getLogger(__name__)
+
+
+def _error(message, status, **extra):
+    return JsonResponse({'error': message, 'detail': message, **extra}, status=status)
+
+
+def _parse_body(request):
+    if request.method in ('GET', 'HEAD'):
+        return {}
+    if request.content_type == 'application/json':
+        return json.loads(request.body or b'{}')
+    return request.POST
+
+
+def _load_user(request):
+    # Resolves the lazy request.user (a database query) outside the event loop
+    user = request.user
+    user.is_authenticated
+    return user
+
+
+def _throttle_wait(request, throttle_classes):
+    """Seconds to wait if a throttle rejects the request, else None"""
+    for throttle_class in throttle_classes:
+        throttle = throttle_class()
+        if not throttle.allow_request(request, None):
+            return throttle.wait() or 0
+    return None
+
+
+def async_api_view(methods, authenticated=True, throttle_classes=()):
+    """Minimal async counterpart of DRF's ``@api_view`` (session auth, CSRF exempt like the DRF views)"""
+    def decorator(view):
+        @functools.wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            if request.method not in methods:
+                return _error(f'Method "{request.method}" not allowed.', 405)
+            try:
+                request.data = _parse_body(request)
+            except ValueError:
+                return _error('JSON parse error', 400)
+            if not isinstance(request.data, Mapping):
+                return _error('Expected a JSON object', 400)
+            request.query_params = request.GET
+
+            if authenticated:
+                user = await sync_to_async(_load_user)(request)
+                if not user.is_authenticated:
+                    return _error('Authentication credentials were not provided.', 403)
+
+            if throttle_classes:
+                wait = await sync_to_async(_throttle_wait)(request, throttle_classes)
+                if wait is not None:
+                    response = _error(f'Request was throttled. Expected available in {int(wait)} seconds.', 429)
+                    response['Retry-After'] = str(int(wait))
+                    return response
+
+            return await view(request, *args, **kwargs)
+
+        wrapper.csrf_exempt = True
+        return wrapper
+    return decorator
+
+
+# Password Reset Views
+@async_api_view(['POST'], authenticated=False, throttle_classes=[PasswordResetIPThrottle, PasswordResetAccountThrottle])
+async def password_reset_request(request):
+    """Request password reset - send email with reset link"""
+    email = request.data.get('email')
+    if not email:
+        return _error('Email is required', 400)
+
+    user = await User.objects.filter(email=email).afirst()
+    if user is None:
+        logger.warning(f"Password reset requested for non-existent email: {email}")
+        # For security, don't reveal if email exists or not
+        return JsonResponse({'success': True, 'message': 'If an account exists with this email, you will receive password reset instructions.'})
+
+    # Generate token
+    token = default_token_generator.make_token(user)
+    uid = urlsafe_base64_encode(force_bytes(user.pk))
+
+    # Create reset link
+    frontend_url = config('FRONTEND_URL', default='http://localhost:3000')
+    reset_link = f"{frontend_url}/reset-password?token={uid}-{token}"
+
+    # Send email
+    try:
+        logger.info(f"Attempting to send password reset email to: {email}")
+
+        result = await asend_mail(
+            subject='Password Reset Request - South Sudan Immigration Portal',
+            message=f'''
+Hello {user.first_name},
+
+You have requested to reset your password for the South Sudan Immigration Portal.
+
+Click the link below to reset your password:
+{reset_link}
+
+This link will expire in 24 hours.
+
+If you did not request this password reset, please ignore this email.
+
+Best regards,
+South Sudan Immigration Portal Team
+            ''',
+            from_email=config('EMAIL_HOST_USER', default='noreply@immigration.gov.ss'),
+            recipient_list=[email],
+            kind='password_reset',
+        )
+
+        logger.info(f"Email send result: {result}")
+
+        if result == 0:
+            logger.error("Email failed to send (result = 0)")
+            return _error('Failed to send email. Please contact support.', 500)
+
+    except Exception as e:
+        logger.exception(f"Error sending password reset email to {email}: {str(e)}")
+        return _error(f'Failed to send email: {str(e)}', 500)
+
+    return JsonResponse({'success': True, 'message': 'Password reset instructions have been sent to your email.'})
+
+
+# Payment Views
+@async_api_view(['POST'])
+async def initialize_payment(request):
+    """Initialize Paystack payment for an application"""
+    try:
+        application_id = request.data.get('application_id')
+
+        if not application_id:
+            return _error('Application ID is required', 400)
+
+        # Get the application
+        try:
+            application = await Application.objects.aget(id=application_id, user=request.user)
+        except Application.DoesNotExist:
+            return _error('Application not found', 404)
+
+        # Check if payment is already completed
+        if application.payment_status == 'completed':
+            return _error('Payment already completed for this application', 400)
+
+        # Determine payment amount based on application type
+        amount_map = {
+            'passport-first': 50000,  # 500 SSP or NGN
+            'passport-replacement': 30000,  # 300 SSP or NGN
+            'nationalid-first': 20000,  # 200 SSP or NGN
+            'nationalid-replacement': 15000,  # 150 SSP or NGN
+        }
+
+        amount = amount_map.get(application.application_type, 50000)
+
+        # Generate unique reference
+        reference = f"PAY-{application.confirmation_number}-{int(timezone.now().timestamp())}"
+
+        # Initialize payment with Paystack (imported here: httpx/requests are
+        # not needed by any other endpoint)
+        from .payment_service import PaystackService
+        paystack = PaystackService()
+        callback_url = request.data.get('callback_url', 'http://localhost:5173/payment/verify')
+
+        result = await paystack.ainitialize_transaction(
+            email=application.email,
+            amount=amount,
+            reference=reference,
+            callback_url=callback_url
+        )
+
+        if result.get('status'):
+            # Update application with payment reference
+            application.payment_reference = reference
+            application.payment_amount = amount / 100  # Convert from kobo
+            application.payment_method = 'credit_card'
+            application.event_actor = request.user
+            await sync_to_async(application.save)()
+
+            return JsonResponse({
+                'success': True,
+                'authorization_url': result['data']['authorization_url'],
+                'access_code': result['data']['access_code'],
+                'reference': reference
+            })
+        else:
+            return _error(result.get('message', 'Payment initialization failed'), 400)
+
+    except Exception as e:
+        return _error(f'Payment initialization failed: {str(e)}', 500)
+
+
+@async_api_view(['GET'])
+@use_primary  # a GET that writes: read the application from the primary
+async def verify_payment(request):
+    """Verify Paystack payment"""
+    try:
+        reference = request.query_params.get('reference')
+
+        if not reference:
+            return _error('Payment reference is required', 400)
+
+        # Verify payment with Paystack
+        from .payment_service import PaystackService
+        paystack = PaystackService()
+        result = await paystack.averify_transaction(reference)
+
+        if result.get('status') and result.get('data', {}).get('status') == 'success':
+            # Find the application
+            try:
+                application = await Application.objects.aget(payment_reference=reference)
+            except Application.DoesNotExist:
+                return _error('Application not found for this payment', 404)
+
+            # Update application payment status
+            application.payment_status = 'completed'
+            application.payment_date = timezone.now()
+            application.payment_verified_at = timezone.now()
+            application.event_actor = request.user
+            await sync_to_async(application.save)()
+
+            data = await sync_to_async(lambda: ApplicationSerializer(application).data)()
+            return JsonResponse({
+                'success': True,
+                'message': 'Payment verified successfully',
+                'application': data
+            })
+        else:
+            return JsonResponse({
+                'success': False,
+                'message': 'Payment verification failed',
+                'details': result.get('message', 'Unknown error')
+            }, status=400)
+
+    except Exception as e:
+        return _error(f'Payment verification failed: {str(e)}', 500)
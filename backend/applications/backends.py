@@ -0,0 +1,79 @@
+"""
+Authentication backends
+"""
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.core.exceptions import PermissionDenied
+from django.db.models import Q
+from django.db.models.functions import Lower
+
+UserModel = get_user_model()
+
+
+class ProfileModelBackend(ModelBackend):
+    """
+    ModelBackend that loads users together with their profile
+
+    ``request.user.profile.role`` is read by almost every view; joining the
+    profile here turns the user + profile lookups into a single query, and
+    because the role is read fresh on every request it can never go stale
+    when a UserProfile is edited.
+
+    Logins accept a username or an email address (case-insensitive) and are
+    resolved with one query served by the username and ``lower(email)``
+    indexes.
+
+    ModelBackend stays listed after this backend so sessions created before
+    it was introduced remain valid. Rejected credentials raise
+    PermissionDenied so they are not checked again by ModelBackend.
+    """
+
+    def get_login_user(self, identifier):
+        """
+        Find the user for a username or email address
+
+        An email address that matches no account falls back to its local part
+        as a username, as the login form always has.
+        """
+        identifier = (identifier or '').strip()
+        if not identifier:
+            return None
+
+        users = UserModel._default_manager.select_related('profile')
+        if '@' in identifier:
+            email = identifier.lower()
+            match = Q(email_lower=email) | Q(username=identifier.split('@')[0])
+            users = users.annotate(email_lower=Lower('email'))
+        else:
+            email = None
+            match = Q(username=identifier)
+
+        candidates = list(users.filter(match)[:10])
+        for user in candidates:
+            # An email match wins over a username match
+            if email and user.email_lower == email:
+                return user
+        return candidates[0] if candidates else None
+
+    def authenticate(self, request, username=None, password=None, **kwargs):
+        if username is None:
+            username = kwargs.get(UserModel.USERNAME_FIELD)
+        if username is None or password is None:
+            return None
+
+        user = self.get_login_user(username)
+        if user is None:
+            # Run the password hasher anyway so response time does not reveal
+            # whether an account exists
+            UserModel().set_password(password)
+            raise PermissionDenied
+        if user.check_password(password) and self.user_can_authenticate(user):
+            return user
+        raise PermissionDenied
+
+    def get_user(self, user_id):
+        try:
+            user = UserModel._default_manager.select_related('profile').get(pk=user_id)
+        except UserModel.DoesNotExist:
+            return None
+        return user if self.user_can_authenticate(user) else None
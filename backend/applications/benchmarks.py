@@ -0,0 +1,99 @@
+"""
+Helpers shared by the benchmark_* management commands
+"""
+import math
+import statistics
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+
+@contextmanager
+def scratch_data():
+    """Run a block in a transaction that is always rolled back"""
+    with transaction.atomic():
+        yield
+        transaction.set_rollback(True)
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = max(0, math.ceil(pct / 100 * len(ordered)) - 1)
+    return ordered[index]
+
+
+def measure(func, iterations=100, warmup=5):
+    """
+    Call ``func`` repeatedly and collect timings and query counts
+
+    Returns:
+        dict: iterations, mean/p50/p95/max in milliseconds and queries per call
+    """
+    for _ in range(warmup):
+        func()
+
+    timings = []
+    with CaptureQueriesContext(connection) as queries:
+        for _ in range(iterations):
+            start = time.perf_counter()
+            func()
+            timings.append((time.perf_counter() - start) * 1000)
+
+    return {
+        'iterations': iterations,
+        'mean_ms': statistics.mean(timings),
+        'p50_ms': percentile(timings, 50),
+        'p95_ms': percentile(timings, 95),
+        'max_ms': max(timings),
+        'queries': len(queries) / iterations,
+    }
+
+
+def format_result(name, result):
+    return (
+        f"{name:<32} p50 {result['p50_ms']:9.4f} ms   p95 {result['p95_ms']:9.4f} ms   "
+        f"mean {result['mean_ms']:9.4f} ms   {result['queries']:.1f} queries"
+    )
+
+
+def peak_memory(func):
+    """
+    Call ``func`` once under tracemalloc
+
+    Returns:
+        tuple: (return value, peak bytes allocated during the call)
+    """
+    tracemalloc.start()
+    try:
+        result = func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, peak
+
+
+def regressions(results, baseline, metrics, max_regression):
+    """
+    Entries of ``results`` more than ``max_regression`` percent above ``baseline``
+
+    Both are ``{name: {metric: value}}``; names or metrics missing from either
+    side are skipped.
+
+    Returns:
+        list: (name, metric, baseline value, current value, change in percent)
+    """
+    found = []
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if not previous:
+            continue
+        for metric in metrics:
+            if metric not in current or not previous.get(metric):
+                continue
+            change = (current[metric] - previous[metric]) / previous[metric] * 100
+            if change > max_regression:
+                found.append((name, metric, previous[metric], current[metric], change))
+    return found
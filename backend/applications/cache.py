@@ -0,0 +1,207 @@
+"""
+Two-tier cache for computed API data
+
+Values are kept in a small per-process LRU in front of the shared Django
+cache (``CACHES['default']``: file-based locally, Redis in production), so a
+hot entry costs a dictionary lookup instead of a round trip.
+
+Entries carry tags. ``invalidate_tags()`` bumps the tag's version in the
+shared cache, which makes every shared entry stored under the old version
+stale at once, and drops the tag's entries from this process's LRU. Other
+processes may serve their local copy for up to ``CACHE_LOCAL_TIMEOUT``
+seconds, which bounds how stale a read can be. Signal handlers in
+signals.py invalidate tags when the underlying rows change.
+
+Keys are versioned twice: ``CACHES['default']['VERSION']`` (CACHE_VERSION)
+retires everything on a deploy, and the ``version`` argument retires one
+kind of entry when the shape of its data changes.
+"""
+import hashlib
+import itertools
+import threading
+import time
+from collections import Counter, OrderedDict, defaultdict
+
+from django.conf import settings
+from django.core.cache import cache as shared_cache
+from django.db import transaction
+
+# Tags
+NEWS_TAG = 'news'
+BLOG_TAG = 'blog'
+STATISTICS_TAG = 'application-statistics'
+
+
+def user_tag(user_id):
+    return f'user:{user_id}'
+
+
+class LocalLRU:
+    """Thread-safe LRU with a per-entry expiry"""
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # key -> (expires at, value, tag generations)
+        self._lock = threading.Lock()
+
+    def get(self, key, generations):
+        """Value for ``key`` if present, unexpired and stored under ``generations``"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None, False
+            expires_at, value, stored_generations = entry
+            if expires_at <= time.monotonic() or stored_generations != generations:
+                del self._entries[key]
+                return None, False
+            self._entries.move_to_end(key)
+            return value, True
+
+    def set(self, key, value, timeout, generations):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + timeout, value, generations)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class TagGenerations:
+    """
+    Local generation of each invalidated tag, for at most ``max_tags`` tags
+
+    Generations come from one counter. A tag that was dropped, or never
+    invalidated, reads as the highest generation dropped so far, which is at
+    least its own last one, so a local entry stored under an earlier
+    generation can never become valid again.
+    """
+
+    def __init__(self, max_tags):
+        self.max_tags = max_tags
+        self._generations = OrderedDict()  # tag -> generation, least recently bumped first
+        self._counter = itertools.count(1)
+        self._floor = 0
+        self._lock = threading.Lock()
+
+    def get(self, tags):
+        with self._lock:
+            return tuple(self._generations.get(tag, self._floor) for tag in tags)
+
+    def bump(self, tag):
+        with self._lock:
+            self._generations[tag] = next(self._counter)
+            self._generations.move_to_end(tag)
+            while len(self._generations) > self.max_tags:
+                _, generation = self._generations.popitem(last=False)
+                self._floor = max(self._floor, generation)
+
+    def __len__(self):
+        return len(self._generations)
+
+
+_local = LocalLRU(settings.CACHE_LOCAL_MAX_ENTRIES)
+
+# Bumped by invalidate_tags() so local entries of a tag die immediately;
+# bounded like the LRU, as user tags accumulate for every user seen
+_local_generations = TagGenerations(settings.CACHE_LOCAL_MAX_ENTRIES)
+
+_counters = defaultdict(Counter)
+_counters_lock = threading.Lock()
+
+
+def _count(name, outcome):
+    with _counters_lock:
+        _counters[name][outcome] += 1
+
+
+def _tag_key(tag):
+    return f'tag:{tag}'
+
+
+def make_key(name, key_parts=(), version=1):
+    """Cache key for ``name``; parts are hashed so any value is a safe key"""
+    digest = hashlib.sha256(repr(tuple(key_parts)).encode()).hexdigest()[:32]
+    return f'{name}:v{version}:{digest}'
+
+
+def get_or_set(name, compute, key_parts=(), tags=(), timeout=300, version=1):
+    """
+    Cached result of ``compute()``
+
+    Args:
+        name: Kind of entry; also the label hit/miss counters are kept under
+        compute: Callable returning a picklable value
+        key_parts: Values that select one entry of this kind (filters, host...)
+        tags: Tags that invalidate the entry
+        timeout: Seconds the entry lives in the shared cache
+        version: Bump when the shape of the computed data changes
+    """
+    key = make_key(name, key_parts, version)
+    tags = tuple(tags)
+    generations = _local_generations.get(tags)
+
+    value, found = _local.get(key, generations)
+    if found:
+        _count(name, 'local_hits')
+        return value
+    local_timeout = min(timeout, settings.CACHE_LOCAL_TIMEOUT)
+
+    tag_keys = [_tag_key(tag) for tag in tags]
+    stored = shared_cache.get_many([key, *tag_keys])
+    tag_versions = {tag: stored.get(_tag_key(tag)) for tag in tags}
+    entry = stored.get(key)
+    if entry is not None and None not in tag_versions.values() and entry['tags'] == tag_versions:
+        _count(name, 'shared_hits')
+        _local.set(key, entry['value'], local_timeout, generations)
+        return entry['value']
+
+    _count(name, 'misses')
+    for tag, tag_version in tag_versions.items():
+        if tag_version is None:
+            tag_versions[tag] = _init_tag(tag)
+    value = compute()
+    shared_cache.set(key, {'value': value, 'tags': tag_versions}, timeout)
+    _local.set(key, value, local_timeout, generations)
+    return value
+
+
+def _init_tag(tag):
+    # Start from the clock rather than 1 so an evicted tag cannot revive
+    # entries stored under one of its earlier versions
+    shared_cache.add(_tag_key(tag), time.time_ns(), None)
+    return shared_cache.get(_tag_key(tag))
+
+
+def invalidate_tags(*tags):
+    """Make every entry carrying one of ``tags`` stale"""
+    for tag in tags:
+        _local_generations.bump(tag)
+        try:
+            shared_cache.incr(_tag_key(tag))
+        except ValueError:
+            shared_cache.set(_tag_key(tag), time.time_ns(), None)
+        # Counted per tag family ('user', not 'user:42') to keep the counters bounded
+        _count(f"tag:{tag.split(':', 1)[0]}", 'invalidations')
+
+
+def invalidate_tags_on_commit(*tags):
+    """Invalidate once the current transaction commits (immediately outside one)"""
+    transaction.on_commit(lambda: invalidate_tags(*tags))
+
+
+def clear_local():
+    """Empty this process's LRU"""
+    _local.clear()
+
+
+def stats():
+    """Hit/miss counters of this process by entry name, invalidations by tag family"""
+    with _counters_lock:
+        counters = {name: dict(counter) for name, counter in _counters.items()}
+    return {'local_entries': len(_local), 'local_tags': len(_local_generations), 'counters': counters}
@@ -0,0 +1,208 @@
+"""
+Application event log
+
+Every status, payment and document change on an ``Application`` is written
+to ``ApplicationEvent`` in the same transaction as the change itself, with a
+single bulk INSERT per save. Events are only ever inserted.
+
+On PostgreSQL the event table is range-partitioned by month on
+``created_at``, so old months can be detached or archived without touching
+recent data and timeline queries only scan the partitions they need. Run
+``python manage.py create_event_partitions`` regularly (e.g. monthly from
+cron) to create partitions ahead of time; rows that arrive for a month with
+no partition land in the default partition and are moved out of it, with a
+warning, when that month's partition is created.
+"""
+import logging
+from datetime import date
+
+from django.db import connection as default_connection, transaction
+from django.utils import timezone
+
+from .uploads import DOCUMENT_FIELDS
+
+logger = logging.getLogger(__name__)
+
+EVENT_TABLE = 'applications_applicationevent'
+
+# Application field -> event kind
+TRACKED_FIELDS = {
+    'status': 'status',
+    'payment_status': 'payment',
+    'payment_method': 'payment',
+    'payment_reference': 'payment',
+    'payment_proof': 'document',
+    **{field: 'document' for field in DOCUMENT_FIELDS},
+}
+
+
+def _as_text(value):
+    if value is None or value == '':
+        return None
+    return str(getattr(value, 'name', value))
+
+
+def build_events(application, fields, previous, actor=None):
+    """
+    Events for the tracked fields of ``application`` that changed
+
+    Args:
+        application: Application after the change
+        fields: Names of the fields that may have changed
+        previous: Mapping of field name to its value before the change
+        actor: User responsible for the change, if known
+    """
+    from .models import ApplicationEvent
+
+    now = timezone.now()
+    events = []
+    for name in fields:
+        kind = TRACKED_FIELDS.get(name)
+        if kind is None:
+            continue
+        old_value = _as_text(previous.get(name))
+        new_value = _as_text(getattr(application, name))
+        if old_value == new_value:
+            continue
+        events.append(ApplicationEvent(
+            application_id=application.pk, actor=actor, kind=kind, field=name,
+            old_value=old_value, new_value=new_value, created_at=now,
+        ))
+    return events
+
+
+def record(events):
+    """Insert events in one statement"""
+    from .models import ApplicationEvent
+
+    if events:
+        ApplicationEvent.objects.bulk_create(events)
+    return events
+
+
+# Partitioning (PostgreSQL only)
+
+def _month_start(day, offset=0):
+    month = day.month - 1 + offset
+    return date(day.year + month // 12, month % 12 + 1, 1)
+
+
+def partition_name(month):
+    return f"{EVENT_TABLE}_{month:%Y_%m}"
+
+
+def _create_partition(cursor, name, month):
+    """
+    Create the partition for ``month``, moving its rows out of the default
+    partition
+
+    PostgreSQL refuses to create a partition while the default partition
+    holds rows in its range, so the default is detached while they move.
+    """
+    default = f"{EVENT_TABLE}_default"
+    bounds = [f"{month.isoformat()} 00:00:00+00", f"{_month_start(month, 1).isoformat()} 00:00:00+00"]
+    cursor.execute(
+        f'SELECT count(*) FROM "{default}" WHERE "created_at" >= %s AND "created_at" < %s', bounds
+    )
+    stranded = cursor.fetchone()[0]
+    if stranded:
+        cursor.execute(f'ALTER TABLE "{EVENT_TABLE}" DETACH PARTITION "{default}"')
+    cursor.execute(
+        f'CREATE TABLE "{name}" PARTITION OF "{EVENT_TABLE}" '
+        f"FOR VALUES FROM ('{bounds[0]}') TO ('{bounds[1]}')"
+    )
+    if stranded:
+        cursor.execute(
+            f'WITH moved AS (DELETE FROM "{default}" WHERE "created_at" >= %s AND "created_at" < %s RETURNING *) '
+            f'INSERT INTO "{name}" SELECT * FROM moved',
+            bounds,
+        )
+        cursor.execute(f'ALTER TABLE "{EVENT_TABLE}" ATTACH PARTITION "{default}" DEFAULT')
+        logger.warning(
+            f"Moved {stranded} events from the default partition to {name}; "
+            f"run create_event_partitions before each month starts"
+        )
+
+
+def ensure_partitions(months_ahead=3, since=None, connection=None):
+    """
+    Create monthly partitions from ``since`` (default: this month) up to
+    ``months_ahead`` months in the future
+
+    Events already in the default partition for a month that gets created
+    are moved into it.
+
+    Returns:
+        list: Names of the partitions that were created
+    """
+    connection = connection or default_connection
+    if connection.vendor != 'postgresql':
+        return []
+
+    first = _month_start(since or timezone.now().date())
+    last = _month_start(timezone.now().date(), months_ahead)
+    created = []
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT to_regclass(%s) IS NOT NULL", [f"{EVENT_TABLE}_default"])
+        if not cursor.fetchone()[0]:
+            cursor.execute(f'CREATE TABLE "{EVENT_TABLE}_default" PARTITION OF "{EVENT_TABLE}" DEFAULT')
+            created.append(f"{EVENT_TABLE}_default")
+
+        month = first
+        while month <= last:
+            name = partition_name(month)
+            cursor.execute("SELECT to_regclass(%s) IS NOT NULL", [name])
+            if not cursor.fetchone()[0]:
+                with transaction.atomic(using=connection.alias):
+                    _create_partition(cursor, name, month)
+                created.append(name)
+            month = _month_start(month, 1)
+
+    for name in created:
+        logger.info(f"Created event partition {name}")
+    return created
+
+
+def partition_event_table(connection):
+    """
+    Turn the table created by the initial migration into a partitioned one
+
+    Partitioned tables need the partition key in their primary key, which
+    Django cannot declare, so the table is rebuilt here with a primary key of
+    ``(id, created_at)`` and the indexes Django created are recreated on it.
+    Identity columns are not allowed on partitioned tables before
+    PostgreSQL 17, so ``id`` is a plain bigint filled from a sequence owned by
+    the column, which Django's sequence reset finds like its own.
+    """
+    if connection.vendor != 'postgresql':
+        return
+
+    old_table = f"{EVENT_TABLE}_unpartitioned"
+    sequence = f"{EVENT_TABLE}_id_seq"
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT indexname, indexdef FROM pg_indexes WHERE tablename = %s AND indexname NOT LIKE %s",
+            [EVENT_TABLE, '%_pkey'],
+        )
+        indexes = cursor.fetchall()
+
+        cursor.execute(f'ALTER TABLE "{EVENT_TABLE}" RENAME TO "{old_table}"')
+        cursor.execute(
+            f'CREATE TABLE "{EVENT_TABLE}" (LIKE "{old_table}" INCLUDING DEFAULTS) '
+            f'PARTITION BY RANGE ("created_at")'
+        )
+        cursor.execute(f'ALTER TABLE "{EVENT_TABLE}" ADD PRIMARY KEY ("id", "created_at")')
+
+        # Partitions for every month that already has events, then the rows
+        cursor.execute(f'SELECT min("created_at") FROM "{old_table}"')
+        oldest = cursor.fetchone()[0]
+        ensure_partitions(since=oldest and oldest.date(), connection=connection)
+        cursor.execute(f'INSERT INTO "{EVENT_TABLE}" SELECT * FROM "{old_table}"')
+
+        # Drops the identity sequence too, freeing its name
+        cursor.execute(f'DROP TABLE "{old_table}"')
+        cursor.execute(f'CREATE SEQUENCE "{sequence}" AS bigint OWNED BY "{EVENT_TABLE}"."id"')
+        cursor.execute(f'ALTER TABLE "{EVENT_TABLE}" ALTER COLUMN "id" SET DEFAULT nextval(\'{sequence}\'::regclass)')
+        cursor.execute(f'SELECT setval(%s, coalesce(max("id"), 0) + 1, false) FROM "{EVENT_TABLE}"', [sequence])
+        for _, definition in indexes:
+            cursor.execute(definition)
@@ -0,0 +1,18 @@
+"""
+API exception handling
+"""
+from rest_framework.views import exception_handler
+
+
+def api_exception_handler(exc, context):
+    """
+    DRF's default handler, plus an ``error`` key mirroring ``detail``
+
+    The frontend reads ``error`` from failed responses, which is what the
+    views return themselves; this keeps errors raised by DRF (permissions,
+    authentication, throttling) in the same shape.
+    """
+    response = exception_handler(exc, context)
+    if response is not None and isinstance(response.data, dict) and 'detail' in response.data:
+        response.data.setdefault('error', response.data['detail'])
+    return response
@@ -0,0 +1,166 @@
+"""
+Read-only fast path for high-volume list endpoints
+
+A ModelSerializer runs every field of every row through DRF's field objects.
+For the application, news and blog lists that machinery costs more than the
+query. A ``ValuesSerializer`` is compiled once from the ModelSerializer: each
+field becomes a ``.values()`` column and, only where DRF would change the
+value (dates, decimals, file URLs), a converter. Rows are then turned into
+dicts by a loop over that plan, giving the same JSON as the ModelSerializer.
+
+Fields that are not columns (SerializerMethodField) are declared in
+``computed``. A field the compiler does not know raises ImproperlyConfigured,
+so a field added to the ModelSerializer cannot silently go missing here;
+tests/test_fast_serializers.py compares the output of both.
+"""
+from django.core.exceptions import ImproperlyConfigured
+from django.db.models.fields.files import FieldFile
+from rest_framework import serializers
+
+from immigration_portal.media import signed_url
+from immigration_portal.timing import timed
+
+from .images import srcset_for
+from .models import BlogPost, NewsArticle
+from .serializers import ApplicationListSerializer, BlogPostSerializer, NewsArticleSerializer, SignedFileField
+
+# DRF returns these database values unchanged
+UNCHANGED = (
+    serializers.CharField, serializers.IntegerField, serializers.BooleanField,
+    serializers.ChoiceField, serializers.JSONField, serializers.PrimaryKeyRelatedField,
+)
+
+
+def _file_converter(field, model_field):
+    """DRF's FileField output (absolute when there is a request) for a stored name"""
+    storage = model_field.storage
+    if isinstance(field, SignedFileField):
+        url_for = lambda name: signed_url(name, storage)
+    else:
+        url_for = storage.url
+
+    def convert(name, request):
+        if not name:
+            return None
+        url = url_for(name)
+        return request.build_absolute_uri(url) if request is not None else url
+    return convert
+
+
+class ValuesSerializer:
+    """
+    Compiled read-only counterpart of ``serializer_class``
+
+    Usage:
+        rows = fast.values(queryset)
+        data = fast.serialize(rows, request)
+    """
+    serializer_class = None
+    # Field name -> (columns it reads, function(row, request))
+    computed = {}
+
+    def __init__(self):
+        columns, self.plan = self._compile(self.serializer_class(), self.computed)
+        self.columns = list(dict.fromkeys(columns))
+
+    def _compile(self, serializer, computed, prefix=''):
+        model = serializer.Meta.model
+        columns, plan = [], []
+        for name, field in serializer.fields.items():
+            if field.write_only:
+                continue
+            if name in computed:
+                field_columns, function = computed[name]
+                columns.extend(prefix + column for column in field_columns)
+                plan.append((name, None, function))
+                continue
+            if isinstance(field, serializers.ModelSerializer):
+                nested_columns, nested_plan = self._compile(field, {}, f'{prefix}{field.source}__')
+                columns.extend(nested_columns)
+                plan.append((name, None, self._nested(nested_plan, f'{prefix}{field.source}__id')))
+                continue
+            if isinstance(field, serializers.SerializerMethodField) or '.' in field.source:
+                raise ImproperlyConfigured(f'{type(self).__name__}: declare {name!r} in computed')
+
+            model_field = model._meta.get_field(field.source)
+            column = prefix + model_field.attname
+            columns.append(column)
+            if isinstance(field, serializers.FileField):
+                plan.append((name, column, _file_converter(field, model_field)))
+            elif isinstance(field, UNCHANGED):
+                plan.append((name, column, None))
+            elif isinstance(field, (serializers.DateTimeField, serializers.DateField, serializers.DecimalField)):
+                plan.append((name, column, lambda value, request, convert=field.to_representation: convert(value)))
+            else:
+                raise ImproperlyConfigured(f'{type(self).__name__}: no converter for {name!r} ({type(field).__name__})')
+        return columns, plan
+
+    def _nested(self, plan, pk_column):
+        def convert(row, request):
+            if row[pk_column] is None:
+                return None
+            return self._row(plan, row, request)
+        return convert
+
+    @staticmethod
+    def _row(plan, row, request):
+        data = {}
+        for name, column, convert in plan:
+            if column is None:
+                data[name] = convert(row, request)
+                continue
+            value = row[column]
+            # None stays None, as in DRF's Serializer.to_representation
+            if convert is None or value is None:
+                data[name] = value
+            else:
+                data[name] = convert(value, request)
+        return data
+
+    def values(self, queryset):
+        """``queryset`` as the dict rows ``serialize`` reads"""
+        return queryset.values(*self.columns)
+
+    def serialize(self, rows, request=None):
+        with timed('serialize'):
+            return [self._row(self.plan, row, request) for row in rows]
+
+
+def _image_fields(model):
+    """``image_url`` and ``image_srcset`` as the news and blog serializers compute them"""
+    model_field = model._meta.get_field('image')
+
+    def image_url(row, request):
+        if not row['image']:
+            return None
+        try:
+            return model_field.storage.url(row['image'])
+        except Exception:
+            return None
+
+    def image_srcset(row, request):
+        return srcset_for(FieldFile(None, model_field, row['image']), row['image_derivatives'])
+
+    return {
+        'image_url': (['image'], image_url),
+        'image_srcset': (['image', 'image_derivatives'], image_srcset),
+    }
+
+
+class ApplicationListValues(ValuesSerializer):
+    serializer_class = ApplicationListSerializer
+
+
+class NewsArticleValues(ValuesSerializer):
+    serializer_class = NewsArticleSerializer
+    computed = _image_fields(NewsArticle)
+
+
+class BlogPostValues(ValuesSerializer):
+    serializer_class = BlogPostSerializer
+    computed = _image_fields(BlogPost)
+
+
+application_list = ApplicationListValues()
+news_list = NewsArticleValues()
+blog_list = BlogPostValues()
@@ -0,0 +1,229 @@
+"""
+Image derivative pipeline
+
+Resized renditions (WebP plus a JPEG fallback) are generated once when an image
+is uploaded and stored next to the original, so list views and thumbnails never
+have to download the full-size upload. Applicant photos and signatures are also
+normalized (oriented, stripped of metadata, resized and re-encoded) first.
+"""
+import logging
+import os
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+
+# Pillow is imported where it is used so that loading the app (and every
+# request that never touches an image) does not pay for it
+
+logger = logging.getLogger(__name__)
+
+# Widths (in pixels) of the renditions generated for every image
+DERIVATIVE_WIDTHS = (80, 160, 320, 640)
+
+# (key used in the srcset map, Pillow format, file extension)
+DERIVATIVE_FORMATS = (
+    ('webp', 'WEBP', 'webp'),
+    ('jpeg', 'JPEG', 'jpg'),
+)
+
+DERIVATIVE_QUALITY = 80
+
+# Normalized applicant images: passport photo is 35x45 mm at 300 DPI, signatures
+# are fitted inside a box. Both are re-encoded as baseline JPEG.
+PHOTO_SPEC = {'size': (413, 531), 'crop': True}
+SIGNATURE_SPEC = {'size': (600, 200), 'crop': False}
+NORMALIZED_QUALITY = 85
+
+
+def derivative_name(name, width, extension):
+    """Storage name of a rendition, e.g. news/derivatives/photo/w160.webp"""
+    base, _ = os.path.splitext(name)
+    dirname, filename = os.path.split(base)
+    return f"{dirname}/derivatives/{filename}/w{width}.{extension}"
+
+
+def _encode(image, fmt):
+    """Encode a Pillow image and return the bytes"""
+    from PIL import Image
+    
+    if fmt == 'JPEG' and image.mode != 'RGB':
+        background = Image.new('RGB', image.size, (255, 255, 255))
+        if image.mode in ('RGBA', 'LA'):
+            background.paste(image, mask=image.getchannel('A'))
+        else:
+            background.paste(image.convert('RGB'))
+        image = background
+    elif fmt == 'WEBP' and image.mode not in ('RGB', 'RGBA'):
+        image = image.convert('RGBA' if 'A' in image.getbands() else 'RGB')
+
+    buffer = BytesIO()
+    options = {'quality': DERIVATIVE_QUALITY}
+    if fmt == 'JPEG':
+        options.update(optimize=True, progressive=True)
+    else:
+        options.update(method=4)
+    image.save(buffer, fmt, **options)
+    return buffer.getvalue()
+
+
+# Embedded metadata that normalization strips
+METADATA_KEYS = ('exif', 'icc_profile', 'xmp')
+
+
+def _is_normalized(image, spec):
+    """True when an image already matches the spec (so it is not re-encoded)"""
+    width, height = spec['size']
+    if image.format != 'JPEG' or image.mode != 'RGB':
+        return False
+    if any(image.info.get(key) for key in METADATA_KEYS):
+        return False
+    if spec['crop']:
+        return image.size == (width, height)
+    return image.width <= width and image.height <= height
+
+
+def normalize_image(field_file, spec):
+    """
+    Auto-orient, strip metadata, resize and re-encode an image to a spec
+
+    Returns:
+        tuple: (ContentFile or None if already normalized, original size, new size)
+    """
+    from PIL import Image, ImageOps
+    
+    field_file.open('rb')
+    try:
+        original_size = field_file.size
+        image = Image.open(field_file)
+        if _is_normalized(image, spec):
+            return None, original_size, original_size
+        image = ImageOps.exif_transpose(image)
+        image.load()
+    finally:
+        field_file.close()
+
+    if image.mode != 'RGB':
+        background = Image.new('RGB', image.size, (255, 255, 255))
+        if 'A' in image.getbands():
+            background.paste(image.convert('RGBA'), mask=image.convert('RGBA').getchannel('A'))
+        else:
+            background.paste(image.convert('RGB'))
+        image = background
+
+    if spec['crop']:
+        image = ImageOps.fit(image, spec['size'], Image.LANCZOS)
+    else:
+        image.thumbnail(spec['size'], Image.LANCZOS)
+
+    buffer = BytesIO()
+    # No exif/icc_profile arguments: the re-encoded file carries no metadata
+    image.save(buffer, 'JPEG', quality=NORMALIZED_QUALITY, optimize=True)
+    data = buffer.getvalue()
+    return ContentFile(data), original_size, len(data)
+
+
+def generate_derivatives(field_file, widths=DERIVATIVE_WIDTHS):
+    """
+    Generate resized renditions for an image field
+
+    Widths larger than the source image are skipped (the original is already
+    smaller), but at least one rendition at the source width is always kept.
+
+    Returns:
+        dict: {'source': <original name>, 'webp': {'80': <name>, ...}, 'jpeg': {...}}
+    """
+    from PIL import Image, ImageOps
+    
+    storage = field_file.storage
+    field_file.open('rb')
+    try:
+        image = Image.open(field_file)
+        image = ImageOps.exif_transpose(image)
+        image.load()
+    finally:
+        field_file.close()
+
+    targets = [w for w in sorted(widths) if w < image.width] or [image.width]
+
+    derivatives = {'source': field_file.name}
+    for key, _, _ in DERIVATIVE_FORMATS:
+        derivatives[key] = {}
+
+    for width in targets:
+        height = max(1, round(image.height * width / image.width))
+        resized = image.resize((width, height), Image.LANCZOS) if width != image.width else image
+        for key, fmt, extension in DERIVATIVE_FORMATS:
+            name = derivative_name(field_file.name, width, extension)
+            saved_name = storage.save(name, ContentFile(_encode(resized, fmt)))
+            derivatives[key][str(width)] = saved_name
+
+    return derivatives
+
+
+def delete_derivatives(storage, derivatives):
+    """Remove previously generated renditions from storage"""
+    for key, _, _ in DERIVATIVE_FORMATS:
+        for name in (derivatives or {}).get(key, {}).values():
+            try:
+                storage.delete(name)
+            except Exception as e:
+                logger.warning(f"Could not delete derivative {name}: {e}")
+
+
+def refresh_derivatives(instance, field_name, derivatives_field):
+    """
+    Bring the stored renditions of an image field in line with its current file
+
+    Renditions are only regenerated when the original changed, and the new map
+    is written with a single-column UPDATE so no other model logic runs again.
+    """
+    field_file = getattr(instance, field_name)
+    current = getattr(instance, derivatives_field) or {}
+
+    if field_file and current.get('source') == field_file.name:
+        return current
+    if not field_file and not current:
+        return current
+
+    new = {}
+    if field_file:
+        try:
+            new = generate_derivatives(field_file)
+        except Exception as e:
+            logger.warning(f"Could not generate derivatives for {field_file.name}: {e}")
+            # Remember the failure so the same file is not retried on every save
+            new = {'source': field_file.name, 'failed': True}
+
+    if current:
+        delete_derivatives(field_file.storage, current)
+
+    type(instance).objects.filter(pk=instance.pk).update(**{derivatives_field: new})
+    setattr(instance, derivatives_field, new)
+    return new
+
+
+def srcset_for(field_file, derivatives, url_for=None):
+    """
+    Build the srcset-style map exposed by the API
+
+    ``url_for(name, storage)`` can be given to produce something other than the
+    storage's plain URL (e.g. signed document URLs).
+
+    Returns:
+        dict: {'webp': {'80': <url>, ...}, 'jpeg': {...}} or None when the image
+        has no renditions (or they belong to a previous upload).
+    """
+    if not field_file or not derivatives or derivatives.get('source') != field_file.name:
+        return None
+    if derivatives.get('failed'):
+        return None
+
+    storage = field_file.storage
+    url_for = url_for or (lambda name, storage: storage.url(name))
+    srcset = {}
+    try:
+        for key, _, _ in DERIVATIVE_FORMATS:
+            srcset[key] = {width: url_for(name, storage) for width, name in derivatives.get(key, {}).items()}
+    except Exception:
+        return None
+    return srcset
@@ -0,0 +1,320 @@
+"""
+Scenario load test for the applicant and officer journeys
+
+Drives a running server over HTTP the way the frontend does. Each virtual
+applicant registers, logs in, submits an application with a photo, an ID
+copy and a signature, pays through ``initialize_payment``/``verify_payment``
+and lists their applications. Officers list applications and approve the
+paid ones as applicants finish. Every request is timed per step, so the
+report shows p50/p95/p99 latency per step, errors and throughput.
+
+Payments go to ``FakePaystack``, a local stand-in for the Paystack API with
+a configurable delay. The server must be pointed at it with
+``PAYSTACK_BASE_URL`` (``manage.py loadtest --spawn`` does this).
+
+Results can be saved as a JSON baseline and compared with a later run.
+"""
+import asyncio
+import io
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from .benchmarks import percentile, regressions
+
+PASSWORD = 'LoadTest#2024'
+
+APPLICATION_TYPES = ['passport-first', 'passport-replacement', 'nationalid-first', 'nationalid-replacement']
+
+
+# Fake payment gateway
+
+class _FakePaystackHandler(BaseHTTPRequestHandler):
+
+    def do_POST(self):
+        if self.path != '/transaction/initialize':
+            return self._respond(404, {'status': False, 'message': 'Not found'})
+        body = json.loads(self.rfile.read(int(self.headers.get('Content-Length') or 0)) or b'{}')
+        reference = body.get('reference') or uuid.uuid4().hex
+        self._respond(200, {
+            'status': True,
+            'message': 'Authorization URL created',
+            'data': {
+                'authorization_url': f'https://checkout.paystack.test/{reference}',
+                'access_code': uuid.uuid4().hex[:12],
+                'reference': reference,
+            },
+        })
+
+    def do_GET(self):
+        prefix = '/transaction/verify/'
+        if not self.path.startswith(prefix):
+            return self._respond(404, {'status': False, 'message': 'Not found'})
+        self._respond(200, {
+            'status': True,
+            'message': 'Verification successful',
+            'data': {'status': 'success', 'reference': self.path[len(prefix):], 'gateway_response': 'Successful'},
+        })
+
+    def _respond(self, status, data):
+        time.sleep(self.server.latency)
+        payload = json.dumps(data).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class FakePaystack(ThreadingHTTPServer):
+    """Paystack's initialize/verify endpoints, always successful, after ``latency`` seconds"""
+
+    daemon_threads = True
+
+    def __init__(self, port=0, latency=0.0):
+        super().__init__(('127.0.0.1', port), _FakePaystackHandler)
+        self.latency = latency
+        self._thread = None
+
+    @property
+    def url(self):
+        return f'http://127.0.0.1:{self.server_address[1]}'
+
+    def start(self):
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+# Documents
+
+def _image(format, size):
+    from PIL import Image
+
+    # Random pixels make every document unique, so uploads are not deduplicated
+    image = Image.new('RGB', size, (200, 200, 200))
+    image.paste(Image.frombytes('RGB', (64, 64), os.urandom(64 * 64 * 3)), (0, 0))
+    buffer = io.BytesIO()
+    image.save(buffer, format=format)
+    return buffer.getvalue()
+
+
+def _pdf():
+    stream = f'BT /F1 12 Tf 72 720 Td (ID copy {uuid.uuid4().hex}) Tj ET'.encode()
+    return (
+        b'%PDF-1.4\n'
+        b'1 0 obj << /Type /Catalog /Pages 2 0 R >> endobj\n'
+        b'2 0 obj << /Type /Pages /Kids [3 0 R] /Count 1 >> endobj\n'
+        b'3 0 obj << /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents 4 0 R >> endobj\n'
+        b'4 0 obj << /Length ' + str(len(stream)).encode() + b' >> stream\n' + stream + b'\nendstream endobj\n'
+        b'trailer << /Root 1 0 R >>\n%%EOF\n'
+    )
+
+
+def make_documents():
+    """A passport photo, a signature and an ID copy, as multipart ``files``"""
+    return {
+        'photo': ('photo.jpg', _image('JPEG', (600, 600)), 'image/jpeg'),
+        'signature': ('signature.png', _image('PNG', (400, 150)), 'image/png'),
+        'id_copy': ('id_copy.pdf', _pdf(), 'application/pdf'),
+    }
+
+
+def application_form(email, index):
+    return {
+        'application_type': APPLICATION_TYPES[index % len(APPLICATION_TYPES)],
+        'first_name': 'Load',
+        'last_name': 'Tester',
+        'date_of_birth': '1990-01-01',
+        'gender': 'female' if index % 2 else 'male',
+        'nationality': 'South Sudanese',
+        'father_name': 'Deng Tester',
+        'mother_name': 'Achol Tester',
+        'marital_status': 'single',
+        'phone_number': '+211912345678',
+        'email': email,
+        'country': 'South Sudan',
+        'state': 'Central Equatoria',
+        'city': 'Juba',
+        'place_of_residence': 'Juba',
+        'birth_country': 'South Sudan',
+        'birth_state': 'Central Equatoria',
+        'birth_city': 'Juba',
+    }
+
+
+# Measurement
+
+class StepFailed(Exception):
+    pass
+
+
+class Recorder:
+    """Latencies and errors per step"""
+
+    def __init__(self):
+        self.latencies = {}
+        self.errors = {}
+        self.journeys = {'applicant': 0, 'officer': 0}
+        self.failed_journeys = 0
+        self.samples = []
+
+    async def request(self, client, step, method, url, expected=(200,), **kwargs):
+        start = time.perf_counter()
+        try:
+            response = await client.request(method, url, **kwargs)
+        except Exception as e:
+            self._error(step, type(e).__name__)
+            raise StepFailed(f'{step}: {type(e).__name__}: {e}')
+        self.latencies.setdefault(step, []).append((time.perf_counter() - start) * 1000)
+        if response.status_code not in expected:
+            self._error(step, str(response.status_code))
+            if len(self.samples) < 5:
+                self.samples.append(f'{step}: HTTP {response.status_code} {response.text[:200]}')
+            raise StepFailed(f'{step}: HTTP {response.status_code}')
+        return response
+
+    def _error(self, step, kind):
+        errors = self.errors.setdefault(step, {})
+        errors[kind] = errors.get(kind, 0) + 1
+
+    def results(self, duration):
+        steps = {}
+        for step, values in self.latencies.items():
+            steps[step] = {
+                'count': len(values),
+                'errors': sum(self.errors.get(step, {}).values()),
+                'p50_ms': percentile(values, 50),
+                'p95_ms': percentile(values, 95),
+                'p99_ms': percentile(values, 99),
+                'max_ms': max(values),
+            }
+        for step, errors in self.errors.items():
+            steps.setdefault(step, {'count': 0, 'errors': sum(errors.values())})
+        requests = sum(len(values) for values in self.latencies.values())
+        return {
+            'duration_s': duration,
+            'requests': requests,
+            'throughput_rps': requests / duration if duration else 0.0,
+            'journeys': dict(self.journeys),
+            'failed_journeys': self.failed_journeys,
+            'errors': {step: dict(errors) for step, errors in self.errors.items()},
+            'steps': steps,
+        }
+
+
+# Scenarios
+
+async def applicant_journey(client, recorder, email, index, approvals):
+    username = email.split('@')[0]
+    await recorder.request(client, 'register', 'POST', '/api/auth/register/', expected=(201,), json={
+        'username': username, 'email': email, 'password': PASSWORD,
+        'first_name': 'Load', 'last_name': 'Tester', 'phone_number': '+211912345678',
+    })
+    # A fresh session, as when the applicant comes back to the site
+    client.cookies.clear()
+    await recorder.request(client, 'login', 'POST', '/api/auth/login/', json={'username': email, 'password': PASSWORD})
+
+    response = await recorder.request(
+        client, 'submit_application', 'POST', '/api/applications/submit/', expected=(201,),
+        data=application_form(email, index), files=make_documents(),
+    )
+    application_id = response.json()['application']['id']
+
+    response = await recorder.request(client, 'initialize_payment', 'POST', '/api/payment/initialize/', json={
+        'application_id': application_id,
+    })
+    reference = response.json()['reference']
+    await recorder.request(client, 'verify_payment', 'GET', '/api/payment/verify/', params={'reference': reference})
+    await recorder.request(client, 'my_applications', 'GET', '/api/applications/my_applications/')
+    await approvals.put(application_id)
+
+
+async def officer_journey(client, recorder, username, approvals):
+    await recorder.request(client, 'officer_login', 'POST', '/api/auth/login/', json={'username': username, 'password': PASSWORD})
+    while True:
+        application_id = await approvals.get()
+        if application_id is None:
+            return
+        try:
+            await recorder.request(client, 'officer_list', 'GET', '/api/applications/')
+            await recorder.request(client, 'approve', 'POST', f'/api/applications/{application_id}/approve/')
+            recorder.journeys['officer'] += 1
+        except StepFailed:
+            recorder.failed_journeys += 1
+
+
+async def run(base_url, emails, officer_usernames, iterations=1, timeout=60.0):
+    """
+    Run every applicant journey ``iterations`` times with one virtual user per email
+
+    Returns:
+        dict: see ``Recorder.results``, plus the first few error responses
+    """
+    import httpx
+
+    # httpx logs every request at INFO
+    logging.getLogger('httpx').setLevel(logging.WARNING)
+    recorder = Recorder()
+    approvals = asyncio.Queue()
+
+    def new_client():
+        return httpx.AsyncClient(base_url=base_url, timeout=timeout)
+
+    async def applicant(user_index, email):
+        for iteration in range(iterations):
+            # Every iteration is a new account
+            local, domain = email.split('@')
+            address = f'{local}-{iteration}@{domain}' if iterations > 1 else email
+            async with new_client() as client:
+                try:
+                    await applicant_journey(client, recorder, address, user_index + iteration, approvals)
+                    recorder.journeys['applicant'] += 1
+                except StepFailed:
+                    recorder.failed_journeys += 1
+
+    async def officer(username):
+        async with new_client() as client:
+            try:
+                await officer_journey(client, recorder, username, approvals)
+            except StepFailed:
+                # Login failed; the other officers take the remaining approvals
+                recorder.failed_journeys += 1
+
+    start = time.perf_counter()
+    officers = [asyncio.create_task(officer(username)) for username in officer_usernames]
+    await asyncio.gather(*(applicant(i, email) for i, email in enumerate(emails)))
+    for _ in officers:
+        await approvals.put(None)
+    await asyncio.gather(*officers)
+    duration = time.perf_counter() - start
+
+    results = recorder.results(duration)
+    results['sample_errors'] = recorder.samples
+    return results
+
+
+# Baselines
+
+COMPARED = ('p50_ms', 'p95_ms', 'p99_ms')
+
+
+def compare(results, baseline, max_regression):
+    """
+    Steps whose latency grew by more than ``max_regression`` percent
+
+    Returns:
+        list: (step, metric, baseline ms, current ms, change in percent)
+    """
+    return regressions(results['steps'], baseline.get('steps', {}), COMPARED, max_regression)
@@ -0,0 +1,50 @@
+"""
+Email delivery for async views
+
+With the SMTP backend, messages go out through aiosmtplib so the event loop
+keeps serving other requests while the mail server responds. Any other
+EMAIL_BACKEND (console, file, locmem) is used unchanged in a worker thread.
+"""
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.mail import EmailMessage
+from immigration_portal.metrics import EMAIL_DURATION, EMAILS
+from immigration_portal.timing import timed
+
+SMTP_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
+
+
+async def asend_mail(subject, message, from_email, recipient_list, kind='other'):
+    """
+    Async counterpart of ``django.core.mail.send_mail``; returns the number of messages sent
+
+    ``kind`` labels the email in the send duration and outcome metrics.
+    """
+    email = EmailMessage(subject, message, from_email, recipient_list)
+    try:
+        with timed('smtp'), EMAIL_DURATION.labels(kind).time():
+            if settings.EMAIL_BACKEND != SMTP_BACKEND:
+                sent = await sync_to_async(email.send, thread_sensitive=False)()
+            else:
+                await _smtp_send(email)
+                sent = 1
+    except Exception:
+        EMAILS.labels(kind, 'failed').inc()
+        raise
+    EMAILS.labels(kind, 'sent' if sent else 'failed').inc()
+    return sent
+
+
+async def _smtp_send(email):
+    import aiosmtplib
+    
+    await aiosmtplib.send(
+        email.message(),
+        hostname=settings.EMAIL_HOST,
+        port=settings.EMAIL_PORT,
+        username=settings.EMAIL_HOST_USER or None,
+        password=settings.EMAIL_HOST_PASSWORD or None,
+        start_tls=settings.EMAIL_USE_TLS,
+        use_tls=settings.EMAIL_USE_SSL,
+        timeout=settings.EMAIL_TIMEOUT or 60,
+    )
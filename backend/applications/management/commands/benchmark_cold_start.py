@@ -0,0 +1,96 @@
+"""
+Django management command to measure worker cold-start time
+Run with: python manage.py benchmark_cold_start
+"""
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+# Runs in a fresh interpreter for every sample, like a new worker would
+PROBE = '''
+import json, os, sys, time
+start = time.perf_counter()
+import django
+django.setup()
+setup = time.perf_counter()
+from django.urls import get_resolver
+get_resolver().url_patterns
+urls = time.perf_counter()
+if os.environ.get('COLD_START_WARM_UP'):
+    from applications.warmup import warm_up
+    warm_up()
+warmed = time.perf_counter()
+from django.test import Client
+response = Client().get(os.environ['COLD_START_PATH'], HTTP_HOST=os.environ['COLD_START_HOST'])
+done = time.perf_counter()
+print(json.dumps({
+    'setup_ms': (setup - start) * 1000,
+    'urls_ms': (urls - setup) * 1000,
+    'warm_up_ms': (warmed - urls) * 1000,
+    'first_request_ms': (done - warmed) * 1000,
+    'status': response.status_code,
+}))
+'''
+
+IMPORTTIME_PATTERN = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)$')
+
+
+class Command(BaseCommand):
+    help = 'Measures django.setup(), URLconf loading and the first request in fresh interpreters'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--runs', type=int, default=5, help='Fresh interpreters to start')
+        parser.add_argument('--path', default='/api/csrf/', help='Path of the first request')
+        parser.add_argument('--warm-up', action='store_true', help='Run the post_fork warm-up before the first request')
+        parser.add_argument('--top', type=int, default=15, help='Slowest top-level imports to list')
+
+    def handle(self, *args, **options):
+        env = dict(
+            os.environ,
+            DJANGO_SETTINGS_MODULE=os.environ.get('DJANGO_SETTINGS_MODULE', 'immigration_portal.settings'),
+            COLD_START_PATH=options['path'],
+            COLD_START_HOST=(settings.ALLOWED_HOSTS or ['localhost'])[0].lstrip('.').replace('*', 'localhost'),
+        )
+        if options['warm_up']:
+            env['COLD_START_WARM_UP'] = '1'
+
+        samples = [self.run_probe(env) for _ in range(options['runs'])]
+        self.stdout.write(f"{options['runs']} cold starts, first request GET {options['path']} (HTTP {samples[0]['status']})")
+        for key, label in [('setup_ms', 'django.setup()'), ('urls_ms', 'URLconf'),
+                           ('warm_up_ms', 'warm-up'), ('first_request_ms', 'first request')]:
+            values = [s[key] for s in samples]
+            self.stdout.write(f"{label:<16} median {statistics.median(values):8.1f} ms   max {max(values):8.1f} ms")
+        total = [s['setup_ms'] + s['urls_ms'] + s['warm_up_ms'] + s['first_request_ms'] for s in samples]
+        self.stdout.write(f"{'total':<16} median {statistics.median(total):8.1f} ms   max {max(total):8.1f} ms")
+
+        self.stdout.write("\nSlowest top-level imports (cumulative, -X importtime):")
+        for cumulative, name in self.slowest_imports(env, options['top']):
+            self.stdout.write(f"{cumulative / 1000:8.1f} ms  {name}")
+
+        self.stdout.write(self.style.SUCCESS('✓ Benchmark complete'))
+
+    def run_probe(self, env):
+        result = subprocess.run(
+            [sys.executable, '-c', PROBE], env=env, cwd=settings.BASE_DIR,
+            capture_output=True, text=True, check=True,
+        )
+        return json.loads(result.stdout.strip().splitlines()[-1])
+
+    def slowest_imports(self, env, top):
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', PROBE], env=env, cwd=settings.BASE_DIR,
+            capture_output=True, text=True, check=True,
+        )
+        imports = []
+        for line in result.stderr.splitlines():
+            match = IMPORTTIME_PATTERN.match(line)
+            # Only modules imported directly by the probe, not their children
+            if match and len(match.group(3)) == 1:
+                imports.append((int(match.group(2)), match.group(4)))
+        return sorted(imports, reverse=True)[:top]
@@ -0,0 +1,71 @@
+"""
+Django management command to benchmark the login path
+Run with: python manage.py benchmark_login
+"""
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.contrib.sessions.middleware import SessionMiddleware
+from django.core.management.base import BaseCommand
+from django.test import RequestFactory, override_settings
+from applications.benchmarks import format_result, measure, scratch_data
+from applications.models import UserProfile
+from applications.views import login_view
+
+PASSWORD = 'benchmark-password'
+
+
+class Command(BaseCommand):
+    help = 'Measures latency and queries per login against a scratch user table (rolled back afterwards)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=5000, help='Number of scratch users to create')
+        parser.add_argument('--iterations', type=int, default=200, help='Logins per scenario')
+        parser.add_argument(
+            '--real-hasher', action='store_true',
+            help='Use the configured password hasher instead of a fast one (measures hashing too)',
+        )
+
+    def handle(self, *args, **options):
+        if options['real_hasher']:
+            self.run(options)
+        else:
+            # PBKDF2 would dwarf the database work this benchmark is about
+            with override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher']):
+                self.run(options)
+
+    def run(self, options):
+        with scratch_data():
+            target = self.create_users(options['users'])
+            factory = RequestFactory()
+
+            def login(identifier, password=PASSWORD):
+                request = factory.post(
+                    '/api/auth/login/', {'username': identifier, 'password': password}, content_type='application/json'
+                )
+                SessionMiddleware(lambda r: None).process_request(request)
+                return login_view(request)
+
+            scenarios = [
+                ('username', lambda: login(target.username)),
+                ('email (mixed case)', lambda: login(target.email.upper())),
+                ('wrong password', lambda: login(target.username, 'wrong')),
+                ('unknown account', lambda: login('nobody@example.com')),
+            ]
+            self.stdout.write(f"{options['users']} users, {options['iterations']} logins per scenario")
+            for name, func in scenarios:
+                result = measure(func, options['iterations'])
+                self.stdout.write(format_result(name, result))
+
+        self.stdout.write(self.style.SUCCESS('✓ Benchmark complete (scratch users rolled back)'))
+
+    def create_users(self, count):
+        password = make_password(PASSWORD)
+        User.objects.bulk_create(
+            [User(username=f'bench{i}', email=f'Bench.User{i}@example.com', password=password) for i in range(count)],
+            batch_size=1000,
+        )
+        users = User.objects.filter(username__startswith='bench', profile__isnull=True)
+        UserProfile.objects.bulk_create(
+            [UserProfile(user=user, phone_number='') for user in users.only('pk')], batch_size=1000,
+        )
+        return User.objects.get(username=f'bench{count // 2}')
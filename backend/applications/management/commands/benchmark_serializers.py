@@ -0,0 +1,190 @@
+"""
+Django management command to benchmark API serializers and JSON rendering
+Run with: python manage.py benchmark_serializers
+"""
+import datetime
+import json
+import statistics
+import time
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models.fields.files import FieldFile
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from applications import fast_serializers
+from applications.benchmarks import peak_memory, regressions
+from applications.images import DERIVATIVE_FORMATS, DERIVATIVE_WIDTHS, derivative_name
+from applications.models import Application, BlogPost, NewsArticle
+from applications.serializers import (
+    ApplicationListSerializer, ApplicationSerializer, BlogPostSerializer, NewsArticleSerializer,
+)
+
+# Distinct instances built; larger row counts repeat them, so input memory
+# stays small and the peak measured is the serializer's own
+POOL_SIZE = 1000
+
+COMPARED = ('us_per_row', 'peak_mb')
+
+
+def derivatives_for(name):
+    derivatives = {'source': name}
+    for key, _, extension in DERIVATIVE_FORMATS:
+        derivatives[key] = {str(width): derivative_name(name, width, extension) for width in DERIVATIVE_WIDTHS}
+    return derivatives
+
+
+def as_row(instance, columns):
+    """The ``.values()`` row the database would return for ``instance``"""
+    row = {}
+    for column in columns:
+        value = instance
+        for part in column.split('__'):
+            value = getattr(value, part)
+        row[column] = value.name if isinstance(value, FieldFile) else value
+    return row
+
+
+def make_users(count):
+    return [
+        User(pk=i + 1, username=f'applicant{i}', email=f'applicant{i}@example.com', first_name='Achol', last_name='Deng')
+        for i in range(count)
+    ]
+
+
+def make_applications(count):
+    users = make_users(count)
+    reviewer = User(pk=count + 1, username='reviewer', email='reviewer@example.com', first_name='Mayen', last_name='Garang')
+    now = timezone.now()
+    applications = []
+    for i, user in enumerate(users):
+        photo = f'documents/photos/photo{i}.jpg'
+        signature = f'documents/signatures/signature{i}.png'
+        applications.append(Application(
+            pk=i + 1, user=user, reviewed_by=reviewer, reviewed_at=now,
+            application_type=Application.TYPE_CHOICES[i % len(Application.TYPE_CHOICES)][0],
+            status='approved', confirmation_number=f'SS-IMM-{i:08d}',
+            first_name='Achol', middle_name='Ayen', last_name='Deng', date_of_birth=datetime.date(1990, 1, 1),
+            gender='female', nationality='South Sudanese', national_id_number=f'NID{i:08d}',
+            father_name='Deng Garang', mother_name='Ayen Mabior', marital_status='married',
+            phone_number='+211912345678', email=user.email, country='South Sudan', state='Central Equatoria',
+            city='Juba', place_of_residence='Hai Malakal', birth_country='South Sudan',
+            birth_state='Jonglei', birth_city='Bor', passport_type='5-year',
+            photo=photo, photo_derivatives=derivatives_for(photo),
+            signature=signature, signature_derivatives=derivatives_for(signature),
+            id_copy=f'documents/ids/id{i}.pdf',
+            payment_status='completed', payment_method='credit_card', payment_amount=Decimal('500.00'),
+            payment_reference=f'PAY-SS-IMM-{i:08d}', payment_date=now,
+            created_at=now, updated_at=now,
+        ))
+    return applications
+
+
+def make_posts(model, count):
+    now = timezone.now()
+    posts = []
+    for i in range(count):
+        image = f'{model._meta.model_name}/image{i}.jpg'
+        fields = dict(
+            pk=i + 1, title=f'Passport registration drive {i}', title_ar='حملة تسجيل الجوازات',
+            content='Registration centres open in all ten states. ' * 40,
+            content_ar='تفتح مراكز التسجيل في جميع الولايات العشر. ' * 40,
+            excerpt='Registration centres open in all ten states.', excerpt_ar='تفتح مراكز التسجيل.',
+            image=image, image_derivatives=derivatives_for(image), author_id=1,
+            author_name='Directorate of Nationality', published=True, featured=i % 5 == 0,
+            created_at=now, updated_at=now,
+        )
+        if model is BlogPost:
+            fields['category'] = 'Guides'
+        posts.append(model(**fields))
+    return posts
+
+
+class Command(BaseCommand):
+    help = 'Times the API serializers and JSON rendering over in-memory rows and reports peak memory'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, nargs='+', default=[1000, 10000, 100000], help='Row counts to serialize')
+        parser.add_argument('--repeat', type=int, default=3, help='Timed runs per case (the median is reported)')
+        parser.add_argument('--baseline', help='JSON results of an earlier run to compare with')
+        parser.add_argument('--max-regression', type=float, default=20.0,
+                            help='Fail if time per row or peak memory is this many percent above the baseline')
+        parser.add_argument('--save-baseline', help='Write the results to this JSON file')
+
+    def handle(self, *args, **options):
+        pools = {
+            'ApplicationSerializer': (ApplicationSerializer, make_applications(POOL_SIZE)),
+            'ApplicationListSerializer': (ApplicationListSerializer, make_applications(POOL_SIZE)),
+            'NewsArticleSerializer': (NewsArticleSerializer, make_posts(NewsArticle, POOL_SIZE)),
+            'BlogPostSerializer': (BlogPostSerializer, make_posts(BlogPost, POOL_SIZE)),
+        }
+        fast = {
+            'ApplicationListSerializer': fast_serializers.application_list,
+            'NewsArticleSerializer': fast_serializers.news_list,
+            'BlogPostSerializer': fast_serializers.blog_list,
+        }
+        fast_pools = {
+            name: [as_row(instance, fast[name].columns) for instance in pools[name][1]] for name in fast
+        }
+        renderer = JSONRenderer()
+
+        results = {}
+        self.stdout.write(f"{'case':<40} {'rows':>7} {'median':>11} {'per row':>11} {'peak':>10}")
+        for rows in options['rows']:
+            for name, (serializer_class, pool) in pools.items():
+                instances = [pool[i % len(pool)] for i in range(rows)]
+                serialize = lambda: serializer_class(instances, many=True).data
+                with CaptureQueriesContext(connection) as queries:
+                    data = serialize()
+                if queries:
+                    raise CommandError(f'{name} ran {len(queries)} queries on in-memory rows')
+                self.record(results, name, rows, serialize, options['repeat'])
+                self.record(results, f'{name} + JSON', rows, lambda: renderer.render(data), options['repeat'])
+
+                if name in fast:
+                    # The .values() fast path the list endpoints use
+                    values_rows = [fast_pools[name][i % POOL_SIZE] for i in range(rows)]
+                    self.record(results, f'{name} (values)', rows,
+                                lambda: fast[name].serialize(values_rows), options['repeat'])
+
+        if options['save_baseline']:
+            with open(options['save_baseline'], 'w') as f:
+                json.dump(results, f, indent=2)
+            self.stdout.write(f"Results saved to {options['save_baseline']}")
+
+        if options['baseline']:
+            with open(options['baseline']) as f:
+                baseline = json.load(f)
+            found = regressions(results, baseline, COMPARED, options['max_regression'])
+            for case, metric, before, after, change in found:
+                self.stdout.write(self.style.ERROR(f'{case:<48} {metric} {before:10.3f} -> {after:10.3f} (+{change:.0f}%)'))
+            if found:
+                raise CommandError(f"{len(found)} measurements regressed by more than {options['max_regression']:.0f}%")
+            self.stdout.write(f"Nothing regressed by more than {options['max_regression']:.0f}% against {options['baseline']}")
+
+        self.stdout.write(self.style.SUCCESS('✓ Benchmark complete'))
+
+    def record(self, results, name, rows, func, repeat):
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func()
+            timings.append(time.perf_counter() - start)
+        # Separate run: tracemalloc slows down allocation-heavy code
+        _, peak = peak_memory(func)
+
+        elapsed = statistics.median(timings)
+        result = {
+            'rows': rows,
+            'ms': elapsed * 1000,
+            'us_per_row': elapsed / rows * 1_000_000,
+            'peak_mb': peak / 1024 / 1024,
+        }
+        results[f'{name} x{rows}'] = result
+        self.stdout.write(
+            f"{name:<40} {rows:>7} {result['ms']:>8.1f} ms {result['us_per_row']:>8.2f} us "
+            f"{result['peak_mb']:>7.1f} MB"
+        )
@@ -0,0 +1,69 @@
+"""
+Django management command to benchmark registration validation
+Run with: python manage.py benchmark_validators
+"""
+import time
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from applications import validators
+from applications.benchmarks import format_result, measure, scratch_data
+from applications.serializers import RegisterSerializer
+
+
+def make_record(i):
+    return {
+        'username': f'import{i}@example.com',
+        'email': f'Import{i}@Example.com',
+        'password': 'Secret#123',
+        'first_name': 'Achol',
+        'last_name': "Deng-Ma'ker",
+        'phone_number': '+211 912-345-678',
+    }
+
+
+class Command(BaseCommand):
+    help = 'Compares per-record serializer validation with the batch validator (scratch data is rolled back)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--records', type=int, default=5000, help='Records per batch')
+        parser.add_argument('--existing', type=int, default=5000, help='Accounts already in the database')
+        parser.add_argument('--iterations', type=int, default=2000, help='Calls per rule microbenchmark')
+
+    def handle(self, *args, **options):
+        with scratch_data():
+            password = make_password(None)
+            User.objects.bulk_create(
+                [User(username=f'existing{i}', email=f'existing{i}@example.com', password=password)
+                 for i in range(options['existing'])],
+                batch_size=1000,
+            )
+            records = [make_record(i) for i in range(options['records'])]
+            # A few conflicts so the uniqueness path is exercised
+            records[::100] = [dict(r, email=f'existing{i}@example.com') for i, r in enumerate(records[::100])]
+
+            self.stdout.write(f"{len(records)} records against {options['existing']} existing accounts")
+
+            record = records[1]
+            n = options['iterations']
+            self.stdout.write(format_result('name rule', measure(lambda: validators.validate_first_name('Achol'), n)))
+            self.stdout.write(format_result('phone rule', measure(lambda: validators.validate_phone_number('+211 912-345-678'), n)))
+            self.stdout.write(format_result('password rule', measure(lambda: validators.validate_password_strength('Secret#123'), n)))
+            self.stdout.write(format_result('RegisterSerializer (1 record)', measure(lambda: RegisterSerializer(data=record).is_valid(), n // 10)))
+
+            self.run_batch('RegisterSerializer per record', lambda: [RegisterSerializer(data=r).is_valid() for r in records], len(records))
+            self.run_batch('validate_registrations', lambda: validators.validate_registrations(records), len(records))
+
+        self.stdout.write(self.style.SUCCESS('✓ Benchmark complete (scratch data rolled back)'))
+
+    def run_batch(self, name, func, count):
+        with CaptureQueriesContext(connection) as queries:
+            start = time.perf_counter()
+            func()
+            elapsed = time.perf_counter() - start
+        self.stdout.write(
+            f"{name:<32} {elapsed * 1000:10.1f} ms total   {count / elapsed:10.0f} records/s   {len(queries)} queries"
+        )
@@ -0,0 +1,26 @@
+"""
+Django management command to create monthly partitions of the application event log
+Run with: python manage.py create_event_partitions
+"""
+from django.core.management.base import BaseCommand
+from django.db import connection
+from applications.events import ensure_partitions
+
+
+class Command(BaseCommand):
+    help = 'Creates upcoming monthly partitions of the application event table (PostgreSQL only)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--months', type=int, default=3,
+            help='Number of months ahead to create partitions for',
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            self.stdout.write(self.style.WARNING(f'Event table is not partitioned on {connection.vendor}; nothing to do'))
+            return
+        created = ensure_partitions(months_ahead=options['months'])
+        for name in created:
+            self.stdout.write(f'  + {name}')
+        self.stdout.write(self.style.SUCCESS(f'✓ Created {len(created)} partition(s)'))
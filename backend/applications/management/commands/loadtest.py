@@ -0,0 +1,160 @@
+"""
+Django management command to load-test the applicant and officer journeys
+Run with: python manage.py loadtest --spawn --users 20
+"""
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+import uuid
+from urllib.error import URLError
+from urllib.request import urlopen
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from applications.loadtest import PASSWORD, FakePaystack, compare, run
+
+# Settings for a server started with --spawn: plain-HTTP cookies, no real
+# email, and throttles that many virtual users from one IP do not trip
+SPAWN_ENV = {
+    'PAYSTACK_SECRET_KEY': 'sk_test_loadtest',
+    'SESSION_COOKIE_SECURE': 'False',
+    'CSRF_COOKIE_SECURE': 'False',
+    'EMAIL_BACKEND': 'django.core.mail.backends.locmem.EmailBackend',
+    'THROTTLE_LOGIN_IP': '100000/min',
+    'THROTTLE_LOGIN_ACCOUNT': '100000/min',
+}
+
+
+class Command(BaseCommand):
+    help = 'Runs concurrent applicant and officer journeys against a server and reports latency per step'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--base-url', default='http://localhost:8000', help='Server to test (ignored with --spawn)')
+        parser.add_argument('--spawn', action='store_true', help='Start gunicorn for the run, pointed at the fake gateway')
+        parser.add_argument('--port', type=int, default=8765, help='Port of the spawned server')
+        parser.add_argument('--workers', type=int, default=2, help='Workers of the spawned server')
+        parser.add_argument('--users', type=int, default=10, help='Concurrent applicants')
+        parser.add_argument('--iterations', type=int, default=1, help='Journeys per applicant')
+        parser.add_argument('--officers', type=int, default=2, help='Concurrent officers approving applications')
+        parser.add_argument('--gateway-port', type=int, default=8766, help='Port of the fake Paystack gateway')
+        parser.add_argument('--gateway-latency', type=float, default=0.2, help='Seconds the fake gateway takes per call')
+        parser.add_argument('--baseline', help='JSON results of an earlier run to compare with')
+        parser.add_argument('--max-regression', type=float, default=20.0,
+                            help='Fail if a step is this many percent slower than the baseline')
+        parser.add_argument('--save-baseline', help='Write the results to this JSON file')
+        parser.add_argument('--keep-data', action='store_true', help='Keep the users and applications the run created')
+
+    def handle(self, *args, **options):
+        prefix = f'loadtest-{uuid.uuid4().hex[:8]}'
+        gateway = FakePaystack(options['gateway_port'], options['gateway_latency']).start()
+        server = None
+        base_url = options['base_url'].rstrip('/')
+        try:
+            if options['spawn']:
+                base_url = f"http://localhost:{options['port']}"
+                server = self.spawn_server(options, gateway.url)
+            else:
+                self.stdout.write(f'Server must use PAYSTACK_BASE_URL={gateway.url}')
+            self.wait_until_ready(base_url, server)
+
+            officers = self.create_officers(prefix, options['officers'])
+            emails = [f'{prefix}-{i}@loadtest.example.com' for i in range(options['users'])]
+            self.stdout.write(
+                f"{options['users']} applicants x {options['iterations']} journeys, "
+                f"{options['officers']} officers against {base_url} "
+                f"(gateway latency {options['gateway_latency'] * 1000:.0f} ms)"
+            )
+            results = asyncio.run(run(base_url, emails, officers, options['iterations']))
+        finally:
+            if server is not None:
+                server.terminate()
+                server.wait(timeout=30)
+            gateway.stop()
+            if not options['keep_data']:
+                User.objects.filter(username__startswith=prefix).delete()
+
+        self.report(results)
+
+        if options['save_baseline']:
+            with open(options['save_baseline'], 'w') as f:
+                json.dump(results, f, indent=2)
+            self.stdout.write(f"Results saved to {options['save_baseline']}")
+
+        if options['baseline']:
+            with open(options['baseline']) as f:
+                baseline = json.load(f)
+            regressions = compare(results, baseline, options['max_regression'])
+            for step, metric, before, after, change in regressions:
+                self.stdout.write(self.style.ERROR(
+                    f'{step:<20} {metric} {before:8.1f} ms -> {after:8.1f} ms (+{change:.0f}%)'
+                ))
+            if regressions:
+                raise CommandError(f"{len(regressions)} latencies regressed by more than {options['max_regression']:.0f}%")
+            self.stdout.write(f"No step regressed by more than {options['max_regression']:.0f}% against {options['baseline']}")
+
+        if results['failed_journeys']:
+            raise CommandError(f"{results['failed_journeys']} journeys failed")
+        self.stdout.write(self.style.SUCCESS('✓ Load test complete'))
+
+    def spawn_server(self, options, gateway_url):
+        env = dict(
+            os.environ, **SPAWN_ENV,
+            PORT=str(options['port']),
+            WEB_CONCURRENCY=str(options['workers']),
+            PAYSTACK_BASE_URL=gateway_url,
+        )
+        return subprocess.Popen(
+            [sys.executable, '-m', 'gunicorn', 'immigration_portal.asgi:application'],
+            cwd=settings.BASE_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+
+    def wait_until_ready(self, base_url, server, timeout=60):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if server is not None and server.poll() is not None:
+                raise CommandError(f'Server exited with status {server.returncode}')
+            try:
+                with urlopen(f'{base_url}/api/csrf/', timeout=2):
+                    return
+            except (URLError, OSError):
+                time.sleep(0.5)
+        raise CommandError(f'{base_url} did not respond within {timeout} seconds')
+
+    def create_officers(self, prefix, count):
+        """Reviewers (supervisor role, which may approve) for this run"""
+        usernames = []
+        for i in range(count):
+            user = User.objects.create_user(
+                username=f'{prefix}-officer-{i}', email=f'{prefix}-officer-{i}@loadtest.example.com',
+                password=PASSWORD, first_name='Load', last_name='Officer',
+            )
+            user.profile.role = 'supervisor'
+            user.profile.save()
+            usernames.append(user.username)
+        return usernames
+
+    def report(self, results):
+        self.stdout.write('')
+        self.stdout.write(f"{'step':<20} {'count':>6} {'errors':>6} {'p50':>9} {'p95':>9} {'p99':>9} {'max':>9}")
+        for step, stats in results['steps'].items():
+            if not stats['count']:
+                self.stdout.write(f"{step:<20} {0:>6} {stats['errors']:>6}")
+                continue
+            self.stdout.write(
+                f"{step:<20} {stats['count']:>6} {stats['errors']:>6} {stats['p50_ms']:>6.1f} ms "
+                f"{stats['p95_ms']:>6.1f} ms {stats['p99_ms']:>6.1f} ms {stats['max_ms']:>6.1f} ms"
+            )
+        self.stdout.write('')
+        self.stdout.write(
+            f"{results['requests']} requests in {results['duration_s']:.1f} s "
+            f"({results['throughput_rps']:.1f} req/s), "
+            f"{results['journeys']['applicant']} applicant and {results['journeys']['officer']} officer journeys, "
+            f"{results['failed_journeys']} failed"
+        )
+        for sample in results['sample_errors']:
+            self.stdout.write(self.style.WARNING(f'  {sample}'))
@@ -0,0 +1,23 @@
+"""
+Django management command to remove abandoned resumable uploads
+Run with: python manage.py purge_stale_uploads
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from applications.uploads import purge_stale_uploads
+
+
+class Command(BaseCommand):
+    help = 'Deletes resumable uploads (and their spool files) that were never attached to an application'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--hours', type=int, default=settings.RESUMABLE_UPLOAD_EXPIRY_HOURS,
+            help='Age after which an unattached upload is considered abandoned',
+        )
+
+    def handle(self, *args, **options):
+        count = purge_stale_uploads(timedelta(hours=options['hours']))
+        self.stdout.write(self.style.SUCCESS(f'✓ Removed {count} stale upload(s)'))
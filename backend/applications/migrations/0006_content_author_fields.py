@@ -0,0 +1,36 @@
+# Generated by Django 4.2.7 on 2026-10-19 18:47
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('applications', '0005_remove_gallery'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='blogpost',
+            name='author_name',
+            field=models.CharField(blank=True, default='', help_text='Publisher name (e.g., Juba News Monitor)', max_length=200),
+        ),
+        migrations.AddField(
+            model_name='newsarticle',
+            name='author_name',
+            field=models.CharField(blank=True, default='', help_text='Publisher name (e.g., Juba News Monitor)', max_length=200),
+        ),
+        migrations.AlterField(
+            model_name='blogpost',
+            name='author',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterField(
+            model_name='newsarticle',
+            name='author',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 4.2.7 on 2026-10-19 18:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('applications', '0006_content_author_fields'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='application',
+            name='photo_derivatives',
+            field=models.JSONField(blank=True, default=dict, help_text='Resized renditions of the photo'),
+        ),
+        migrations.AddField(
+            model_name='application',
+            name='signature_derivatives',
+            field=models.JSONField(blank=True, default=dict, help_text='Resized renditions of the signature'),
+        ),
+        migrations.AddField(
+            model_name='blogpost',
+            name='image_derivatives',
+            field=models.JSONField(blank=True, default=dict, help_text='Resized renditions of the image'),
+        ),
+        migrations.AddField(
+            model_name='newsarticle',
+            name='image_derivatives',
+            field=models.JSONField(blank=True, default=dict, help_text='Resized renditions of the image'),
+        ),
+    ]
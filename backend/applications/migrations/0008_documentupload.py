@@ -0,0 +1,38 @@
+# Generated by Django 4.2.7 on 2026-10-19 19:05
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('applications', '0007_image_derivatives'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DocumentUpload',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('token', models.UUIDField(default=uuid.uuid4, editable=False, unique=True)),
+                ('field_name', models.CharField(choices=[('photo', 'Photo'), ('id_copy', 'ID Copy'), ('signature', 'Signature'), ('birth_certificate', 'Birth Certificate'), ('old_document', 'Old Document'), ('police_report', 'Police Report')], max_length=30)),
+                ('filename', models.CharField(max_length=255)),
+                ('content_type', models.CharField(blank=True, default='', max_length=100)),
+                ('size', models.BigIntegerField(help_text='Total size declared by the client, in bytes')),
+                ('offset', models.BigIntegerField(default=0, help_text='Bytes received and acknowledged so far')),
+                ('completed_at', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('application', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='document_uploads', to='applications.application')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='document_uploads', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['application', 'updated_at'], name='application_applica_d9fb07_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,65 @@
+# Generated by Django 4.2.7 on 2026-10-19 19:20
+
+import applications.storage
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('applications', '0008_documentupload'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DocumentBlob',
+            fields=[
+                ('sha256', models.CharField(max_length=64, primary_key=True, serialize=False)),
+                ('name', models.CharField(max_length=255, unique=True)),
+                ('size', models.BigIntegerField()),
+                ('ref_count', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='documentupload',
+            name='sha256',
+            field=models.CharField(blank=True, default='', help_text='Digest declared by the client, used to skip re-uploading known documents', max_length=64),
+        ),
+        migrations.AlterField(
+            model_name='application',
+            name='birth_certificate',
+            field=models.FileField(blank=True, null=True, storage=applications.storage.document_storage, upload_to='documents/certificates/'),
+        ),
+        migrations.AlterField(
+            model_name='application',
+            name='id_copy',
+            field=models.FileField(blank=True, null=True, storage=applications.storage.document_storage, upload_to='documents/ids/'),
+        ),
+        migrations.AlterField(
+            model_name='application',
+            name='old_document',
+            field=models.FileField(blank=True, null=True, storage=applications.storage.document_storage, upload_to='documents/old/'),
+        ),
+        migrations.AlterField(
+            model_name='application',
+            name='photo',
+            field=models.ImageField(blank=True, null=True, storage=applications.storage.document_storage, upload_to='documents/photos/'),
+        ),
+        migrations.AlterField(
+            model_name='application',
+            name='police_report',
+            field=models.FileField(blank=True, null=True, storage=applications.storage.document_storage, upload_to='documents/reports/'),
+        ),
+        migrations.AlterField(
+            model_name='application',
+            name='signature',
+            field=models.ImageField(blank=True, null=True, storage=applications.storage.document_storage, upload_to='documents/signatures/'),
+        ),
+        migrations.AddField(
+            model_name='documentupload',
+            name='blob',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='uploads', to='applications.documentblob'),
+        ),
+    ]
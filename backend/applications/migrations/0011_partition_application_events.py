@@ -0,0 +1,21 @@
+# Generated by Django 4.2.7 on 2026-10-19 19:56
+
+from django.db import migrations
+
+
+def partition_events(apps, schema_editor):
+    from applications.events import partition_event_table
+
+    partition_event_table(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('applications', '0010_application_events'),
+    ]
+
+    operations = [
+        # PostgreSQL only; other databases keep the plain table
+        migrations.RunPython(partition_events, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 4.2.7 on 2026-10-19 20:30
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('applications', '0011_partition_application_events'),
+    ]
+
+    operations = [
+        # Case-insensitive email lookups at login (auth_user.email has no index)
+        migrations.RunSQL(
+            'CREATE INDEX IF NOT EXISTS auth_user_email_lower_idx ON auth_user (lower(email))',
+            'DROP INDEX IF EXISTS auth_user_email_lower_idx',
+        ),
+    ]
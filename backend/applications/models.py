@@ -1,9 +1,16 @@
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth.models import User
 from django.core.exceptions import ValidationError
+from django.utils import timezone
+import logging
 import random
 import string
+import copy
 import hashlib
+import uuid
+from .storage import document_storage
+
+logger = logging.getLogger(__name__)
 
 class UserProfile(models.Model):
     """Extended user profile"""
@@ -42,6 +49,15 @@ class Application(models.Model):
         ('collected', 'Collected'),
     ]
     
+    # Allowed status changes; anything else is refused
+    STATUS_TRANSITIONS = {
+        'pending': ('in-progress', 'approved', 'rejected'),
+        'in-progress': ('approved', 'rejected'),
+        'approved': ('collected',),
+        'rejected': (),
+        'collected': (),
+    }
+    
     PAYMENT_CHOICES = [
         ('pending', 'Pending'),
         ('completed', 'Completed'),
@@ -126,12 +142,14 @@ class Application(models.Model):
     replacement_reason = models.CharField(max_length=20, choices=REPLACEMENT_REASON_CHOICES, null=True, blank=True)
     
     # Document Attachments
-    photo = models.ImageField(upload_to='documents/photos/', null=True, blank=True)
-    id_copy = models.FileField(upload_to='documents/ids/', null=True, blank=True)
-    signature = models.ImageField(upload_to='documents/signatures/', null=True, blank=True)
-    birth_certificate = models.FileField(upload_to='documents/certificates/', null=True, blank=True)
-    old_document = models.FileField(upload_to='documents/old/', null=True, blank=True)
-    police_report = models.FileField(upload_to='documents/reports/', null=True, blank=True)
+    photo = models.ImageField(upload_to='documents/photos/', storage=document_storage, null=True, blank=True)
+    id_copy = models.FileField(upload_to='documents/ids/', storage=document_storage, null=True, blank=True)
+    signature = models.ImageField(upload_to='documents/signatures/', storage=document_storage, null=True, blank=True)
+    birth_certificate = models.FileField(upload_to='documents/certificates/', storage=document_storage, null=True, blank=True)
+    old_document = models.FileField(upload_to='documents/old/', storage=document_storage, null=True, blank=True)
+    police_report = models.FileField(upload_to='documents/reports/', storage=document_storage, null=True, blank=True)
+    photo_derivatives = models.JSONField(default=dict, blank=True, help_text="Resized renditions of the photo")
+    signature_derivatives = models.JSONField(default=dict, blank=True, help_text="Resized renditions of the signature")
     civil_registry_number = models.CharField(max_length=100, null=True, blank=True)
     
     # Payment Information
@@ -198,7 +216,7 @@ class Application(models.Model):
             return hasher.hexdigest()
         except Exception as e:
             # If hash calculation fails, return None (don't block the save)
-            print(f"Error calculating file hash: {e}")
+            logger.warning(f"Error calculating file hash: {e}")
             return None
     
     def _check_duplicate_payment_proof(self):
@@ -228,9 +246,140 @@ class Application(models.Model):
                 raise
             except Exception as e:
                 # Don't block save if hash check fails
-                print(f"Error checking duplicate payment proof: {e}")
+                logger.warning(f"Error checking duplicate payment proof for {self.confirmation_number}: {e}")
+
+    @classmethod
+    def receipt_holders(cls, applications):
+        """
+        Applications holding the payment receipts of ``applications``, in one query
+
+        Returns:
+            dict: payment_proof_hash -> list of dicts with pk, confirmation_number,
+            status and application_type (including the applications themselves)
+        """
+        hashes = {application.payment_proof_hash for application in applications if application.payment_proof_hash}
+        holders = {}
+        if hashes:
+            rows = cls.objects.filter(payment_proof_hash__in=hashes).values(
+                'pk', 'payment_proof_hash', 'confirmation_number', 'status', 'application_type'
+            )
+            for row in rows:
+                holders.setdefault(row.pop('payment_proof_hash'), []).append(row)
+        return holders
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._snapshot()
+        return instance
+    
+    def refresh_from_db(self, using=None, fields=None):
+        super().refresh_from_db(using=using, fields=fields)
+        if fields is None or not hasattr(self, '_loaded_values'):
+            self._snapshot()
+            return
+        # Loading a deferred field must not mark other pending changes as saved
+        for name in fields:
+            field = self._meta.get_field(name)
+            self._loaded_values[field.attname] = self._tracked_value(field)
+    
+    def _tracked_value(self, field):
+        """Comparable value of a field for dirty tracking"""
+        value = getattr(self, field.attname)
+        if isinstance(field, models.FileField):
+            if not getattr(value, '_committed', True):
+                # A newly assigned file is always a change
+                return object()
+            return value.name or None
+        return copy.deepcopy(value) if isinstance(value, (dict, list)) else value
+    
+    def _snapshot(self):
+        """Remember the loaded column values so save() can write only the changed ones"""
+        self._loaded_values = {
+            field.attname: self._tracked_value(field)
+            for field in self._meta.concrete_fields
+            if field.attname in self.__dict__
+        }
+    
+    def loaded_value(self, field_name, default=None):
+        """Value a field had when the instance was loaded or last saved"""
+        field = self._meta.get_field(field_name)
+        return getattr(self, '_loaded_values', {}).get(field.attname, default)
+    
+    def get_dirty_fields(self):
+        """
+        Names of the fields changed since the instance was loaded or saved
+        
+        Returns None for instances that were not loaded from the database.
+        """
+        loaded = getattr(self, '_loaded_values', None)
+        if loaded is None or self._state.adding:
+            return None
+        dirty = []
+        for field in self._meta.concrete_fields:
+            if field.primary_key or field.attname not in self.__dict__:
+                continue
+            if field.attname not in loaded or self._tracked_value(field) != loaded[field.attname]:
+                dirty.append(field.name)
+        return dirty
+    
+    # User recorded on the events written by save() and transition()
+    event_actor = None
+    
+    def can_transition(self, new_status):
+        """True if the state machine allows moving from the current status to ``new_status``"""
+        return new_status in self.STATUS_TRANSITIONS.get(self.status, ())
+    
+    def transition(self, new_status, **changes):
+        """
+        Move the application to ``new_status`` with a conditional UPDATE
+        
+        The row is only updated if its status is still the one this instance
+        holds, so of two reviewers acting at once exactly one wins and no row
+        lock is taken. ``changes`` are written in the same statement.
+        
+        Returns:
+            bool: True if this call performed the transition, False if the
+            status was changed by someone else in the meantime
+        
+        Raises:
+            ValidationError: If the transition is not allowed
+        """
+        if not self.can_transition(new_status):
+            raise ValidationError(
+                f"Cannot change status from {self.get_status_display()} to {dict(self.STATUS_CHOICES).get(new_status, new_status)}"
+            )
+        
+        from .cache import STATISTICS_TAG, invalidate_tags_on_commit
+        from .events import build_events, record
+        
+        changes.update(status=new_status, updated_at=timezone.now())
+        previous = {'status': self.status}
+        with transaction.atomic():
+            won = Application.objects.filter(pk=self.pk, status=self.status).update(**changes)
+            if not won:
+                return False
+            self.status = new_status
+            record(build_events(self, ['status'], previous, self.event_actor))
+            # A queryset update sends no post_save for signals.py to act on
+            invalidate_tags_on_commit(STATISTICS_TAG)
+        
+        for name, value in changes.items():
+            setattr(self, name, value)
+            if hasattr(self, '_loaded_values'):
+                field = self._meta.get_field(name)
+                self._loaded_values[field.attname] = self._tracked_value(field)
+        return True
     
     def save(self, *args, **kwargs):
+        # Only write the columns that changed (plus updated_at)
+        dirty = self.get_dirty_fields()
+        if (dirty is not None and kwargs.get('update_fields') is None
+                and not kwargs.get('force_insert') and not args):
+            kwargs['update_fields'] = dirty + ['updated_at']
+        update_fields = kwargs.get('update_fields')
+        update_fields = set(update_fields) if update_fields is not None else None
+        
         # Generate confirmation number if needed
         if not self.confirmation_number:
             # Use current time for new applications
@@ -249,17 +398,125 @@ class Application(models.Model):
                     break
             
             self.confirmation_number = conf_num
+            if update_fields is not None:
+                update_fields.add('confirmation_number')
         
-        # Check for duplicate payment proof (only if payment_proof exists)
-        if self.payment_proof:
+        # Check for duplicate payment proof, but only hash it when it changed
+        proof_changed = dirty is None or 'payment_proof' in dirty
+        if self.payment_proof and proof_changed and (update_fields is None or 'payment_proof' in update_fields):
+            previous_hash = self.payment_proof_hash
             self._check_duplicate_payment_proof()
+            if update_fields is not None and self.payment_proof_hash != previous_hash:
+                update_fields.add('payment_proof_hash')
+        
+        if update_fields is not None:
+            kwargs['update_fields'] = update_fields
         
-        super().save(*args, **kwargs)
+        from .events import build_events, record
+        
+        adding = self._state.adding
+        previous = getattr(self, '_loaded_values', {})
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if adding:
+                record([ApplicationEvent(
+                    application_id=self.pk, actor_id=getattr(self.event_actor, 'pk', None) or self.user_id,
+                    kind='created', new_value=self.status,
+                )])
+            elif dirty is not None:
+                changed = [f for f in dirty if update_fields is None or f in update_fields]
+                record(build_events(self, changed, previous, self.event_actor))
+        self._snapshot()
     
     def __str__(self):
         return f"{self.confirmation_number} - {self.get_application_type_display()}"
 
 
+class ApplicationEvent(models.Model):
+    """
+    Append-only history of status, payment and document changes
+    
+    On PostgreSQL the table is range-partitioned by month on ``created_at``
+    (see ``applications.events``). Events are never updated, and they outlive
+    the application and the user they refer to, so neither foreign key is
+    enforced by the database.
+    """
+    KIND_CHOICES = [
+        ('created', 'Created'),
+        ('status', 'Status'),
+        ('payment', 'Payment'),
+        ('document', 'Document'),
+    ]
+    
+    application = models.ForeignKey(
+        Application, on_delete=models.DO_NOTHING, db_constraint=False, related_name='events'
+    )
+    actor = models.ForeignKey(
+        User, on_delete=models.DO_NOTHING, db_constraint=False, null=True, blank=True, related_name='+'
+    )
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    field = models.CharField(max_length=50, blank=True)
+    old_value = models.TextField(null=True, blank=True)
+    new_value = models.TextField(null=True, blank=True)
+    created_at = models.DateTimeField(default=timezone.now)
+    
+    class Meta:
+        ordering = ['created_at', 'id']
+        indexes = [
+            models.Index(fields=['application', 'created_at'], name='app_event_timeline_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.application_id} {self.field or self.kind}: {self.old_value} -> {self.new_value}"
+
+
+class DocumentBlob(models.Model):
+    """Document bytes stored once by SHA-256 and shared by every application that uploaded them"""
+    sha256 = models.CharField(max_length=64, primary_key=True)
+    name = models.CharField(max_length=255, unique=True)
+    size = models.BigIntegerField()
+    ref_count = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    def __str__(self):
+        return f"{self.name} ({self.ref_count} references)"
+
+
+class DocumentUpload(models.Model):
+    """Chunked, resumable upload of an application document"""
+    FIELD_CHOICES = [
+        ('photo', 'Photo'),
+        ('id_copy', 'ID Copy'),
+        ('signature', 'Signature'),
+        ('birth_certificate', 'Birth Certificate'),
+        ('old_document', 'Old Document'),
+        ('police_report', 'Police Report'),
+    ]
+    
+    token = models.UUIDField(default=uuid.uuid4, unique=True, editable=False)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='document_uploads')
+    field_name = models.CharField(max_length=30, choices=FIELD_CHOICES)
+    filename = models.CharField(max_length=255)
+    content_type = models.CharField(max_length=100, blank=True, default='')
+    sha256 = models.CharField(max_length=64, blank=True, default='', help_text="Digest declared by the client, used to skip re-uploading known documents")
+    blob = models.ForeignKey(DocumentBlob, on_delete=models.SET_NULL, null=True, blank=True, related_name='uploads')
+    size = models.BigIntegerField(help_text="Total size declared by the client, in bytes")
+    offset = models.BigIntegerField(default=0, help_text="Bytes received and acknowledged so far")
+    completed_at = models.DateTimeField(null=True, blank=True)
+    application = models.ForeignKey(Application, on_delete=models.SET_NULL, null=True, blank=True, related_name='document_uploads')
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['application', 'updated_at']),
+        ]
+    
+    def __str__(self):
+        return f"{self.filename} ({self.offset}/{self.size})"
+
+
 class NewsArticle(models.Model):
     """News articles for the homepage"""
     title = models.CharField(max_length=200)
@@ -269,6 +526,7 @@ class NewsArticle(models.Model):
     excerpt = models.CharField(max_length=300, help_text="Short summary for preview")
     excerpt_ar = models.CharField(max_length=300, blank=True, help_text="Arabic translation of excerpt")
     image = models.ImageField(upload_to='news/', null=True, blank=True)
+    image_derivatives = models.JSONField(default=dict, blank=True, help_text="Resized renditions of the image")
     author = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True)
     author_name = models.CharField(max_length=200, blank=True, default='', help_text="Publisher name (e.g., Juba News Monitor)")
     published = models.BooleanField(default=True)
@@ -294,6 +552,7 @@ class BlogPost(models.Model):
     excerpt = models.CharField(max_length=300, help_text="Short summary for preview")
     excerpt_ar = models.CharField(max_length=300, blank=True, help_text="Arabic translation of excerpt")
     image = models.ImageField(upload_to='blog/', null=True, blank=True)
+    image_derivatives = models.JSONField(default=dict, blank=True, help_text="Resized renditions of the image")
     author = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True)
     author_name = models.CharField(max_length=200, blank=True, default='', help_text="Publisher name (e.g., Juba News Monitor)")
     category = models.CharField(max_length=100, blank=True, help_text="e.g., Tips, Updates, Guides")
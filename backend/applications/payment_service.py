@@ -1,15 +1,58 @@
 """
 Paystack Payment Integration Service
 """
+import asyncio
+import contextlib
+import logging
 import requests
+import httpx
 from decimal import Decimal
 from decouple import config
+from immigration_portal.metrics import PAYSTACK_ERRORS, PAYSTACK_LATENCY
+from immigration_portal.timing import timed
+
+logger = logging.getLogger(__name__)
+
+ASYNC_TIMEOUT = httpx.Timeout(30.0, connect=10.0)
+
+# The ASGI server's event loop and the pooled client kept for it. An
+# AsyncClient cannot be shared between loops, and under WSGI every async view
+# runs in a short-lived loop of its own, which gets a client per call instead.
+_shared_loop = None
+_shared_client = None
+
+
+def share_async_client():
+    """Keep one pooled client for the running loop (called at ASGI startup)"""
+    global _shared_loop
+    _shared_loop = asyncio.get_running_loop()
+
+
+async def aclose_async_client():
+    """Close the shared client (called at ASGI shutdown)"""
+    global _shared_loop, _shared_client
+    client, _shared_client, _shared_loop = _shared_client, None, None
+    if client is not None:
+        await client.aclose()
+
+
+@contextlib.asynccontextmanager
+async def _async_client():
+    global _shared_client
+    if _shared_loop is not None and _shared_loop is asyncio.get_running_loop():
+        if _shared_client is None:
+            _shared_client = httpx.AsyncClient(timeout=ASYNC_TIMEOUT)
+        yield _shared_client
+        return
+    async with httpx.AsyncClient(timeout=ASYNC_TIMEOUT) as client:
+        yield client
 
 
 class PaystackService:
     """Handle Paystack payment operations"""
     
-    BASE_URL = "https://api.paystack.co"
+    # Overridable so load tests can point at a fake gateway
+    BASE_URL = config('PAYSTACK_BASE_URL', default="https://api.paystack.co")
     
     def __init__(self):
         self.secret_key = config('PAYSTACK_SECRET_KEY', default='')
@@ -18,11 +61,8 @@ class PaystackService:
             'Content-Type': 'application/json'
         }
         
-        # Debug: Print first few characters of key (for troubleshooting)
-        if self.secret_key:
-            print(f"Paystack key loaded: {self.secret_key[:7]}...")
-        else:
-            print("WARNING: Paystack secret key not found!")
+        if not self.secret_key:
+            logger.warning("Paystack secret key not found!")
     
     def initialize_transaction(self, email, amount, reference, callback_url=None):
         """
@@ -37,6 +77,50 @@ class PaystackService:
         Returns:
             dict: Response with authorization_url and access_code
         """
+        url, payload = self._initialize_request(email, amount, reference, callback_url)
+        
+        try:
+            with timed('paystack'), PAYSTACK_LATENCY.labels('initialize').time():
+                response = requests.post(url, json=payload, headers=self.headers)
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(f"Paystack response {response.status_code}: {response.text}")
+            response.raise_for_status()
+            return response.json()
+        except requests.exceptions.RequestException as e:
+            PAYSTACK_ERRORS.labels('initialize').inc()
+            error_detail = response.text if 'response' in locals() else str(e)
+            logger.warning(f"Paystack transaction/initialize failed: {e}", extra={'detail': error_detail})
+            return {
+                'status': False,
+                'message': f'Payment initialization failed: {str(e)}',
+                'detail': error_detail
+            }
+    
+    async def ainitialize_transaction(self, email, amount, reference, callback_url=None):
+        """Async version of initialize_transaction; the worker is not held while Paystack answers"""
+        url, payload = self._initialize_request(email, amount, reference, callback_url)
+        
+        response = None
+        try:
+            with timed('paystack'), PAYSTACK_LATENCY.labels('initialize').time():
+                async with _async_client() as client:
+                    response = await client.post(url, json=payload, headers=self.headers)
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(f"Paystack response {response.status_code}: {response.text}")
+            response.raise_for_status()
+            return response.json()
+        except httpx.HTTPError as e:
+            PAYSTACK_ERRORS.labels('initialize').inc()
+            error_detail = response.text if response is not None else str(e)
+            logger.warning(f"Paystack transaction/initialize failed: {e}", extra={'detail': error_detail})
+            return {
+                'status': False,
+                'message': f'Payment initialization failed: {str(e)}',
+                'detail': error_detail
+            }
+    
+    def _initialize_request(self, email, amount, reference, callback_url):
+        """URL and payload for transaction/initialize"""
         url = f"{self.BASE_URL}/transaction/initialize"
         
         # Convert amount to kobo (smallest currency unit)
@@ -52,25 +136,8 @@ class PaystackService:
         if callback_url:
             payload["callback_url"] = callback_url
         
-        # Debug logging
-        print(f"Paystack Request URL: {url}")
-        print(f"Paystack Payload: {payload}")
-        print(f"Paystack Headers: Authorization: Bearer {self.secret_key[:10]}...")
-        
-        try:
-            response = requests.post(url, json=payload, headers=self.headers)
-            print(f"Paystack Response Status: {response.status_code}")
-            print(f"Paystack Response Body: {response.text}")
-            response.raise_for_status()
-            return response.json()
-        except requests.exceptions.RequestException as e:
-            error_detail = response.text if 'response' in locals() else str(e)
-            print(f"Paystack Error Detail: {error_detail}")
-            return {
-                'status': False,
-                'message': f'Payment initialization failed: {str(e)}',
-                'detail': error_detail
-            }
+        logger.debug(f"Paystack request {url}", extra={'payload': payload})
+        return url, payload
     
     def verify_transaction(self, reference):
         """
@@ -85,10 +152,29 @@ class PaystackService:
         url = f"{self.BASE_URL}/transaction/verify/{reference}"
         
         try:
-            response = requests.get(url, headers=self.headers)
+            with timed('paystack'), PAYSTACK_LATENCY.labels('verify').time():
+                response = requests.get(url, headers=self.headers)
             response.raise_for_status()
             return response.json()
         except requests.exceptions.RequestException as e:
+            PAYSTACK_ERRORS.labels('verify').inc()
+            return {
+                'status': False,
+                'message': f'Verification failed: {str(e)}'
+            }
+    
+    async def averify_transaction(self, reference):
+        """Async version of verify_transaction"""
+        url = f"{self.BASE_URL}/transaction/verify/{reference}"
+        
+        try:
+            with timed('paystack'), PAYSTACK_LATENCY.labels('verify').time():
+                async with _async_client() as client:
+                    response = await client.get(url, headers=self.headers)
+            response.raise_for_status()
+            return response.json()
+        except httpx.HTTPError as e:
+            PAYSTACK_ERRORS.labels('verify').inc()
             return {
                 'status': False,
                 'message': f'Verification failed: {str(e)}'
@@ -107,10 +193,12 @@ class PaystackService:
         url = f"{self.BASE_URL}/transaction/{transaction_id}"
         
         try:
-            response = requests.get(url, headers=self.headers)
+            with timed('paystack'), PAYSTACK_LATENCY.labels('get_transaction').time():
+                response = requests.get(url, headers=self.headers)
             response.raise_for_status()
             return response.json()
         except requests.exceptions.RequestException as e:
+            PAYSTACK_ERRORS.labels('get_transaction').inc()
             return {
                 'status': False,
                 'message': f'Failed to get transaction: {str(e)}'
@@ -134,10 +222,12 @@ class PaystackService:
         }
         
         try:
-            response = requests.get(url, headers=self.headers, params=params)
+            with timed('paystack'), PAYSTACK_LATENCY.labels('list_transactions').time():
+                response = requests.get(url, headers=self.headers, params=params)
             response.raise_for_status()
             return response.json()
         except requests.exceptions.RequestException as e:
+            PAYSTACK_ERRORS.labels('list_transactions').inc()
             return {
                 'status': False,
                 'message': f'Failed to list transactions: {str(e)}'
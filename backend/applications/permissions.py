@@ -0,0 +1,34 @@
+"""
+Role-based permissions built on the profile loaded with the session user
+"""
+from rest_framework.permissions import IsAuthenticated
+
+# Roles allowed to approve/reject applications and verify payments
+REVIEWER_ROLES = ('admin', 'supervisor')
+# Roles that can see every application
+STAFF_ROLES = ('admin', 'officer', 'supervisor')
+
+
+def user_role(user):
+    """Role of a user, or None when they have no profile"""
+    profile = getattr(user, 'profile', None)
+    return getattr(profile, 'role', None)
+
+
+class HasRole(IsAuthenticated):
+    """Allow authenticated users whose profile role is in ``roles``"""
+    roles = ()
+    message = 'Permission denied'
+
+    def has_permission(self, request, view):
+        return super().has_permission(request, view) and user_role(request.user) in self.roles
+
+
+class IsReviewer(HasRole):
+    """Admin or supervisor"""
+    roles = REVIEWER_ROLES
+
+
+class IsStaffRole(HasRole):
+    """Admin, officer or supervisor"""
+    roles = STAFF_ROLES
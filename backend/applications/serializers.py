@@ -1,57 +1,42 @@
 from rest_framework import serializers
 from django.contrib.auth.models import User
 from django.core.exceptions import ValidationError
-from django.core.validators import EmailValidator
-from .models import UserProfile, Application, NewsArticle, BlogPost
+from django.db import models
+from immigration_portal.media import signed_url
+from immigration_portal.timing import timed
+from .models import UserProfile, Application, ApplicationEvent, DocumentUpload, NewsArticle, BlogPost
+from .images import srcset_for
+from . import validators
+from collections.abc import Mapping
 import re
 
-class UserSerializer(serializers.ModelSerializer):
+
+class TimedModelSerializer(serializers.ModelSerializer):
+    """ModelSerializer whose output time shows up in the Server-Timing header"""
+    
+    def to_representation(self, instance):
+        with timed('serialize'):
+            return super().to_representation(instance)
+
+
+class UserSerializer(TimedModelSerializer):
     def validate_email(self, value):
         """Validate email format"""
-        email_validator = EmailValidator()
-        try:
-            email_validator(value)
-        except ValidationError:
-            raise serializers.ValidationError("Please enter a valid email address")
-        return value.lower()
+        return validators.validate_email_address(value)
     
     def validate_first_name(self, value):
         """Validate first name - only letters, must start with capital"""
-        if not value:
-            raise serializers.ValidationError("First name is required")
-        
-        if len(value) < 2:
-            raise serializers.ValidationError("First name must be at least 2 characters")
-        
-        if not re.match(r'^[A-Za-z\s\-\']+$', value):
-            raise serializers.ValidationError("First name can only contain letters, spaces, hyphens, and apostrophes")
-        
-        if not value[0].isupper():
-            raise serializers.ValidationError("First name must start with a capital letter")
-        
-        return value
+        return validators.validate_first_name(value)
     
     def validate_last_name(self, value):
         """Validate last name - only letters, must start with capital"""
-        if not value:
-            raise serializers.ValidationError("Last name is required")
-        
-        if len(value) < 2:
-            raise serializers.ValidationError("Last name must be at least 2 characters")
-        
-        if not re.match(r'^[A-Za-z\s\-\']+$', value):
-            raise serializers.ValidationError("Last name can only contain letters, spaces, hyphens, and apostrophes")
-        
-        if not value[0].isupper():
-            raise serializers.ValidationError("Last name must start with a capital letter")
-        
-        return value
+        return validators.validate_last_name(value)
     
     class Meta:
         model = User
         fields = ['id', 'username', 'email', 'first_name', 'last_name']
 
-class UserProfileSerializer(serializers.ModelSerializer):
+class UserProfileSerializer(TimedModelSerializer):
     user = UserSerializer(read_only=True)
     
     class Meta:
@@ -66,22 +51,29 @@ class RegisterSerializer(serializers.Serializer):
     last_name = serializers.CharField(max_length=150)
     phone_number = serializers.CharField(max_length=20)
     
+    def to_internal_value(self, data):
+        if not isinstance(data, Mapping):
+            # DRF's "Expected a dictionary" error
+            return super().to_internal_value(data)
+        # One query checks both the username and the email
+        username, email = data.get('username'), data.get('email')
+        self._registered = validators.find_registered(
+            [username] if isinstance(username, str) else [],
+            [email] if isinstance(email, str) else [],
+        )
+        return super().to_internal_value(data)
+    
     def validate_username(self, value):
-        if User.objects.filter(username=value).exists():
-            raise serializers.ValidationError('This email is already registered. Please login instead.')
+        if value in self._registered[0]:
+            raise serializers.ValidationError(validators.ALREADY_REGISTERED)
         return value
     
     def validate_email(self, value):
         """Validate email format"""
-        email_validator = EmailValidator()
-        try:
-            email_validator(value)
-        except ValidationError:
-            raise serializers.ValidationError("Please enter a valid email address")
-        
-        if User.objects.filter(email=value).exists():
-            raise serializers.ValidationError('This email is already registered. Please login instead.')
-        return value.lower()
+        value = validators.validate_email_address(value)
+        if value in self._registered[1]:
+            raise serializers.ValidationError(validators.ALREADY_REGISTERED)
+        return value
     
     def validate_password(self, value):
         """
@@ -92,64 +84,19 @@ class RegisterSerializer(serializers.Serializer):
         - At least one digit
         - At least one special character
         """
-        if len(value) < 6:
-            raise serializers.ValidationError('Password must be at least 6 characters long')
-        
-        if not re.search(r'[A-Z]', value):
-            raise serializers.ValidationError('Password must contain at least one uppercase letter')
-        
-        if not re.search(r'[a-z]', value):
-            raise serializers.ValidationError('Password must contain at least one lowercase letter')
-        
-        if not re.search(r'[0-9]', value):
-            raise serializers.ValidationError('Password must contain at least one digit')
-        
-        if not re.search(r'[!@#$%^&*()_+\-=\[\]{};\':"\\|,.<>\/?]', value):
-            raise serializers.ValidationError('Password must contain at least one special character (!@#$%^&*...)')
-        
-        return value
+        return validators.validate_password_strength(value)
     
     def validate_first_name(self, value):
         """Validate first name - only letters, must start with capital"""
-        if not value:
-            raise serializers.ValidationError("First name is required")
-        
-        if len(value) < 2:
-            raise serializers.ValidationError("First name must be at least 2 characters")
-        
-        if not re.match(r'^[A-Za-z\s\-\']+$', value):
-            raise serializers.ValidationError("First name can only contain letters, spaces, hyphens, and apostrophes")
-        
-        if not value[0].isupper():
-            raise serializers.ValidationError("First name must start with a capital letter")
-        
-        return value
+        return validators.validate_first_name(value)
     
     def validate_last_name(self, value):
         """Validate last name - only letters, must start with capital"""
-        if not value:
-            raise serializers.ValidationError("Last name is required")
-        
-        if len(value) < 2:
-            raise serializers.ValidationError("Last name must be at least 2 characters")
-        
-        if not re.match(r'^[A-Za-z\s\-\']+$', value):
-            raise serializers.ValidationError("Last name can only contain letters, spaces, hyphens, and apostrophes")
-        
-        if not value[0].isupper():
-            raise serializers.ValidationError("Last name must start with a capital letter")
-        
-        return value
+        return validators.validate_last_name(value)
     
     def validate_phone_number(self, value):
         """Validate phone number - 10-15 digits"""
-        # Remove spaces and dashes
-        clean_phone = re.sub(r'[\s\-]', '', value)
-        
-        if not re.match(r'^\+?[0-9]{10,15}$', clean_phone):
-            raise serializers.ValidationError("Please enter a valid phone number (10-15 digits)")
-        
-        return value
+        return validators.validate_phone_number(value)
     
     def create(self, validated_data):
         phone_number = validated_data.pop('phone_number')
@@ -163,32 +110,77 @@ class LoginSerializer(serializers.Serializer):
     username = serializers.CharField()
     password = serializers.CharField(write_only=True)
 
-class ApplicationSerializer(serializers.ModelSerializer):
+class SignedFileField(serializers.FileField):
+    """File field that links to application documents through signed, expiring URLs"""
+    
+    def to_representation(self, value):
+        if not value:
+            return None
+        url = signed_url(value.name, value.storage)
+        request = self.context.get('request', None)
+        if request is not None:
+            return request.build_absolute_uri(url)
+        return url
+
+class SignedImageField(SignedFileField, serializers.ImageField):
+    pass
+
+class ApplicationSerializerList(serializers.ListSerializer):
+    """Looks up duplicate payment receipts for the whole list in one query"""
+
+    def to_representation(self, data):
+        applications = list(data.all() if isinstance(data, models.manager.BaseManager) else data)
+        self.child.receipt_holders = Application.receipt_holders(applications)
+        return super().to_representation(applications)
+
+class ApplicationSerializer(TimedModelSerializer):
+    serializer_field_mapping = {
+        **serializers.ModelSerializer.serializer_field_mapping,
+        models.FileField: SignedFileField,
+        models.ImageField: SignedImageField,
+    }
+
     user_details = UserSerializer(source='user', read_only=True)
     reviewed_by_details = UserSerializer(source='reviewed_by', read_only=True)
     duplicate_receipt_warning = serializers.SerializerMethodField()
+    photo_srcset = serializers.SerializerMethodField()
+    signature_srcset = serializers.SerializerMethodField()
     
     class Meta:
         model = Application
         fields = '__all__'
-        read_only_fields = ['confirmation_number', 'user', 'reviewed_by', 'reviewed_at', 'approved_pdf', 'payment_proof_hash']
+        read_only_fields = ['confirmation_number', 'user', 'reviewed_by', 'reviewed_at', 'approved_pdf', 'payment_proof_hash',
+                            'photo_derivatives', 'signature_derivatives']
+        list_serializer_class = ApplicationSerializerList
+
+    # Set by ApplicationSerializerList when serializing many applications
+    receipt_holders = None
+    
+    def get_photo_srcset(self, obj):
+        """Resized renditions of the photo, keyed by format and width"""
+        return srcset_for(obj.photo, obj.photo_derivatives, signed_url)
+    
+    def get_signature_srcset(self, obj):
+        """Resized renditions of the signature, keyed by format and width"""
+        return srcset_for(obj.signature, obj.signature_derivatives, signed_url)
     
     def get_duplicate_receipt_warning(self, obj):
         """Check if payment receipt is duplicated"""
         if obj.payment_proof_hash:
-            duplicates = Application.objects.filter(
-                payment_proof_hash=obj.payment_proof_hash
-            ).exclude(pk=obj.pk)
-            
-            if duplicates.exists():
+            holders = self.receipt_holders
+            if holders is None:
+                holders = Application.receipt_holders([obj])
+            duplicates = [dup for dup in holders.get(obj.payment_proof_hash, []) if dup['pk'] != obj.pk]
+
+            if duplicates:
                 return {
                     'is_duplicate': True,
                     'message': 'This payment receipt has been used in other applications',
                     'duplicate_applications': [
                         {
-                            'confirmation_number': dup.confirmation_number,
-                            'status': dup.status,
-                            'application_type': dup.application_type
+                            'confirmation_number': dup['confirmation_number'],
+                            'status': dup['status'],
+                            'application_type': dup['application_type']
                         }
                         for dup in duplicates
                     ]
@@ -216,7 +208,7 @@ class ApplicationSerializer(serializers.ModelSerializer):
                 raise DRFValidationError({'payment_proof': e.messages[0]})
             raise DRFValidationError({'error': str(e)})
 
-class ApplicationListSerializer(serializers.ModelSerializer):
+class ApplicationListSerializer(TimedModelSerializer):
     user_details = UserSerializer(source='user', read_only=True)
     
     class Meta:
@@ -225,8 +217,50 @@ class ApplicationListSerializer(serializers.ModelSerializer):
                  'last_name', 'email', 'phone_number', 'payment_status', 'created_at', 'user_details']
 
 
-class NewsArticleSerializer(serializers.ModelSerializer):
+class ApplicationEventSerializer(TimedModelSerializer):
+    actor_name = serializers.SerializerMethodField()
+    
+    class Meta:
+        model = ApplicationEvent
+        fields = ['id', 'kind', 'field', 'old_value', 'new_value', 'actor', 'actor_name', 'created_at']
+    
+    def get_actor_name(self, obj):
+        if obj.actor is None:
+            return None
+        return obj.actor.get_full_name() or obj.actor.username
+
+
+class DocumentUploadSerializer(TimedModelSerializer):
+    field = serializers.ChoiceField(source='field_name', choices=DocumentUpload.FIELD_CHOICES)
+    size = serializers.IntegerField(min_value=1)
+    completed = serializers.SerializerMethodField()
+    
+    class Meta:
+        model = DocumentUpload
+        fields = ['token', 'field', 'filename', 'content_type', 'sha256', 'size', 'offset', 'completed', 'created_at']
+        read_only_fields = ['token', 'offset', 'completed', 'created_at']
+    
+    def validate_sha256(self, value):
+        value = value.lower()
+        if value and not re.match(r'^[0-9a-f]{64}$', value):
+            raise serializers.ValidationError('sha256 must be a hex-encoded SHA-256 digest')
+        return value
+    
+    def get_completed(self, obj):
+        return obj.completed_at is not None
+    
+    def validate_size(self, value):
+        from django.conf import settings
+        if value > settings.RESUMABLE_UPLOAD_MAX_SIZE:
+            raise serializers.ValidationError(
+                f'File is too large (maximum {settings.RESUMABLE_UPLOAD_MAX_SIZE // (1024 * 1024)} MB)'
+            )
+        return value
+
+
+class NewsArticleSerializer(TimedModelSerializer):
     image_url = serializers.SerializerMethodField()
+    image_srcset = serializers.SerializerMethodField()
     
     def get_image_url(self, obj):
         """Safely get image URL"""
@@ -237,15 +271,20 @@ class NewsArticleSerializer(serializers.ModelSerializer):
             return None
         return None
     
+    def get_image_srcset(self, obj):
+        """Resized renditions of the image, keyed by format and width"""
+        return srcset_for(obj.image, obj.image_derivatives)
+    
     class Meta:
         model = NewsArticle
         fields = ['id', 'title', 'title_ar', 'content', 'content_ar', 'excerpt', 'excerpt_ar', 
-                 'image', 'image_url', 'author', 'author_name', 'published', 'featured', 'created_at', 'updated_at']
-        read_only_fields = ['author', 'created_at', 'updated_at', 'image_url']
+                 'image', 'image_url', 'image_srcset', 'author', 'author_name', 'published', 'featured', 'created_at', 'updated_at']
+        read_only_fields = ['author', 'created_at', 'updated_at', 'image_url', 'image_srcset']
 
 
-class BlogPostSerializer(serializers.ModelSerializer):
+class BlogPostSerializer(TimedModelSerializer):
     image_url = serializers.SerializerMethodField()
+    image_srcset = serializers.SerializerMethodField()
     
     def get_image_url(self, obj):
         """Safely get image URL"""
@@ -256,12 +295,16 @@ class BlogPostSerializer(serializers.ModelSerializer):
             return None
         return None
     
+    def get_image_srcset(self, obj):
+        """Resized renditions of the image, keyed by format and width"""
+        return srcset_for(obj.image, obj.image_derivatives)
+    
     class Meta:
         model = BlogPost
         fields = ['id', 'title', 'title_ar', 'content', 'content_ar', 'excerpt', 'excerpt_ar', 
-                 'image', 'image_url', 'author', 'author_name', 'category', 'published', 'featured', 
+                 'image', 'image_url', 'image_srcset', 'author', 'author_name', 'category', 'published', 'featured', 
                  'created_at', 'updated_at']
-        read_only_fields = ['author', 'created_at', 'updated_at', 'image_url']
+        read_only_fields = ['author', 'created_at', 'updated_at', 'image_url', 'image_srcset']
 
 
 
@@ -1,7 +1,11 @@
-from django.db.models.signals import post_save
+from django.db.models.signals import pre_save, post_save, post_delete
 from django.dispatch import receiver
 from django.contrib.auth.models import User
-from .models import UserProfile
+from .models import UserProfile, Application, NewsArticle, BlogPost
+from .cache import BLOG_TAG, NEWS_TAG, STATISTICS_TAG, invalidate_tags_on_commit, user_tag
+from .images import refresh_derivatives, delete_derivatives
+from .uploads import DOCUMENT_FIELDS
+from .tasks import APPLICATION_IMAGES, enqueue, ingest_application_images
 
 @receiver(post_save, sender=User)
 def create_user_profile(sender, instance, created, **kwargs):
@@ -13,7 +17,99 @@ def create_user_profile(sender, instance, created, **kwargs):
         )
 
 @receiver(post_save, sender=User)
-def save_user_profile(sender, instance, **kwargs):
+def save_user_profile(sender, instance, update_fields=None, **kwargs):
     """Save UserProfile when User is saved"""
+    if update_fields is not None and set(update_fields) <= {'last_login'}:
+        # Every login updates last_login; nothing on the profile changed
+        return
     if hasattr(instance, 'profile'):
         instance.profile.save()
+
+@receiver(post_save, sender=Application)
+def schedule_image_ingest(sender, instance, **kwargs):
+    """Normalize the applicant photo and signature in the background"""
+    for field_name, derivatives_field, _ in APPLICATION_IMAGES:
+        field_file = getattr(instance, field_name)
+        derivatives = getattr(instance, derivatives_field) or {}
+        if (field_file.name or None) != derivatives.get('source'):
+            enqueue(ingest_application_images, instance.pk)
+            break
+
+@receiver(post_save, sender=NewsArticle)
+@receiver(post_save, sender=BlogPost)
+def generate_content_image_derivatives(sender, instance, **kwargs):
+    """Generate resized renditions of news and blog images"""
+    refresh_derivatives(instance, 'image', 'image_derivatives')
+
+@receiver(pre_save, sender=Application)
+def remember_previous_documents(sender, instance, **kwargs):
+    """Keep the stored document names so replaced ones can be released"""
+    instance._previous_documents = {}
+    update_fields = kwargs.get('update_fields')
+    fields = [f for f in DOCUMENT_FIELDS if update_fields is None or f in update_fields]
+    # Files this save stores; each takes a reference, even under an unchanged name
+    instance._stored_documents = {f for f in fields if not getattr(getattr(instance, f), '_committed', True)}
+    if not instance.pk or not fields:
+        return
+    if instance.get_dirty_fields() is not None:
+        # Loaded from the database: the snapshot already holds the old names
+        instance._previous_documents = {f: instance.loaded_value(f) for f in fields}
+    else:
+        previous = Application.objects.filter(pk=instance.pk).values(*fields).first()
+        instance._previous_documents = previous or {}
+
+@receiver(post_save, sender=Application)
+def release_replaced_documents(sender, instance, **kwargs):
+    """Drop the reference held on documents that were replaced or cleared"""
+    stored = getattr(instance, '_stored_documents', set())
+    for field in DOCUMENT_FIELDS:
+        old_name = getattr(instance, '_previous_documents', {}).get(field)
+        # Identical bytes keep the same content-addressed name but still added a reference
+        if old_name and (old_name != getattr(instance, field).name or field in stored):
+            getattr(instance, field).storage.delete(old_name)
+
+@receiver(post_delete, sender=Application)
+def release_deleted_documents(sender, instance, **kwargs):
+    """Drop the references held by a deleted application"""
+    for field in DOCUMENT_FIELDS:
+        field_file = getattr(instance, field)
+        if field_file:
+            field_file.storage.delete(field_file.name)
+    delete_derivatives(instance.photo.storage, instance.photo_derivatives)
+    delete_derivatives(instance.signature.storage, instance.signature_derivatives)
+
+# Cache invalidation (see cache.py)
+
+STATISTICS_FIELDS = {'status', 'application_type'}
+
+@receiver(post_save, sender=NewsArticle)
+@receiver(post_delete, sender=NewsArticle)
+def invalidate_news_cache(sender, **kwargs):
+    invalidate_tags_on_commit(NEWS_TAG)
+
+@receiver(post_save, sender=BlogPost)
+@receiver(post_delete, sender=BlogPost)
+def invalidate_blog_cache(sender, **kwargs):
+    invalidate_tags_on_commit(BLOG_TAG)
+
+@receiver(post_save, sender=Application)
+def invalidate_statistics_cache(sender, created, update_fields=None, **kwargs):
+    """Statistics only count applications by status and type"""
+    if created or update_fields is None or STATISTICS_FIELDS & set(update_fields):
+        invalidate_tags_on_commit(STATISTICS_TAG)
+
+@receiver(post_delete, sender=Application)
+def invalidate_statistics_cache_on_delete(sender, **kwargs):
+    invalidate_tags_on_commit(STATISTICS_TAG)
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_user_cache(sender, instance, update_fields=None, **kwargs):
+    if update_fields is not None and set(update_fields) <= {'last_login'}:
+        return
+    invalidate_tags_on_commit(user_tag(instance.pk))
+
+@receiver(post_save, sender=UserProfile)
+@receiver(post_delete, sender=UserProfile)
+def invalidate_profile_cache(sender, instance, **kwargs):
+    invalidate_tags_on_commit(user_tag(instance.user_id))
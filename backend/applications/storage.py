@@ -0,0 +1,181 @@
+"""
+Content-addressed storage for application documents
+
+Every document is stored once under the SHA-256 of its bytes
+(``documents/sha256/ab/cd/<digest>.<ext>``) and reference counted through
+``DocumentBlob``. Uploading bytes that are already stored only bumps the
+reference count, and the file is removed once the last reference is released.
+"""
+import contextlib
+import contextvars
+import hashlib
+import logging
+import os
+
+from django.core.files.storage import Storage, default_storage
+from django.db import transaction
+from django.db.models import F
+from django.utils.deconstruct import deconstructible
+
+logger = logging.getLogger(__name__)
+
+CAS_PREFIX = 'documents/sha256'
+
+# Files written for new blobs inside ContentAddressedStorage.atomic()
+_stored_in_block = contextvars.ContextVar('stored_in_block', default=None)
+
+
+def hash_file(content):
+    """Return (sha256 hexdigest, size) of a file-like object, leaving it rewound"""
+    hasher = hashlib.sha256()
+    size = 0
+    if hasattr(content, 'seek'):
+        content.seek(0)
+    chunks = content.chunks() if hasattr(content, 'chunks') else iter(lambda: content.read(65536), b'')
+    for chunk in chunks:
+        hasher.update(chunk)
+        size += len(chunk)
+    if hasattr(content, 'seek'):
+        content.seek(0)
+    return hasher.hexdigest(), size
+
+
+def blob_name(digest, extension):
+    """Storage name for a digest, sharded by its first two bytes"""
+    return f"{CAS_PREFIX}/{digest[:2]}/{digest[2:4]}/{digest}{extension.lower()}"
+
+
+@deconstructible
+class ContentAddressedStorage(Storage):
+    """
+    Storage that deduplicates files by content
+
+    Reading, URLs and existence checks are delegated to the project's default
+    storage (local disk or Cloudinary); only ``save`` and ``delete`` change.
+    """
+
+    @property
+    def backend(self):
+        return default_storage
+
+    def save(self, name, content, max_length=None):
+        from .models import DocumentBlob
+
+        if not hasattr(content, 'chunks'):
+            from django.core.files import File
+            content = File(content, name)
+
+        digest, size = hash_file(content)
+        extension = os.path.splitext(name)[1]
+
+        with transaction.atomic():
+            blob, created = DocumentBlob.objects.select_for_update().get_or_create(
+                sha256=digest, defaults={'name': blob_name(digest, extension), 'size': size}
+            )
+            if created:
+                stored_name = self.backend.save(blob.name, content, max_length=max_length)
+                if stored_name != blob.name:
+                    blob.name = stored_name
+                    blob.save(update_fields=['name'])
+                stored = _stored_in_block.get()
+                if stored is not None:
+                    stored.append(stored_name)
+            DocumentBlob.objects.filter(pk=digest).update(ref_count=F('ref_count') + 1)
+
+        if not created:
+            logger.info(f"Skipped storing duplicate document {blob.name}")
+        return blob.name
+
+    @contextlib.contextmanager
+    def atomic(self):
+        """
+        Save documents and the rows referencing them in one transaction
+
+        If the block fails, the reference counts roll back with it and files
+        written for blobs that no longer have a row are removed.
+        """
+        stored = []
+        token = _stored_in_block.set(stored)
+        try:
+            with transaction.atomic():
+                yield
+        except BaseException:
+            for name in stored:
+                self.backend.delete(name)
+            raise
+        finally:
+            _stored_in_block.reset(token)
+
+    def retain(self, name):
+        """Add a reference to an already stored blob"""
+        from .models import DocumentBlob
+
+        return DocumentBlob.objects.filter(name=name).update(ref_count=F('ref_count') + 1)
+
+    def delete(self, name):
+        """Release a reference; the file is removed with the last one"""
+        from .models import DocumentBlob
+
+        if not name:
+            return
+        with transaction.atomic():
+            released = DocumentBlob.objects.filter(name=name).update(ref_count=F('ref_count') - 1)
+            if not released:
+                # Uploaded before deduplication existed; leave it untouched
+                return
+            orphaned = DocumentBlob.objects.filter(name=name, ref_count__lte=0).delete()[0]
+        if orphaned:
+            self.backend.delete(name)
+
+    def _open(self, name, mode='rb'):
+        return self.backend.open(name, mode)
+
+    def exists(self, name):
+        return self.backend.exists(name)
+
+    def url(self, name):
+        return self.backend.url(name)
+
+    def size(self, name):
+        return self.backend.size(name)
+
+    def path(self, name):
+        return self.backend.path(name)
+
+    def listdir(self, path):
+        return self.backend.listdir(path)
+
+    def get_modified_time(self, name):
+        return self.backend.get_modified_time(name)
+
+
+document_storage_instance = ContentAddressedStorage()
+
+
+def document_storage():
+    """Storage callable used by the Application document fields"""
+    return document_storage_instance
+
+
+def find_reusable_blob(user, digest):
+    """
+    Return the blob with this digest if the user has already stored it
+
+    Lets a client skip uploading bytes the server already holds. Limited to
+    documents the same user attached before, so knowing a digest is not enough
+    to obtain someone else's document.
+    """
+    from django.db.models import Q
+    from .models import Application, DocumentBlob
+    from .uploads import DOCUMENT_FIELDS
+
+    blob = DocumentBlob.objects.filter(sha256=digest).first()
+    if blob is None:
+        return None
+
+    owns = Q()
+    for field in DOCUMENT_FIELDS:
+        owns |= Q(**{field: blob.name})
+    if Application.objects.filter(owns, user=user).exists():
+        return blob
+    return None
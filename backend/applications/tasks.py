@@ -0,0 +1,124 @@
+"""
+Background processing of uploaded applicant images
+
+Normalizing and resizing images takes far longer than the rest of a
+submission, so it runs on a small per-process thread pool once the
+transaction that saved the application has committed.
+"""
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+
+from .events import build_events, record
+from .images import PHOTO_SPEC, SIGNATURE_SPEC, normalize_image, refresh_derivatives
+
+logger = logging.getLogger(__name__)
+
+# (image field, derivatives field, normalization spec)
+APPLICATION_IMAGES = [
+    ('photo', 'photo_derivatives', PHOTO_SPEC),
+    ('signature', 'signature_derivatives', SIGNATURE_SPEC),
+]
+
+_executor = None
+
+
+def _get_executor():
+    # Created lazily so every gunicorn worker gets its own pool after fork
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=settings.INGEST_WORKERS, thread_name_prefix='ingest')
+    return _executor
+
+
+def _run(func, *args):
+    close_old_connections()
+    try:
+        func(*args)
+    except Exception:
+        logger.exception(f"Background task {func.__name__} failed")
+    finally:
+        close_old_connections()
+
+
+def enqueue(func, *args):
+    """Run ``func(*args)`` off the request thread after the current transaction commits"""
+    if settings.INGEST_ASYNC:
+        transaction.on_commit(lambda: _get_executor().submit(_run, func, *args))
+    else:
+        transaction.on_commit(lambda: func(*args))
+
+
+def normalize_application_image(application, field_name, spec):
+    """
+    Replace an applicant image with its normalized version
+
+    Returns the number of bytes saved (0 when the image was already normalized).
+    """
+    from .models import Application
+
+    field_file = getattr(application, field_name)
+    old_name = field_file.name
+    content, original_size, new_size = normalize_image(field_file, spec)
+    if content is None:
+        return 0
+
+    storage = field_file.storage
+    new_name = storage.save(os.path.splitext(old_name)[0] + '.jpg', content)
+
+    # Only swap the file in if nobody replaced it while we were working
+    swapped = Application.objects.filter(pk=application.pk, **{field_name: old_name}).update(**{field_name: new_name})
+    if not swapped:
+        storage.delete(new_name)
+        return 0
+
+    storage.delete(old_name)
+    setattr(application, field_name, new_name)
+    record(build_events(application, [field_name], {field_name: old_name}))
+    saved = original_size - new_size
+    logger.info(
+        f"Normalized {field_name} of {application.confirmation_number}: "
+        f"{original_size} -> {new_size} bytes ({saved} bytes saved)"
+    )
+    return saved
+
+
+def pending_images(application):
+    """
+    Image fields of ``application`` whose ingest has not finished
+
+    Until then the stored file may still be replaced by its normalized
+    version and deleted, so its URL must not be handed out.
+    """
+    return [
+        field_name for field_name, derivatives_field, _ in APPLICATION_IMAGES
+        if getattr(application, field_name)
+        and (getattr(application, derivatives_field) or {}).get('source') != getattr(application, field_name).name
+    ]
+
+
+def ingest_application_images(application_id):
+    """
+    Normalize the photo and signature of an application, then build renditions
+
+    Returns:
+        int: Total bytes saved by normalization
+    """
+    from .models import Application
+
+    application = Application.objects.filter(pk=application_id).first()
+    if application is None:
+        return 0
+
+    saved = 0
+    for field_name, derivatives_field, spec in APPLICATION_IMAGES:
+        if getattr(application, field_name):
+            try:
+                saved += normalize_application_image(application, field_name, spec)
+            except Exception as e:
+                logger.warning(f"Could not normalize {field_name} of application {application_id}: {e}")
+        refresh_derivatives(application, field_name, derivatives_field)
+    return saved
@@ -0,0 +1,67 @@
+"""
+Authentication backends: profile-joined logins and sessions from before them
+
+Run with: python manage.py test applications
+"""
+from unittest import mock
+
+from django.contrib.auth.hashers import MD5PasswordHasher
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+
+from applications.models import UserProfile
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class AuthenticationBackendTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('achol', 'achol@example.com', 'Test#2024')
+        UserProfile.objects.get_or_create(user=cls.user)
+
+    def test_session_from_model_backend_stays_valid(self):
+        self.client.force_login(self.user, backend='django.contrib.auth.backends.ModelBackend')
+        response = self.client.get('/api/auth/me/')
+        self.assertEqual(response.status_code, 200)
+
+    def test_login_by_email(self):
+        response = self.client.post('/api/auth/login/', {'username': 'ACHOL@example.com', 'password': 'Test#2024'},
+                                    content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.client.session['_auth_user_backend'], 'applications.backends.ProfileModelBackend')
+
+    def test_wrong_password_is_checked_once(self):
+        with mock.patch.object(MD5PasswordHasher, 'verify', autospec=True, return_value=False) as verify:
+            response = self.client.post('/api/auth/login/', {'username': 'achol', 'password': 'wrong'},
+                                        content_type='application/json')
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(verify.call_count, 1)
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class RegisterTests(TestCase):
+
+    def test_registers_and_logs_in(self):
+        response = self.client.post('/api/auth/register/', {
+            'username': 'ayen', 'email': 'ayen@example.com', 'password': 'Test#2024',
+            'first_name': 'Ayen', 'last_name': 'Deng', 'phone_number': '+211912345678',
+        }, content_type='application/json')
+        self.assertEqual(response.status_code, 201, response.content)
+        self.assertEqual(response.json()['user']['username'], 'ayen')
+        self.assertEqual(self.client.session['_auth_user_backend'], 'applications.backends.ProfileModelBackend')
+        self.assertEqual(self.client.get('/api/auth/me/').status_code, 200)
+
+    def test_rejects_non_object_body(self):
+        response = self.client.post('/api/auth/register/', [{'username': 'achol'}], content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('error', response.json())
+
+
+class AsyncViewBodyTests(TestCase):
+
+    def test_rejects_non_object_body(self):
+        for body in ([], '"x"', '1'):
+            response = self.client.post('/api/auth/password-reset/', body, content_type='application/json')
+            self.assertEqual(response.status_code, 400, body)
+            self.assertEqual(response.json()['error'], 'Expected a JSON object')
@@ -0,0 +1,61 @@
+"""
+Local tag generations of the two-tier cache stay bounded
+
+Run with: python manage.py test applications
+"""
+from django.core.cache import cache as shared_cache
+from django.test import SimpleTestCase, override_settings
+
+from applications import cache
+from applications.cache import TagGenerations
+
+LOCMEM_CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+class TagGenerationsTests(SimpleTestCase):
+
+    def test_bounded(self):
+        generations = TagGenerations(max_tags=10)
+        for user_id in range(1000):
+            generations.bump(cache.user_tag(user_id))
+        self.assertEqual(len(generations), 10)
+
+    def test_dropped_tag_never_revives_older_generation(self):
+        generations = TagGenerations(max_tags=2)
+        stored = generations.get(['user:1'])
+        generations.bump('user:1')
+        self.assertNotEqual(generations.get(['user:1']), stored)
+        after_bump = generations.get(['user:1'])
+        for user_id in range(2, 5):
+            generations.bump(f'user:{user_id}')
+        # user:1 was dropped: entries stored before its invalidation stay stale
+        self.assertNotEqual(generations.get(['user:1']), stored)
+        self.assertGreaterEqual(generations.get(['user:1'])[0], after_bump[0])
+
+    def test_reads_do_not_add_tags(self):
+        generations = TagGenerations(max_tags=2)
+        generations.get([cache.user_tag(user_id) for user_id in range(100)])
+        self.assertEqual(len(generations), 0)
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class InvalidationTests(SimpleTestCase):
+
+    def setUp(self):
+        shared_cache.clear()
+        cache.clear_local()
+
+    def test_invalidation_after_many_users(self):
+        calls = []
+
+        def compute():
+            calls.append(1)
+            return len(calls)
+
+        self.assertEqual(cache.get_or_set('me', compute, key_parts=[1], tags=[cache.user_tag(1)]), 1)
+        self.assertEqual(cache.get_or_set('me', compute, key_parts=[1], tags=[cache.user_tag(1)]), 1)
+        for user_id in range(2, cache._local_generations.max_tags + 50):
+            cache.invalidate_tags(cache.user_tag(user_id))
+        self.assertLessEqual(len(cache._local_generations), cache._local_generations.max_tags)
+        cache.invalidate_tags(cache.user_tag(1))
+        self.assertEqual(cache.get_or_set('me', compute, key_parts=[1], tags=[cache.user_tag(1)]), 2)
@@ -0,0 +1,226 @@
+"""
+ConnectionPool bookkeeping, with fake connections
+
+Run with: python manage.py test applications
+"""
+import itertools
+import threading
+import time
+from unittest import TestCase, mock
+
+from immigration_portal.pooled_postgresql import pool as pool_module
+from immigration_portal.pooled_postgresql.pool import ConnectionPool, PoolTimeout, get_pool
+
+
+class FakeConnection:
+    _ids = itertools.count(1)
+
+    def __init__(self):
+        self.id = next(self._ids)
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+    def __repr__(self):
+        return f'FakeConnection({self.id})'
+
+
+class Clock:
+    """Stands in for time.monotonic"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class ConnectionPoolTests(TestCase):
+
+    def setUp(self):
+        self.opened = []
+
+    def connect(self):
+        connection = FakeConnection()
+        self.opened.append(connection)
+        return connection
+
+    def counts(self, pool):
+        stats = pool.stats()
+        return stats['open'], stats['in_use'], stats['idle']
+
+    def wait_for_waiter(self, pool):
+        for _ in range(200):
+            if pool.stats()['waiting']:
+                return
+            time.sleep(0.005)
+        self.fail('No thread waited for a connection')
+
+    def test_reuses_idle_connection(self):
+        pool = ConnectionPool(size=2, max_overflow=0)
+        first = pool.acquire(self.connect)
+        pool.release(first)
+        self.assertIs(pool.acquire(self.connect), first)
+        self.assertEqual(len(self.opened), 1)
+        self.assertEqual(self.counts(pool), (1, 1, 0))
+
+    def test_overflow_then_timeout(self):
+        pool = ConnectionPool(size=1, max_overflow=1, timeout=0.05)
+        pool.acquire(self.connect)
+        pool.acquire(self.connect)
+        self.assertEqual(pool.stats()['overflow'], 1)
+        with self.assertRaises(PoolTimeout):
+            pool.acquire(self.connect)
+        self.assertEqual(len(self.opened), 2)
+        self.assertEqual(pool.stats()['timeouts'], 1)
+        self.assertEqual(self.counts(pool), (2, 2, 0))
+
+    def test_slot_is_reserved_before_connecting(self):
+        pool = ConnectionPool(size=1, max_overflow=0, timeout=0.05)
+        seen = {}
+
+        def connect():
+            # Runs outside the lock: another thread can read the stats and is
+            # refused the slot this checkout has reserved
+            thread = threading.Thread(target=lambda: seen.update(stats=pool.stats()))
+            thread.start()
+            thread.join(1)
+            with self.assertRaises(PoolTimeout):
+                pool.acquire(self.connect)
+            return FakeConnection()
+
+        pool.acquire(connect)
+        self.assertEqual((seen['stats']['open'], seen['stats']['in_use']), (1, 1))
+        self.assertEqual(self.opened, [])
+
+    def test_surplus_connection_closed_on_release(self):
+        pool = ConnectionPool(size=1, max_overflow=1)
+        first = pool.acquire(self.connect)
+        second = pool.acquire(self.connect)
+        pool.release(second)
+        self.assertTrue(second.closed)
+        pool.release(first)
+        self.assertFalse(first.closed)
+        self.assertEqual(self.counts(pool), (1, 0, 1))
+        self.assertEqual(pool.stats()['connections_closed'], 1)
+
+    def test_surplus_connection_handed_to_waiter(self):
+        pool = ConnectionPool(size=1, max_overflow=1, timeout=5)
+        pool.acquire(self.connect)
+        second = pool.acquire(self.connect)
+        result = {}
+        waiter = threading.Thread(target=lambda: result.update(connection=pool.acquire(self.connect)))
+        waiter.start()
+        self.wait_for_waiter(pool)
+
+        pool.release(second)
+        waiter.join(5)
+        self.assertIs(result['connection'], second)
+        self.assertFalse(second.closed)
+        self.assertEqual(len(self.opened), 2)
+        self.assertEqual(pool.stats()['waits'], 1)
+        self.assertEqual(self.counts(pool), (2, 2, 0))
+
+    def test_unusable_connection_is_closed(self):
+        pool = ConnectionPool(size=2, max_overflow=0)
+        connection = pool.acquire(self.connect)
+        pool.release(connection, reusable=False)
+        self.assertTrue(connection.closed)
+        self.assertEqual(self.counts(pool), (0, 0, 0))
+
+    def test_stale_idle_connection_recycled(self):
+        clock = Clock()
+        with mock.patch.object(pool_module.time, 'monotonic', clock):
+            pool = ConnectionPool(size=2, max_overflow=0, recycle=300)
+            old = pool.acquire(self.connect)
+            pool.release(old)
+            clock.now += 301
+            new = pool.acquire(self.connect)
+        self.assertIsNot(new, old)
+        self.assertTrue(old.closed)
+        self.assertEqual(self.counts(pool), (1, 1, 0))
+
+    def test_idle_connection_closed_by_server_discarded(self):
+        pool = ConnectionPool(size=2, max_overflow=0)
+        old = pool.acquire(self.connect)
+        pool.release(old)
+        old.closed = True
+        self.assertIsNot(pool.acquire(self.connect), old)
+        self.assertEqual(self.counts(pool), (1, 1, 0))
+
+    def test_connect_failure_frees_slot(self):
+        pool = ConnectionPool(size=1, max_overflow=0, timeout=0.05)
+
+        def refuse():
+            raise ConnectionError('refused')
+
+        with self.assertRaises(ConnectionError):
+            pool.acquire(refuse)
+        self.assertEqual(self.counts(pool), (0, 0, 0))
+        self.assertIsInstance(pool.acquire(self.connect), FakeConnection)
+        self.assertEqual(pool.stats()['connections_created'], 1)
+
+    def test_connect_failure_wakes_waiter(self):
+        pool = ConnectionPool(size=1, max_overflow=0, timeout=5)
+        result = {}
+        connecting = threading.Event()
+        fail = threading.Event()
+
+        def refuse():
+            connecting.set()
+            fail.wait(5)
+            raise ConnectionError('refused')
+
+        def acquire_failing():
+            try:
+                pool.acquire(refuse)
+            except ConnectionError as e:
+                result['error'] = e
+
+        failing = threading.Thread(target=acquire_failing)
+        failing.start()
+        connecting.wait(5)
+        waiter = threading.Thread(target=lambda: result.update(connection=pool.acquire(self.connect)))
+        waiter.start()
+        self.wait_for_waiter(pool)
+
+        fail.set()
+        failing.join(5)
+        waiter.join(5)
+        self.assertIn('error', result)
+        self.assertIn('connection', result)
+        self.assertEqual(self.counts(pool), (1, 1, 0))
+
+    def test_close_idle(self):
+        pool = ConnectionPool(size=2, max_overflow=0)
+        connections = [pool.acquire(self.connect) for _ in range(2)]
+        pool.release(connections[0])
+        pool.close_idle()
+        self.assertTrue(connections[0].closed)
+        self.assertFalse(connections[1].closed)
+        self.assertEqual(self.counts(pool), (1, 1, 0))
+
+
+class GetPoolTests(TestCase):
+
+    def setUp(self):
+        patches = [mock.patch.dict(pool_module._pools, clear=True), mock.patch.object(pool_module, '_pid', 100)]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def test_one_pool_per_alias(self):
+        with mock.patch.object(pool_module.os, 'getpid', return_value=100):
+            default = get_pool('default', {'size': 2})
+            self.assertIs(get_pool('default', {'size': 2}), default)
+            self.assertIsNot(get_pool('replica', {'size': 2}), default)
+
+    def test_forked_worker_starts_with_new_pools(self):
+        with mock.patch.object(pool_module.os, 'getpid', return_value=100):
+            parent = get_pool('default', {'size': 2})
+        with mock.patch.object(pool_module.os, 'getpid', return_value=101):
+            child = get_pool('default', {'size': 2})
+            self.assertIsNot(child, parent)
+            self.assertEqual(list(pool_module._pools), ['default'])
+            self.assertIs(get_pool('default', {'size': 2}), child)
@@ -0,0 +1,84 @@
+"""
+Reference counting of content-addressed application documents
+
+Run with: python manage.py test applications
+"""
+import datetime
+import shutil
+import tempfile
+
+from django.contrib.auth.models import User
+from django.core.files.base import ContentFile
+from django.db import IntegrityError
+from django.test import TestCase, override_settings
+
+from applications.models import Application, DocumentBlob
+from applications.storage import document_storage
+
+MEDIA_ROOT = tempfile.mkdtemp(prefix='immigration-portal-test-media-')
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class DocumentReferenceTests(TestCase):
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        user = User.objects.create_user('applicant', 'applicant@example.com', 'Test#2024')
+        self.application = Application.objects.create(
+            user=user, application_type='passport-first', first_name='Achol', last_name='Deng',
+            date_of_birth=datetime.date(1990, 1, 1), gender='female', nationality='South Sudanese',
+            father_name='Deng', mother_name='Ayen', marital_status='single', phone_number='+211912345678',
+            email=user.email, country='South Sudan', state='Jonglei', city='Bor', place_of_residence='Bor',
+            birth_country='South Sudan', birth_state='Jonglei', birth_city='Bor',
+            id_copy=ContentFile(b'%PDF-1.4 id copy', name='id.pdf'),
+        )
+
+    def reload(self):
+        return Application.objects.get(pk=self.application.pk)
+
+    def test_reupload_of_same_bytes_keeps_one_reference(self):
+        name = self.application.id_copy.name
+        for _ in range(3):
+            application = self.reload()
+            application.id_copy = ContentFile(b'%PDF-1.4 id copy', name='id-again.pdf')
+            application.save()
+            self.assertEqual(application.id_copy.name, name)
+        self.assertEqual(DocumentBlob.objects.get(name=name).ref_count, 1)
+
+        self.reload().delete()
+        self.assertFalse(DocumentBlob.objects.exists())
+
+    def test_replacement_releases_old_blob(self):
+        old_name = self.application.id_copy.name
+        application = self.reload()
+        application.id_copy = ContentFile(b'%PDF-1.4 new id copy', name='id.pdf')
+        application.save()
+
+        self.assertFalse(DocumentBlob.objects.filter(name=old_name).exists())
+        self.assertEqual(DocumentBlob.objects.get(name=application.id_copy.name).ref_count, 1)
+
+    def test_saving_other_fields_keeps_reference(self):
+        application = self.reload()
+        application.city = 'Juba'
+        application.save()
+        self.assertEqual(DocumentBlob.objects.get(name=application.id_copy.name).ref_count, 1)
+
+    def test_failed_save_in_atomic_block_leaves_no_reference(self):
+        shared = self.application.id_copy.name
+        application = Application(  # no date of birth: the insert fails after the files are saved
+            user=self.application.user, application_type='passport-first',
+            id_copy=ContentFile(b'%PDF-1.4 id copy', name='id.pdf'),
+            police_report=ContentFile(b'%PDF-1.4 police report', name='report.pdf'),
+        )
+
+        with self.assertRaises(IntegrityError):
+            with document_storage().atomic():
+                application.save()
+
+        self.assertEqual(DocumentBlob.objects.get(name=shared).ref_count, 1)
+        self.assertEqual(DocumentBlob.objects.count(), 1)
+        self.assertFalse(document_storage().exists(application.police_report.name))
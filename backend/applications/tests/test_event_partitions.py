@@ -0,0 +1,70 @@
+"""
+Partitioning of the application event table (PostgreSQL only)
+
+Run with: python manage.py test applications
+"""
+import datetime
+from unittest import skipUnless
+
+from django.db import connection
+from django.db.migrations.loader import MigrationLoader
+from django.test import TransactionTestCase
+from django.utils import timezone
+
+from applications.events import EVENT_TABLE, _month_start, ensure_partitions, partition_name
+from applications.models import ApplicationEvent
+
+
+def partition_of(event_id):
+    with connection.cursor() as cursor:
+        cursor.execute(f'SELECT tableoid::regclass::text FROM "{EVENT_TABLE}" WHERE id = %s', [event_id])
+        return cursor.fetchone()[0].strip('"')
+
+
+@skipUnless(connection.vendor == 'postgresql', 'Event partitioning is PostgreSQL only')
+class EventPartitionTests(TransactionTestCase):
+
+    def test_migration_partitions_existing_table(self):
+        loader = MigrationLoader(connection)
+        state = loader.project_state(('applications', '0010_application_events'), at_end=True)
+        migration = loader.get_migration('applications', '0011_partition_application_events')
+
+        # Back to the plain table 0010 creates, with an event from an old month
+        with connection.cursor() as cursor:
+            cursor.execute(f'DROP TABLE "{EVENT_TABLE}" CASCADE')
+        with connection.schema_editor() as editor:
+            editor.create_model(state.apps.get_model('applications', 'ApplicationEvent'))
+        old = ApplicationEvent.objects.create(
+            application_id=1, kind='status', created_at=datetime.datetime(2020, 3, 10, tzinfo=datetime.timezone.utc),
+        )
+
+        with connection.schema_editor() as editor:
+            migration.apply(state, editor)
+
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT count(*) FROM pg_partitioned_table WHERE partrelid = %s::regclass', [EVENT_TABLE])
+            self.assertEqual(cursor.fetchone()[0], 1)
+            # Found by Django's sequence reset
+            cursor.execute("SELECT pg_get_serial_sequence(%s, 'id')", [EVENT_TABLE])
+            self.assertIsNotNone(cursor.fetchone()[0])
+        self.assertEqual(partition_of(old.pk), partition_name(datetime.date(2020, 3, 1)))
+
+        new = ApplicationEvent.objects.create(application_id=1, kind='status')
+        self.assertGreater(new.pk, old.pk)
+        self.assertEqual(partition_of(new.pk), partition_name(_month_start(timezone.now().date())))
+        self.assertEqual(ApplicationEvent.objects.filter(application_id=1).count(), 2)
+
+    def test_rows_in_default_partition_move_to_new_partition(self):
+        next_month = _month_start(timezone.now().date(), 1)
+        name = partition_name(next_month)
+        with connection.cursor() as cursor:
+            cursor.execute(f'DROP TABLE "{name}"')
+        event = ApplicationEvent.objects.create(
+            application_id=1, kind='status',
+            created_at=datetime.datetime.combine(next_month, datetime.time(12), datetime.timezone.utc),
+        )
+        self.assertEqual(partition_of(event.pk), f'{EVENT_TABLE}_default')
+
+        with self.assertLogs('applications.events', 'WARNING'):
+            self.assertEqual(ensure_partitions(), [name])
+        self.assertEqual(partition_of(event.pk), name)
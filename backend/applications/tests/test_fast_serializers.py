@@ -0,0 +1,94 @@
+"""
+The fast list serializers must render byte-for-byte the same JSON as DRF
+
+Run with: python manage.py test applications
+"""
+import datetime
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIRequestFactory
+
+from applications.fast_serializers import application_list, blog_list, news_list
+from applications.images import DERIVATIVE_FORMATS, derivative_name
+from applications.models import Application, BlogPost, NewsArticle
+from applications.serializers import ApplicationListSerializer, BlogPostSerializer, NewsArticleSerializer
+
+
+def derivatives_for(name):
+    derivatives = {'source': name}
+    for key, _, extension in DERIVATIVE_FORMATS:
+        derivatives[key] = {str(width): derivative_name(name, width, extension) for width in (80, 320)}
+    return derivatives
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class FastSerializerTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user('author', 'author@example.com', 'Test#2024', first_name='Ayen')
+        cls.applicant = User.objects.create_user('applicant', 'applicant@example.com', 'Test#2024')
+        for i, (status, payment_status) in enumerate([('pending', 'pending'), ('approved', 'completed'), ('rejected', 'failed')]):
+            Application.objects.create(
+                user=cls.applicant, application_type='passport-first', status=status, payment_status=payment_status,
+                first_name='Achol', last_name="Deng-Ma'ker", date_of_birth=datetime.date(1990, 1, 1),
+                gender='female', nationality='South Sudanese', father_name='Deng', mother_name='Ayen',
+                marital_status='single', phone_number='+211912345678', email=f'achol{i}@example.com',
+                country='South Sudan', state='Jonglei', city='Bor', place_of_residence='Bor',
+                birth_country='South Sudan', birth_state='Jonglei', birth_city='Bor',
+                payment_amount=Decimal('500.00') if i else None,
+            )
+        # With renditions, with renditions that failed (the file is missing), without an image
+        for model, extra in [(NewsArticle, {}), (BlogPost, {'category': 'Guides'})]:
+            model.objects.create(title='With image', content='Content', excerpt='Excerpt', author=cls.author,
+                                 image='news/photo.jpg', image_derivatives=derivatives_for('news/photo.jpg'),
+                                 title_ar='عنوان', featured=True, **extra)
+            model.objects.create(title='Failed renditions', content='Content', excerpt='Excerpt',
+                                 image='news/missing.jpg', **extra)
+            model.objects.create(title='No image', content='Content', excerpt='Excerpt', author_name='Juba Monitor',
+                                 **extra)
+
+    def setUp(self):
+        self.request = APIRequestFactory().get('/api/news/')
+
+    def assertSameJson(self, drf_data, fast_data):
+        renderer = JSONRenderer()
+        self.assertEqual(renderer.render(drf_data), renderer.render(fast_data))
+
+    def test_application_list(self):
+        queryset = Application.objects.select_related('user')
+        self.assertSameJson(
+            ApplicationListSerializer(queryset, many=True, context={'request': self.request}).data,
+            application_list.serialize(application_list.values(queryset), self.request),
+        )
+
+    def test_application_list_without_request(self):
+        queryset = Application.objects.filter(user=self.applicant)
+        self.assertSameJson(
+            ApplicationListSerializer(queryset, many=True).data,
+            application_list.serialize(application_list.values(queryset)),
+        )
+
+    def test_news_list(self):
+        queryset = NewsArticle.objects.all()
+        fast_data = news_list.serialize(news_list.values(queryset), self.request)
+        self.assertSameJson(NewsArticleSerializer(queryset, many=True, context={'request': self.request}).data, fast_data)
+        self.assertEqual([bool(item['image_srcset']) for item in fast_data], [False, False, True])
+
+    def test_blog_list(self):
+        queryset = BlogPost.objects.all()
+        self.assertSameJson(
+            BlogPostSerializer(queryset, many=True, context={'request': self.request}).data,
+            blog_list.serialize(blog_list.values(queryset), self.request),
+        )
+
+    def test_application_list_endpoint(self):
+        self.client.force_login(self.applicant)
+        response = self.client.get('/api/applications/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['count'], 3)
+        expected = ApplicationListSerializer(Application.objects.all(), many=True).data
+        self.assertSameJson(expected, response.json()['results'])
@@ -0,0 +1,54 @@
+"""
+Applicant image normalization strips embedded metadata
+
+Run with: python manage.py test applications
+"""
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import InMemoryStorage
+from django.test import SimpleTestCase
+
+from applications.images import PHOTO_SPEC, normalize_image
+
+
+def stored_jpeg(storage, **options):
+    from PIL import Image
+
+    buffer = BytesIO()
+    Image.new('RGB', PHOTO_SPEC['size'], (180, 150, 120)).save(buffer, 'JPEG', **options)
+    name = storage.save('photo.jpg', ContentFile(buffer.getvalue()))
+    return storage.open(name)
+
+
+class NormalizeImageTests(SimpleTestCase):
+
+    def setUp(self):
+        self.storage = InMemoryStorage()
+
+    def normalize(self, **options):
+        from PIL import Image
+
+        content, _, _ = normalize_image(stored_jpeg(self.storage, **options), PHOTO_SPEC)
+        return content, (Image.open(content) if content is not None else None)
+
+    def test_already_normalized_kept(self):
+        content, _ = self.normalize()
+        self.assertIsNone(content)
+
+    def test_icc_profile_stripped(self):
+        from PIL import ImageCms
+
+        profile = ImageCms.ImageCmsProfile(ImageCms.createProfile('sRGB')).tobytes()
+        content, image = self.normalize(icc_profile=profile)
+        self.assertIsNotNone(content)
+        self.assertNotIn('icc_profile', image.info)
+
+    def test_exif_stripped(self):
+        from PIL import Image
+
+        exif = Image.Exif()
+        exif[0x010F] = 'Camera maker'
+        content, image = self.normalize(exif=exif.tobytes())
+        self.assertIsNotNone(content)
+        self.assertNotIn('exif', image.info)
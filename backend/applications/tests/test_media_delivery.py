@@ -0,0 +1,54 @@
+"""
+/media/ streaming under WSGI and ASGI
+
+Run with: python manage.py test applications
+"""
+import os
+import shutil
+import tempfile
+
+from django.test import AsyncRequestFactory, RequestFactory, SimpleTestCase, override_settings
+
+from immigration_portal.media import serve_media
+
+MEDIA_ROOT = tempfile.mkdtemp(prefix='immigration-portal-test-media-')
+CONTENT = os.urandom(600 * 1024)
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, MEDIA_DELIVERY='django', SERVER_TIMING_SAMPLE_RATE=0)
+class MediaStreamingTests(SimpleTestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        os.makedirs(os.path.join(MEDIA_ROOT, 'news'), exist_ok=True)
+        with open(os.path.join(MEDIA_ROOT, 'news', 'video.bin'), 'wb') as f:
+            f.write(CONTENT)
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    def test_wsgi_hands_file_to_server(self):
+        response = serve_media(RequestFactory().get('/media/news/video.bin'), 'news/video.bin')
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNotNone(response.file_to_stream)
+        self.assertEqual(b''.join(response.streaming_content), CONTENT)
+        response.close()
+
+    async def test_asgi_streams_chunks(self):
+        response = serve_media(AsyncRequestFactory().get('/media/news/video.bin'), 'news/video.bin')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.is_async)
+        chunks = [chunk async for chunk in response.streaming_content]
+        self.assertGreater(len(chunks), 1)
+        self.assertEqual(b''.join(chunks), CONTENT)
+        self.assertEqual(int(response['Content-Length']), len(CONTENT))
+
+    async def test_asgi_range(self):
+        request = AsyncRequestFactory().get('/media/news/video.bin', headers={'Range': 'bytes=1000-1999'})
+        response = serve_media(request, 'news/video.bin')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(b''.join([chunk async for chunk in response.streaming_content]), CONTENT[1000:2000])
+        self.assertEqual(response['Content-Range'], f'bytes 1000-1999/{len(CONTENT)}')
@@ -0,0 +1,82 @@
+"""
+Async Paystack calls close their HTTP clients
+
+Run with: python manage.py test applications
+"""
+from unittest import mock
+
+import httpx
+from django.test import SimpleTestCase
+
+from applications import payment_service
+from applications.loadtest import FakePaystack
+from applications.payment_service import PaystackService
+
+
+class TrackedClient(httpx.AsyncClient):
+    instances = []
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.instances.append(self)
+
+
+class AsyncClientLifetimeTests(SimpleTestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.gateway = FakePaystack().start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.gateway.stop()
+        super().tearDownClass()
+
+    def setUp(self):
+        TrackedClient.instances = []
+        patches = [
+            mock.patch.object(payment_service.httpx, 'AsyncClient', TrackedClient),
+            mock.patch.object(PaystackService, 'BASE_URL', self.gateway.url),
+            mock.patch.dict('os.environ', {'PAYSTACK_SECRET_KEY': 'sk_test_lifetime'}),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    async def test_client_per_call_is_closed(self):
+        result = await PaystackService().averify_transaction('REF-1')
+        self.assertTrue(result['status'])
+        self.assertEqual(len(TrackedClient.instances), 1)
+        self.assertTrue(TrackedClient.instances[0].is_closed)
+
+    async def test_shared_client_until_shutdown(self):
+        payment_service.share_async_client()
+        try:
+            for reference in ('REF-1', 'REF-2'):
+                self.assertTrue((await PaystackService().averify_transaction(reference))['status'])
+            self.assertEqual(len(TrackedClient.instances), 1)
+            self.assertFalse(TrackedClient.instances[0].is_closed)
+        finally:
+            await payment_service.aclose_async_client()
+        self.assertTrue(TrackedClient.instances[0].is_closed)
+
+    async def test_asgi_lifespan(self):
+        from immigration_portal.asgi import application
+
+        messages = [{'type': 'lifespan.startup'}, {'type': 'lifespan.shutdown'}]
+        sent = []
+
+        async def receive():
+            if messages[0]['type'] == 'lifespan.shutdown':
+                # Between startup and shutdown the server handles requests
+                await PaystackService().averify_transaction('REF-1')
+            return messages.pop(0)
+
+        async def send(message):
+            sent.append(message['type'])
+
+        await application({'type': 'lifespan'}, receive, send)
+        self.assertEqual(sent, ['lifespan.startup.complete', 'lifespan.shutdown.complete'])
+        self.assertEqual(len(TrackedClient.instances), 1)
+        self.assertTrue(TrackedClient.instances[0].is_closed)
@@ -0,0 +1,167 @@
+"""
+Query-count regression tests
+
+Every endpoint and admin changelist is requested once with N rows seeded and
+once with 10N. The number of queries must be the same: a serializer field,
+admin column or view that queries per row makes these tests fail.
+
+Run with: python manage.py test applications
+"""
+import datetime
+
+from django.contrib import admin
+from django.contrib.auth.models import User
+from django.core.cache import cache as shared_cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from applications import cache
+from applications.models import Application, ApplicationEvent, BlogPost, NewsArticle
+from applications.serializers import ApplicationSerializer
+
+N = 3
+
+LOCMEM_CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+@override_settings(CACHES=LOCMEM_CACHES, SERVER_TIMING_SAMPLE_RATE=0,
+                   PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class QueryCountTestCase(TestCase):
+    """Seeds rows in batches and compares the queries of the same request"""
+
+    def setUp(self):
+        self.seeded = 0
+        self.applicant = self.make_user('applicant')
+        self.officer = self.make_user('officer', role='officer')
+        self.reviewer = self.make_user('reviewer', role='admin')
+        self.superuser = User.objects.create_superuser('root', 'root@example.com', 'Root#2024')
+        # Every application in the tests shares this applicant's receipt
+        self.application = self.make_application(self.applicant, 'SS-TEST-BASE')
+
+    def make_user(self, username, role='applicant'):
+        user = User.objects.create_user(username, f'{username}@example.com', 'Test#2024')
+        if role != 'applicant':
+            user.profile.role = role
+            user.profile.save()
+        return user
+
+    def make_application(self, user, confirmation_number, **fields):
+        return Application.objects.create(
+            user=user, application_type='passport-first', confirmation_number=confirmation_number,
+            first_name='Test', last_name='Applicant', date_of_birth=datetime.date(1990, 1, 1),
+            gender='male', nationality='South Sudanese', father_name='Father', mother_name='Mother',
+            marital_status='single', phone_number='+211912345678', email=user.email,
+            country='South Sudan', state='Central Equatoria', city='Juba', place_of_residence='Juba',
+            birth_country='South Sudan', birth_state='Central Equatoria', birth_city='Juba',
+            payment_proof_hash='a' * 64, photo='documents/photos/photo.jpg', reviewed_by=self.reviewer,
+            **fields,
+        )
+
+    def seed(self, count):
+        """``count`` more rows of everything the endpoints list"""
+        start, self.seeded = self.seeded, self.seeded + count
+        for i in range(start, self.seeded):
+            other = self.make_user(f'user{i}')
+            for owner in (self.applicant, other):
+                application = self.make_application(owner, f'SS-TEST-{owner.pk}-{i}')
+                application.status = 'in-progress'
+                application.event_actor = self.reviewer
+                application.save()
+            ApplicationEvent.objects.create(
+                application_id=self.application.pk, actor=other, kind='status',
+                field='status', old_value='pending', new_value='in-progress',
+            )
+            NewsArticle.objects.create(title=f'News {i}', content='Content', excerpt='Excerpt', author=other)
+            BlogPost.objects.create(title=f'Post {i}', content='Content', excerpt='Excerpt',
+                                    category='Tips', author=other)
+
+    def count_queries(self, func):
+        func()  # one-time lookups (content types, sites) happen here
+        shared_cache.clear()
+        cache.clear_local()
+        with CaptureQueriesContext(connection) as queries:
+            response = func()
+        if hasattr(response, 'status_code'):
+            self.assertEqual(response.status_code, 200, getattr(response, 'content', b'')[:500])
+        return [query['sql'] for query in queries]
+
+    def assertConstantQueries(self, func):
+        self.seed(N)
+        small = self.count_queries(func)
+        self.seed(9 * N)
+        large = self.count_queries(func)
+        self.assertEqual(
+            len(small), len(large),
+            f'{len(small)} queries with {N} rows, {len(large)} with {10 * N}:\n' + '\n'.join(large),
+        )
+
+
+class ApiQueryCountTests(QueryCountTestCase):
+
+    def get(self, user, url):
+        if user is None:
+            self.client.logout()
+        else:
+            self.client.force_login(user)
+        return lambda: self.client.get(url)
+
+    def test_application_list_as_officer(self):
+        self.assertConstantQueries(self.get(self.officer, '/api/applications/'))
+
+    def test_application_list_as_applicant(self):
+        self.assertConstantQueries(self.get(self.applicant, '/api/applications/'))
+
+    def test_my_applications(self):
+        self.assertConstantQueries(self.get(self.applicant, '/api/applications/my_applications/'))
+
+    def test_application_detail_with_duplicate_receipts(self):
+        self.assertConstantQueries(self.get(self.applicant, f'/api/applications/{self.application.pk}/'))
+
+    def test_application_history(self):
+        self.assertConstantQueries(self.get(self.officer, f'/api/applications/{self.application.pk}/history/'))
+
+    def test_application_serializer_many(self):
+        def serialize():
+            return ApplicationSerializer(Application.objects.select_related('user', 'reviewed_by'), many=True).data
+        self.assertConstantQueries(serialize)
+
+    def test_news_list(self):
+        self.assertConstantQueries(self.get(None, '/api/news/'))
+
+    def test_blog_list(self):
+        self.assertConstantQueries(self.get(None, '/api/blog/'))
+
+    def test_statistics(self):
+        self.assertConstantQueries(self.get(self.officer, '/api/admin/statistics/'))
+
+    def test_current_user(self):
+        self.assertConstantQueries(self.get(self.applicant, '/api/auth/me/'))
+
+
+class AdminQueryCountTests(QueryCountTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(self.superuser)
+
+    def test_changelists(self):
+        urls = {
+            model.__name__: reverse(f'admin:{model._meta.app_label}_{model._meta.model_name}_changelist')
+            for model in admin.site._registry
+        }
+        self.seed(N)
+        small = {name: self.count_queries(lambda: self.client.get(url)) for name, url in urls.items()}
+        self.seed(9 * N)
+        for name, url in urls.items():
+            with self.subTest(model=name):
+                large = self.count_queries(lambda: self.client.get(url))
+                self.assertEqual(
+                    len(small[name]), len(large),
+                    f'{len(small[name])} queries with {N} rows, {len(large)} with {10 * N}:\n' + '\n'.join(large),
+                )
+
+    def test_application_change_form(self):
+        url = reverse('admin:applications_application_change', args=[self.application.pk])
+        self.assertConstantQueries(lambda: self.client.get(url))
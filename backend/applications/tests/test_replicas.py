@@ -0,0 +1,47 @@
+"""
+GET views that write read from the primary when a replica is configured
+
+There is no replica in the tests: any read routed to it fails, so these
+views only succeed if all their reads go to the primary.
+
+Run with: python manage.py test applications
+"""
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.db.utils import ConnectionDoesNotExist
+from django.test import TestCase, override_settings
+
+from applications.models import NewsArticle
+from immigration_portal import replicas
+
+LOCMEM_CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+@override_settings(CACHES=LOCMEM_CACHES, SERVER_TIMING_SAMPLE_RATE=0,
+                   PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class WritingGetViewTests(TestCase):
+
+    def setUp(self):
+        patch = mock.patch.object(replicas, 'replica_configured', return_value=True)
+        patch.start()
+        self.addCleanup(patch.stop)
+
+    def test_reads_go_to_replica_elsewhere(self):
+        with self.assertRaises(ConnectionDoesNotExist):
+            self.client.get('/api/news/')
+
+    def test_setup_admin(self):
+        for _ in range(2):
+            response = self.client.get('/api/setup-admin/')
+            self.assertEqual(response.status_code, 200, response.content)
+        self.assertTrue(User.objects.filter(username='admin').exists())
+
+    def test_setup_content(self):
+        # Stands in for the command's existence checks
+        def create_sample_content(*args, **kwargs):
+            NewsArticle.objects.filter(title='Welcome').exists()
+
+        with mock.patch('django.core.management.call_command', create_sample_content):
+            response = self.client.get('/api/setup-content/')
+        self.assertEqual(response.status_code, 200, response.content)
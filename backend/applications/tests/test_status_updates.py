@@ -0,0 +1,53 @@
+"""
+update_status only moves applications along; decisions go through approve/reject
+
+Run with: python manage.py test applications
+"""
+import datetime
+
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+
+from applications.models import Application
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class UpdateStatusTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.officer = User.objects.create_user('officer', 'officer@example.com', 'Test#2024')
+        cls.officer.profile.role = 'officer'
+        cls.officer.profile.save()
+        applicant = User.objects.create_user('applicant', 'applicant@example.com', 'Test#2024')
+        cls.application = Application.objects.create(
+            user=applicant, application_type='passport-first', first_name='Achol', last_name='Deng',
+            date_of_birth=datetime.date(1990, 1, 1), gender='female', nationality='South Sudanese',
+            father_name='Deng', mother_name='Ayen', marital_status='single', phone_number='+211912345678',
+            email=applicant.email, country='South Sudan', state='Jonglei', city='Bor', place_of_residence='Bor',
+            birth_country='South Sudan', birth_state='Jonglei', birth_city='Bor', payment_status='completed',
+        )
+
+    def setUp(self):
+        self.client.force_login(self.officer)
+
+    def update_status(self, new_status):
+        return self.client.patch(f'/api/applications/{self.application.pk}/update_status/', {'status': new_status},
+                                 content_type='application/json')
+
+    def test_moves_to_in_progress(self):
+        response = self.update_status('in-progress')
+        self.assertEqual(response.status_code, 200)
+        self.application.refresh_from_db()
+        self.assertEqual(self.application.status, 'in-progress')
+
+    def test_refuses_decisions(self):
+        for decision in ('approved', 'rejected'):
+            response = self.update_status(decision)
+            self.assertEqual(response.status_code, 400)
+            self.assertIn('error', response.json())
+        self.application.refresh_from_db()
+        self.assertEqual(self.application.status, 'pending')
+
+    def test_refuses_unknown_status(self):
+        self.assertEqual(self.update_status('archived').status_code, 400)
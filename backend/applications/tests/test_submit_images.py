@@ -0,0 +1,64 @@
+"""
+The submit response never links to an image that ingest is about to replace
+
+Run with: python manage.py test applications
+"""
+import shutil
+import tempfile
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TransactionTestCase, override_settings
+
+from applications import tasks
+from applications.loadtest import application_form, make_documents
+from applications.models import DocumentBlob
+
+MEDIA_ROOT = tempfile.mkdtemp(prefix='immigration-portal-test-media-')
+LOCMEM_CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, CACHES=LOCMEM_CACHES, SERVER_TIMING_SAMPLE_RATE=0,
+                   EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend',
+                   PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class SubmitImagesTests(TransactionTestCase):
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        user = User.objects.create_user('applicant', 'applicant@example.com', 'Test#2024')
+        self.client.force_login(user)
+
+    def submit(self):
+        files = {field: SimpleUploadedFile(name, data, content_type)
+                 for field, (name, data, content_type) in make_documents().items()}
+        response = self.client.post('/api/applications/submit/', {**application_form('applicant@example.com', 0), **files})
+        self.assertEqual(response.status_code, 201, response.content)
+        return response.json()
+
+    def assertStored(self, url):
+        name = url.split('/media/', 1)[1].split('?', 1)[0]
+        self.assertTrue(DocumentBlob.objects.filter(name=name).exists(), name)
+
+    @override_settings(INGEST_ASYNC=False)
+    def test_sync_ingest_returns_normalized_images(self):
+        data = self.submit()
+        self.assertEqual(data['processing'], [])
+        for field in ('photo', 'signature', 'id_copy'):
+            self.assertStored(data['application'][field])
+        self.assertIsNotNone(data['application']['photo_srcset'])
+
+    @override_settings(INGEST_ASYNC=True)
+    def test_images_still_processing_have_no_url(self):
+        executor = mock.Mock()
+        with mock.patch.object(tasks, '_get_executor', return_value=executor):
+            data = self.submit()
+        self.assertTrue(executor.submit.called)
+        self.assertEqual(data['processing'], ['photo', 'signature'])
+        self.assertIsNone(data['application']['photo'])
+        self.assertIsNone(data['application']['signature_srcset'])
+        self.assertStored(data['application']['id_copy'])
@@ -0,0 +1,51 @@
+"""
+Brute-force throttling for the unauthenticated auth endpoints
+
+Each endpoint is limited per client IP and per account (the username/email
+that was submitted), using DRF's sliding-window throttle stored in the
+default cache. Throttles run before the view, so a rejected attempt costs
+neither a password hash nor an email.
+"""
+import hashlib
+
+from rest_framework.throttling import SimpleRateThrottle
+
+
+class IPThrottle(SimpleRateThrottle):
+    """Limit requests per client IP"""
+
+    def get_cache_key(self, request, view):
+        return self.cache_format % {'scope': self.scope, 'ident': self.get_ident(request)}
+
+
+class AccountThrottle(SimpleRateThrottle):
+    """Limit requests per submitted account identifier, whoever sends them"""
+    field = None
+
+    def get_cache_key(self, request, view):
+        try:
+            identifier = request.data.get(self.field)
+        except Exception:
+            return None
+        if not identifier or not isinstance(identifier, str):
+            return None
+        ident = hashlib.sha256(identifier.strip().lower().encode()).hexdigest()
+        return self.cache_format % {'scope': self.scope, 'ident': ident}
+
+
+class LoginIPThrottle(IPThrottle):
+    scope = 'login_ip'
+
+
+class LoginAccountThrottle(AccountThrottle):
+    scope = 'login_account'
+    field = 'username'
+
+
+class PasswordResetIPThrottle(IPThrottle):
+    scope = 'password_reset_ip'
+
+
+class PasswordResetAccountThrottle(AccountThrottle):
+    scope = 'password_reset_account'
+    field = 'email'
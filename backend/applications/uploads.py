@@ -0,0 +1,238 @@
+"""
+Resumable (tus-style) uploads for application documents
+
+Documents are sent in chunks with PATCH requests and appended to a spool file
+on disk, so memory use stays bounded and a dropped connection only costs the
+chunk that was in flight. Finished uploads are attached to an application by
+passing their token (e.g. ``photo_upload``) to ``submit_application``.
+"""
+import logging
+import os
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files import File
+from django.utils import timezone
+from immigration_portal.metrics import UPLOAD_SIZE
+
+try:
+    import fcntl
+except ImportError:  # Windows development machines
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# Application fields that accept resumable uploads
+DOCUMENT_FIELDS = ['photo', 'id_copy', 'signature', 'birth_certificate', 'old_document', 'police_report']
+IMAGE_FIELDS = ['photo', 'signature']
+
+# Size of the buffer used to move request data to disk
+CHUNK_SIZE = 64 * 1024
+
+
+class UploadError(Exception):
+    """Raised when an upload request cannot be honoured"""
+
+    def __init__(self, message, status_code=400):
+        super().__init__(message)
+        self.message = message
+        self.status_code = status_code
+
+
+def spool_path(upload):
+    """Location of the partial file for an upload"""
+    return os.path.join(settings.UPLOAD_SPOOL_DIR, f"{upload.token}.part")
+
+
+@contextmanager
+def _locked_spool(upload):
+    """Open the spool file for writing, holding an exclusive lock"""
+    os.makedirs(settings.UPLOAD_SPOOL_DIR, exist_ok=True)
+    path = spool_path(upload)
+    fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+    with os.fdopen(fd, 'r+b') as spool:
+        if fcntl is not None:
+            try:
+                fcntl.flock(spool.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                raise UploadError('Another chunk for this upload is still being received', 409)
+        yield spool
+
+
+def append_chunk(upload, offset, stream, length):
+    """
+    Append a chunk to an upload and return the new offset
+
+    Args:
+        upload: DocumentUpload being written
+        offset: Offset the client believes it is writing at (Upload-Offset)
+        stream: File-like request body
+        length: Number of bytes announced for this chunk (Content-Length)
+
+    Only bytes that reached the disk are acknowledged: if the client goes away
+    half-way, the offset is advanced to what was actually written so the next
+    PATCH resumes from there.
+    """
+    from .models import DocumentUpload
+
+    if upload.completed_at:
+        raise UploadError('Upload is already complete', 409)
+    if offset != upload.offset:
+        raise UploadError(f'Offset mismatch: expected {upload.offset}', 409)
+    if length <= 0:
+        raise UploadError('Chunk is empty')
+    if offset + length > upload.size:
+        raise UploadError('Chunk exceeds the declared upload size', 413)
+
+    with _locked_spool(upload) as spool:
+        # Drop anything past the last acknowledged offset (e.g. a chunk that was
+        # written but never recorded because the worker died)
+        spool.truncate(offset)
+        spool.seek(offset)
+
+        written = 0
+        try:
+            while written < length:
+                data = stream.read(min(CHUNK_SIZE, length - written))
+                if not data:
+                    break
+                spool.write(data)
+                written += len(data)
+        except Exception as e:
+            logger.warning(f"Upload {upload.token} interrupted after {written} bytes: {e}")
+        finally:
+            spool.flush()
+            os.fsync(spool.fileno())
+
+        new_offset = offset + written
+        completed_at = timezone.now() if new_offset == upload.size else None
+        updated = DocumentUpload.objects.filter(pk=upload.pk, offset=offset).update(
+            offset=new_offset, completed_at=completed_at, updated_at=timezone.now()
+        )
+        if not updated:
+            raise UploadError('Upload was modified concurrently', 409)
+
+    upload.offset = new_offset
+    upload.completed_at = completed_at
+    if completed_at:
+        UPLOAD_SIZE.labels(upload.field_name, 'resumable').observe(upload.size)
+    return new_offset
+
+
+def reuse_existing_blob(upload):
+    """
+    Complete an upload immediately when its declared digest is already stored
+
+    Returns True when the client can skip sending the bytes altogether.
+    """
+    from .storage import find_reusable_blob
+
+    if not upload.sha256:
+        return False
+    blob = find_reusable_blob(upload.user, upload.sha256)
+    if blob is None:
+        return False
+
+    upload.blob = blob
+    upload.offset = upload.size = blob.size
+    upload.completed_at = timezone.now()
+    upload.save(update_fields=['blob', 'offset', 'size', 'completed_at', 'updated_at'])
+    UPLOAD_SIZE.labels(upload.field_name, 'deduplicated').observe(upload.size)
+    return True
+
+
+def _verify_image(path):
+    """Make sure a spooled photo/signature is a readable image"""
+    from PIL import Image
+
+    try:
+        with Image.open(path) as image:
+            image.verify()
+    except Exception:
+        raise UploadError('Upload a valid image. The file you uploaded was either not an image or a corrupted image.')
+
+
+def claim_uploads(user, data):
+    """
+    Resolve ``<field>_upload`` tokens from a submission into file objects
+
+    Returns:
+        tuple: (uploads, files) where ``files`` maps field name to an open File
+        (or the name of an already stored blob) ready for ``serializer.save()``.
+    """
+    from .models import DocumentUpload
+
+    tokens = {field: data.get(f'{field}_upload') for field in DOCUMENT_FIELDS}
+    tokens = {field: token for field, token in tokens.items() if token}
+    if not tokens:
+        return [], {}
+
+    try:
+        found = DocumentUpload.objects.filter(token__in=tokens.values(), user=user).select_related('blob')
+        found = {str(upload.token): upload for upload in found}
+    except Exception:
+        raise UploadError('Invalid upload token')
+
+    uploads, files = [], {}
+    for field, token in tokens.items():
+        upload = found.get(str(token))
+        if upload is None or upload.field_name != field:
+            raise UploadError(f'Unknown upload token for {field}')
+        if not upload.completed_at:
+            raise UploadError(f'Upload for {field} is not complete ({upload.offset} of {upload.size} bytes)')
+        if upload.application_id:
+            raise UploadError(f'Upload for {field} has already been used')
+
+        uploads.append(upload)
+        if upload.blob_id:
+            # Already stored: reference the existing blob instead of a file
+            files[field] = upload.blob.name
+            continue
+
+        path = spool_path(upload)
+        if field in IMAGE_FIELDS:
+            _verify_image(path)
+        files[field] = File(open(path, 'rb'), name=upload.filename)
+
+    return uploads, files
+
+
+def release_uploads(uploads, files, application=None):
+    """Close spooled files, mark uploads as attached and remove the spool"""
+    from .models import DocumentUpload
+    from .storage import document_storage
+
+    for file in files.values():
+        if isinstance(file, File):
+            file.close()
+    if application is None:
+        return
+
+    DocumentUpload.objects.filter(pk__in=[u.pk for u in uploads]).update(application=application)
+    for upload in uploads:
+        if upload.blob_id:
+            document_storage().retain(upload.blob.name)
+        discard_spool(upload)
+
+
+def discard_spool(upload):
+    """Delete the spool file of an upload, if any"""
+    try:
+        os.remove(spool_path(upload))
+    except FileNotFoundError:
+        pass
+
+
+def purge_stale_uploads(max_age=None):
+    """Delete uploads that were never attached within the expiry window"""
+    from .models import DocumentUpload
+
+    max_age = max_age or timedelta(hours=settings.RESUMABLE_UPLOAD_EXPIRY_HOURS)
+    stale = DocumentUpload.objects.filter(application__isnull=True, updated_at__lt=timezone.now() - max_age)
+    count = 0
+    for upload in stale.iterator():
+        discard_spool(upload)
+        upload.delete()
+        count += 1
+    return count
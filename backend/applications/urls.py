@@ -1,6 +1,6 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from . import views
+from . import async_views, views
 
 router = DefaultRouter()
 router.register(r'applications', views.ApplicationViewSet, basename='application')
@@ -16,7 +16,7 @@ urlpatterns = [
     path('auth/login/', views.login_view, name='login'),
     path('auth/logout/', views.logout_view, name='logout'),
     path('auth/me/', views.current_user_view, name='current-user'),
-    path('auth/password-reset/', views.password_reset_request, name='password-reset'),
+    path('auth/password-reset/', async_views.password_reset_request, name='password-reset'),
     path('auth/password-reset-confirm/', views.password_reset_confirm, name='password-reset-confirm'),
     
     # Setup (for Render free tier - call once after deployment)
@@ -27,13 +27,19 @@ urlpatterns = [
     # Applications
     path('applications/submit/', views.submit_application, name='submit-application'),
     
+    # Resumable document uploads
+    path('uploads/', views.create_upload, name='upload-create'),
+    path('uploads/<uuid:token>/', views.upload_detail, name='upload-detail'),
+    
     # Payment
-    path('payment/initialize/', views.initialize_payment, name='initialize-payment'),
-    path('payment/verify/', views.verify_payment, name='verify-payment'),
+    path('payment/initialize/', async_views.initialize_payment, name='initialize-payment'),
+    path('payment/verify/', async_views.verify_payment, name='verify-payment'),
     path('payment/public-key/', views.get_paystack_public_key, name='paystack-public-key'),
     
     # Statistics
     path('admin/statistics/', views.statistics_view, name='statistics'),
+    path('admin/database-pool/', views.database_pool_view, name='database-pool'),
+    path('admin/cache/', views.cache_stats_view, name='cache-stats'),
     
     # Applications (includes all CRUD + custom actions)
     path('', include(router.urls)),
@@ -1,12 +1,31 @@
 from django.core.mail import EmailMessage
 from django.conf import settings
-from reportlab.lib.pagesizes import letter
-from reportlab.pdfgen import canvas
-from reportlab.lib.units import inch
+from immigration_portal.metrics import EMAIL_DURATION, EMAILS, PDF_DURATION
+from immigration_portal.timing import timed
+import logging
 import os
 
+logger = logging.getLogger(__name__)
+
+
+def _deliver(email, kind):
+    """Send an email, recording its duration and outcome"""
+    try:
+        with timed('smtp'), EMAIL_DURATION.labels(kind).time():
+            email.send()
+    except Exception:
+        EMAILS.labels(kind, 'failed').inc()
+        raise
+    EMAILS.labels(kind, 'sent').inc()
+
+@PDF_DURATION.time()
 def generate_pdf(application):
     """Generate PDF for approved application"""
+    # reportlab is heavy and only needed here
+    from reportlab.lib.pagesizes import letter
+    from reportlab.pdfgen import canvas
+    from reportlab.lib.units import inch
+    
     filename = f"application-{application.confirmation_number}.pdf"
     filepath = os.path.join(settings.MEDIA_ROOT, 'approved_pdfs', filename)
     
@@ -105,10 +124,10 @@ Directorate of Nationality, Passports and Immigration
     )
     
     try:
-        email.send()
-        print(f"Application received email sent to {application.email}")
+        _deliver(email, 'application_received')
+        logger.info(f"Application received email sent to {application.email}")
     except Exception as e:
-        print(f"Error sending application received email: {e}")
+        logger.error(f"Error sending application received email: {e}")
 
 def send_approval_email(application):
     """Send approval email with PDF attachment"""
@@ -170,10 +189,10 @@ Directorate of Nationality, Passports and Immigration
             email.attach_file(pdf_path)
     
     try:
-        email.send()
-        print(f"Approval email sent to {application.email}")
+        _deliver(email, 'approval')
+        logger.info(f"Approval email sent to {application.email}")
     except Exception as e:
-        print(f"Error sending approval email: {e}")
+        logger.error(f"Error sending approval email: {e}")
 
 def send_rejection_email(application):
     """Send rejection email with reason"""
@@ -223,7 +242,7 @@ Directorate of Nationality, Passports and Immigration
     )
     
     try:
-        email.send()
-        print(f"Rejection email sent to {application.email}")
+        _deliver(email, 'rejection')
+        logger.info(f"Rejection email sent to {application.email}")
     except Exception as e:
-        print(f"Error sending rejection email: {e}")
+        logger.error(f"Error sending rejection email: {e}")
@@ -0,0 +1,184 @@
+"""
+Validation rules for account data
+
+Used by the registration and user serializers and by bulk import paths.
+Patterns are compiled once at import time, and username/email uniqueness is
+checked with a single query for a whole batch of records instead of two
+``exists()`` queries per record.
+
+Every rule raises ``django.core.exceptions.ValidationError`` with the
+message shown to the user (DRF reports those like its own errors) and
+returns the cleaned value.
+"""
+import re
+
+from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError
+from django.core.validators import EmailValidator
+from django.db.models import Q
+from django.db.models.functions import Lower
+
+NAME_PATTERN = re.compile(r"^[A-Za-z\s\-']+$")
+PHONE_SEPARATORS = re.compile(r'[\s\-]')
+PHONE_PATTERN = re.compile(r'^\+?[0-9]{10,15}$')
+
+PASSWORD_MIN_LENGTH = 6
+PASSWORD_RULES = [
+    (re.compile(r'[A-Z]'), 'Password must contain at least one uppercase letter'),
+    (re.compile(r'[a-z]'), 'Password must contain at least one lowercase letter'),
+    (re.compile(r'[0-9]'), 'Password must contain at least one digit'),
+    (re.compile(r'[!@#$%^&*()_+\-=\[\]{};\':"\\|,.<>\/?]'), 'Password must contain at least one special character (!@#$%^&*...)'),
+]
+
+ALREADY_REGISTERED = 'This email is already registered. Please login instead.'
+
+# Keeps the number of query parameters well below database limits
+UNIQUENESS_CHUNK_SIZE = 500
+
+_email_validator = EmailValidator()
+
+
+def validate_name(value, label='Name'):
+    """Letters, spaces, hyphens and apostrophes; at least 2 characters; starts with a capital"""
+    if not value:
+        raise ValidationError(f"{label} is required")
+    if len(value) < 2:
+        raise ValidationError(f"{label} must be at least 2 characters")
+    if not NAME_PATTERN.match(value):
+        raise ValidationError(f"{label} can only contain letters, spaces, hyphens, and apostrophes")
+    if not value[0].isupper():
+        raise ValidationError(f"{label} must start with a capital letter")
+    return value
+
+
+def validate_first_name(value):
+    return validate_name(value, 'First name')
+
+
+def validate_last_name(value):
+    return validate_name(value, 'Last name')
+
+
+def validate_email_address(value):
+    """Valid email address, returned lower-cased"""
+    try:
+        _email_validator(value)
+    except ValidationError:
+        raise ValidationError("Please enter a valid email address")
+    return value.lower()
+
+
+def validate_phone_number(value):
+    """10-15 digits with an optional leading +, ignoring spaces and dashes"""
+    if not PHONE_PATTERN.match(PHONE_SEPARATORS.sub('', value or '')):
+        raise ValidationError("Please enter a valid phone number (10-15 digits)")
+    return value
+
+
+def validate_password_strength(value):
+    """At least 6 characters with an uppercase letter, a lowercase letter, a digit and a special character"""
+    if len(value) < PASSWORD_MIN_LENGTH:
+        raise ValidationError(f'Password must be at least {PASSWORD_MIN_LENGTH} characters long')
+    for pattern, message in PASSWORD_RULES:
+        if not pattern.search(value):
+            raise ValidationError(message)
+    return value
+
+
+# Rules applied to each field of a registration record
+REGISTRATION_RULES = {
+    'email': validate_email_address,
+    'password': validate_password_strength,
+    'first_name': validate_first_name,
+    'last_name': validate_last_name,
+    'phone_number': validate_phone_number,
+}
+
+
+def find_registered(usernames=(), emails=()):
+    """
+    Usernames and emails that already belong to an account
+
+    Returns:
+        tuple: (set of taken usernames, set of taken lower-cased emails),
+        using one query per ``UNIQUENESS_CHUNK_SIZE`` values of each kind
+    """
+    usernames = list(dict.fromkeys(u for u in usernames if u))
+    emails = list(dict.fromkeys(e.lower() for e in emails if e))
+    taken_usernames, taken_emails = set(), set()
+
+    for start in range(0, max(len(usernames), len(emails)), UNIQUENESS_CHUNK_SIZE):
+        username_chunk = usernames[start:start + UNIQUENESS_CHUNK_SIZE]
+        email_chunk = emails[start:start + UNIQUENESS_CHUNK_SIZE]
+        rows = (
+            User.objects.annotate(email_lower=Lower('email'))
+            .filter(Q(username__in=username_chunk) | Q(email_lower__in=email_chunk))
+            .values_list('username', 'email_lower')
+        )
+        for username, email in rows:
+            taken_usernames.add(username)
+            taken_emails.add(email)
+
+    return taken_usernames & set(usernames), taken_emails & set(emails)
+
+
+def validate_registration(record, taken=None):
+    """
+    Validate one registration record
+
+    Args:
+        record: Mapping with username, email, password, names and phone number
+        taken: Result of ``find_registered`` to reuse; queried when omitted
+
+    Returns:
+        tuple: (cleaned record, errors) where errors maps field name to a
+        list of messages and is empty when the record is valid
+    """
+    cleaned, errors = dict(record), {}
+    for field, rule in REGISTRATION_RULES.items():
+        if field not in record:
+            continue
+        try:
+            cleaned[field] = rule(record[field])
+        except ValidationError as e:
+            errors[field] = e.messages
+
+    if taken is None:
+        taken = find_registered([record.get('username')], [record.get('email')])
+    taken_usernames, taken_emails = taken
+    if record.get('username') in taken_usernames:
+        errors.setdefault('username', []).append(ALREADY_REGISTERED)
+    if record.get('email') and record['email'].lower() in taken_emails:
+        errors.setdefault('email', []).append(ALREADY_REGISTERED)
+    return cleaned, errors
+
+
+def validate_registrations(records):
+    """
+    Validate many registration records at once (e.g. for an import)
+
+    Uniqueness is checked against the database with one query per chunk of
+    records and against the other records of the batch.
+
+    Returns:
+        list: (cleaned record, errors) for each record, in order
+    """
+    records = list(records)
+    taken = find_registered(
+        [r.get('username') for r in records], [r.get('email') for r in records]
+    )
+
+    results = []
+    seen_usernames, seen_emails = set(), set()
+    for record in records:
+        cleaned, errors = validate_registration(record, taken)
+        username = record.get('username')
+        email = (record.get('email') or '').lower()
+        if username and username in seen_usernames:
+            errors.setdefault('username', []).append('Duplicate username in this batch')
+        if email and email in seen_emails:
+            errors.setdefault('email', []).append('Duplicate email in this batch')
+        seen_usernames.add(username)
+        seen_emails.add(email)
+        results.append((cleaned, errors))
+    return results
@@ -1,5 +1,5 @@
 from rest_framework import viewsets, status, permissions
-from rest_framework.decorators import action, api_view, permission_classes
+from rest_framework.decorators import action, api_view, permission_classes, throttle_classes
 from rest_framework.response import Response
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from django.contrib.auth import authenticate, login, logout
@@ -9,14 +9,30 @@ from django.db.models import Count, Q
 from django.utils import timezone
 from django.views.decorators.csrf import ensure_csrf_cookie, csrf_exempt
 from django.utils.decorators import method_decorator
-from .models import Application, UserProfile
+from django.urls import reverse
+from .models import Application, ApplicationEvent, UserProfile, DocumentUpload
 from .serializers import (
-    ApplicationSerializer, ApplicationListSerializer,
+    ApplicationSerializer, ApplicationListSerializer, ApplicationEventSerializer, DocumentUploadSerializer,
     RegisterSerializer, LoginSerializer, UserSerializer, UserProfileSerializer
 )
+from . import cache
+from .fast_serializers import application_list, blog_list, news_list
+from .backends import ProfileModelBackend
+from .permissions import IsReviewer, IsStaffRole, STAFF_ROLES, user_role
+from .storage import document_storage
+from .tasks import pending_images
+from .throttles import LoginAccountThrottle, LoginIPThrottle
+from .uploads import DOCUMENT_FIELDS, UploadError, append_chunk, claim_uploads, release_uploads, discard_spool, reuse_existing_blob
 from .utils import generate_pdf, send_approval_email, send_rejection_email, send_application_received_email
-from .payment_service import PaystackService
 from decouple import config
+from django.conf import settings
+from immigration_portal.metrics import UPLOAD_SIZE
+from immigration_portal.pooled_postgresql import pool_stats
+from immigration_portal.replicas import use_primary
+import logging
+import os
+
+logger = logging.getLogger(__name__)
 
 # CSRF Token View
 @api_view(['GET'])
@@ -35,7 +51,8 @@ def register_view(request):
     if serializer.is_valid():
         try:
             user = serializer.save()
-            login(request, user)
+            # Not authenticated through a backend, so name the one to use
+            login(request, user, backend='applications.backends.ProfileModelBackend')
             return Response({
                 'success': True,
                 'user': UserSerializer(user).data,
@@ -70,6 +87,7 @@ def register_view(request):
 
 @api_view(['POST'])
 @permission_classes([AllowAny])
+@throttle_classes([LoginIPThrottle, LoginAccountThrottle])
 @ensure_csrf_cookie
 def login_view(request):
     """Login user"""
@@ -82,49 +100,32 @@ def login_view(request):
     if not password:
         return Response({'error': 'Password is required'}, status=status.HTTP_400_BAD_REQUEST)
     
-    # Try to find user by email or username
-    user_obj = None
-    try:
-        # First try to find by email
-        if '@' in username_or_email:
-            user_obj = User.objects.filter(email=username_or_email).first()
-            if user_obj:
-                username = user_obj.username
-            else:
-                # Try using email prefix as username
-                username = username_or_email.split('@')[0]
-        else:
-            username = username_or_email
-            user_obj = User.objects.filter(username=username).first()
-        
-        # Check if user exists
-        if not user_obj and not User.objects.filter(username=username).exists():
-            return Response({
-                'error': 'No account found with this email. Please register first.'
-            }, status=status.HTTP_404_NOT_FOUND)
-    except Exception:
-        username = username_or_email
-    
-    # Try to authenticate
-    user = authenticate(username=username, password=password)
+    # One query resolves the email/username and joins the profile
+    user = authenticate(request, username=username_or_email, password=password)
     
     if user:
-        if not user.is_active:
-            return Response({
-                'error': 'Your account has been deactivated. Please contact support.'
-            }, status=status.HTTP_403_FORBIDDEN)
-        
         login(request, user)
         return Response({
             'success': True,
             'user': UserSerializer(user).data,
             'profile': UserProfileSerializer(user.profile).data
         })
-    else:
-        # User exists but password is wrong
+    
+    # Failed logins only: work out why
+    user_obj = ProfileModelBackend().get_login_user(username_or_email)
+    if user_obj is None:
         return Response({
-            'error': 'Incorrect password. Please try again.'
-        }, status=status.HTTP_401_UNAUTHORIZED)
+            'error': 'No account found with this email. Please register first.'
+        }, status=status.HTTP_404_NOT_FOUND)
+    if not user_obj.is_active:
+        return Response({
+            'error': 'Your account has been deactivated. Please contact support.'
+        }, status=status.HTTP_403_FORBIDDEN)
+    
+    # User exists but password is wrong
+    return Response({
+        'error': 'Incorrect password. Please try again.'
+    }, status=status.HTTP_401_UNAUTHORIZED)
 
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
@@ -137,86 +138,22 @@ def logout_view(request):
 @permission_classes([IsAuthenticated])
 def current_user_view(request):
     """Get current user details"""
-    return Response({
-        'success': True,
-        'user': UserSerializer(request.user).data,
-        'profile': UserProfileSerializer(request.user.profile).data
-    })
-
-# Password Reset Views
-@api_view(['POST'])
-@permission_classes([AllowAny])
-def password_reset_request(request):
-    """Request password reset - send email with reset link"""
-    from django.core.mail import send_mail
-    from django.contrib.auth.tokens import default_token_generator
-    from django.utils.http import urlsafe_base64_encode
-    from django.utils.encoding import force_bytes
-    import logging
-    
-    logger = logging.getLogger(__name__)
-    
-    email = request.data.get('email')
-    if not email:
-        return Response({'error': 'Email is required'}, status=status.HTTP_400_BAD_REQUEST)
-    
-    try:
-        user = User.objects.get(email=email)
-    except User.DoesNotExist:
-        logger.warning(f"Password reset requested for non-existent email: {email}")
-        # For security, don't reveal if email exists or not
-        return Response({'success': True, 'message': 'If an account exists with this email, you will receive password reset instructions.'})
-    
-    # Generate token
-    token = default_token_generator.make_token(user)
-    uid = urlsafe_base64_encode(force_bytes(user.pk))
-    
-    # Create reset link
-    frontend_url = config('FRONTEND_URL', default='http://localhost:3000')
-    reset_link = f"{frontend_url}/reset-password?token={uid}-{token}"
-    
-    # Send email
-    try:
-        logger.info(f"Attempting to send password reset email to: {email}")
-        logger.info(f"Using EMAIL_HOST_USER: {config('EMAIL_HOST_USER', default='not-set')}")
-        
-        result = send_mail(
-            subject='Password Reset Request - South Sudan Immigration Portal',
-            message=f'''
-Hello {user.first_name},
-
-You have requested to reset your password for the South Sudan Immigration Portal.
-
-Click the link below to reset your password:
-{reset_link}
-
-This link will expire in 24 hours.
-
-If you did not request this password reset, please ignore this email.
-
-Best regards,
-South Sudan Immigration Portal Team
-            ''',
-            from_email=config('EMAIL_HOST_USER', default='noreply@immigration.gov.ss'),
-            recipient_list=[email],
-            fail_silently=False,
-        )
-        
-        logger.info(f"Email send result: {result}")
-        
-        if result == 0:
-            logger.error("Email failed to send (result = 0)")
-            return Response({'error': 'Failed to send email. Please contact support.'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
-            
-    except Exception as e:
-        logger.error(f"Error sending password reset email to {email}: {str(e)}")
-        logger.exception(e)
-        return Response({'error': f'Failed to send email: {str(e)}'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
-    
-    return Response({'success': True, 'message': 'Password reset instructions have been sent to your email.'})
+    user = request.user
+    data = cache.get_or_set(
+        'current_user',
+        lambda: {
+            'user': UserSerializer(user).data,
+            'profile': UserProfileSerializer(user.profile).data,
+        },
+        key_parts=[user.pk],
+        tags=[cache.user_tag(user.pk)],
+        timeout=600,
+    )
+    return Response({'success': True, **data})
 
 @api_view(['GET'])
 @permission_classes([AllowAny])
+@use_primary  # a GET that writes: its existence checks must see its own writes
 def create_default_admin_users(request):
     """
     Create default admin users - call this endpoint once after deployment
@@ -337,6 +274,7 @@ def create_default_admin_users(request):
             'error': str(e)
         }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+# Password Reset Views (the request step is in async_views.py)
 @api_view(['POST'])
 @permission_classes([AllowAny])
 def password_reset_confirm(request):
@@ -379,20 +317,38 @@ class ApplicationViewSet(viewsets.ModelViewSet):
     """Application CRUD operations"""
     serializer_class = ApplicationSerializer
     permission_classes = [IsAuthenticated]
+    # Statuses update_status may set; decisions have their own actions
+    UPDATABLE_STATUSES = ('in-progress', 'collected')
     
     def get_queryset(self):
         user = self.request.user
-        # Regular users see only their applications
-        if user.profile.role == 'applicant':
-            return Application.objects.filter(user=user)
+        # Both serializers nest the applicant; the detail one also the reviewer
+        queryset = Application.objects.select_related('user', 'reviewed_by')
         # Admin/Officer/Supervisor see all
-        return Application.objects.all()
+        if user_role(user) in STAFF_ROLES:
+            return queryset
+        # Regular users see only their applications
+        return queryset.filter(user=user)
+    
+    def get_object(self):
+        application = super().get_object()
+        # Changes made through the API are attributed to the requesting user
+        application.event_actor = self.request.user
+        return application
     
     def get_serializer_class(self):
         if self.action == 'list':
             return ApplicationListSerializer
         return ApplicationSerializer
     
+    def list(self, request, *args, **kwargs):
+        # Same JSON as ApplicationListSerializer, built from .values() rows
+        rows = application_list.values(self.filter_queryset(self.get_queryset()))
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(application_list.serialize(page, request))
+        return Response(application_list.serialize(rows, request))
+    
     def handle_exception(self, exc):
         """Custom exception handler for better error messages"""
         from rest_framework.exceptions import ValidationError as DRFValidationError
@@ -415,29 +371,25 @@ class ApplicationViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['get'])
     def my_applications(self, request):
         """Get current user's applications"""
-        applications = Application.objects.filter(user=request.user)
-        serializer = ApplicationListSerializer(applications, many=True)
-        return Response({'success': True, 'applications': serializer.data})
+        applications = application_list.values(Application.objects.filter(user=request.user))
+        return Response({'success': True, 'applications': application_list.serialize(applications)})
     
-    @action(detail=True, methods=['post'], permission_classes=[IsAuthenticated])
+    @action(detail=True, methods=['post'], permission_classes=[IsReviewer])
     def approve(self, request, pk=None):
         """Approve an application (Admin/Supervisor only)"""
-        import logging
-        logger = logging.getLogger(__name__)
-        
         try:
-            if request.user.profile.role not in ['admin', 'supervisor']:
-                return Response({'error': 'Permission denied'}, status=status.HTTP_403_FORBIDDEN)
-            
             application = self.get_object()
             
             if application.payment_status != 'completed':
                 return Response({'error': 'Payment not completed. Please verify payment first.'}, status=status.HTTP_400_BAD_REQUEST)
             
-            # Update application
-            application.status = 'approved'
-            application.reviewed_by = request.user
-            application.reviewed_at = timezone.now()
+            # Only the reviewer whose update lands generates the PDF and email
+            try:
+                won = application.transition('approved', reviewed_by=request.user, reviewed_at=timezone.now())
+            except ValidationError as e:
+                return Response({'error': e.messages[0]}, status=status.HTTP_400_BAD_REQUEST)
+            if not won:
+                return Response({'error': 'This application was updated by someone else. Reload it and try again.'}, status=status.HTTP_409_CONFLICT)
             
             # Generate PDF
             try:
@@ -471,26 +423,26 @@ class ApplicationViewSet(viewsets.ModelViewSet):
                 'error': f'Failed to approve application: {str(e)}'
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
     
-    @action(detail=True, methods=['post'], permission_classes=[IsAuthenticated])
+    @action(detail=True, methods=['post'], permission_classes=[IsReviewer])
     def reject(self, request, pk=None):
         """Reject an application (Admin/Supervisor only)"""
-        if request.user.profile.role not in ['admin', 'supervisor']:
-            return Response({'error': 'Permission denied'}, status=status.HTTP_403_FORBIDDEN)
-        
         application = self.get_object()
         reason = request.data.get('reason', '')
         
-        application.status = 'rejected'
-        application.rejection_reason = reason
-        application.reviewed_by = request.user
-        application.reviewed_at = timezone.now()
-        application.save()
+        try:
+            won = application.transition(
+                'rejected', rejection_reason=reason, reviewed_by=request.user, reviewed_at=timezone.now()
+            )
+        except ValidationError as e:
+            return Response({'error': e.messages[0]}, status=status.HTTP_400_BAD_REQUEST)
+        if not won:
+            return Response({'error': 'This application was updated by someone else. Reload it and try again.'}, status=status.HTTP_409_CONFLICT)
         
         # Send rejection email
         try:
             send_rejection_email(application)
         except Exception as email_error:
-            print(f"Failed to send rejection email: {email_error}")
+            logger.error(f"Failed to send rejection email for {application.confirmation_number}: {email_error}")
         
         return Response({
             'success': True,
@@ -498,34 +450,38 @@ class ApplicationViewSet(viewsets.ModelViewSet):
             'application': ApplicationSerializer(application).data
         })
     
-    @action(detail=True, methods=['patch'], permission_classes=[IsAuthenticated])
+    @action(detail=True, methods=['patch'], permission_classes=[IsStaffRole])
     def update_status(self, request, pk=None):
-        """Update application status (Admin/Officer/Supervisor)"""
-        if request.user.profile.role not in ['admin', 'officer', 'supervisor']:
-            return Response({'error': 'Permission denied'}, status=status.HTTP_403_FORBIDDEN)
-        
+        """
+        Update application status (Admin/Officer/Supervisor)
+
+        Only moves an application to in-progress or collected. Approval and
+        rejection go through ``approve`` and ``reject``, which check payment
+        and send the PDF and emails.
+        """
         application = self.get_object()
         new_status = request.data.get('status')
         
-        if new_status in dict(Application.STATUS_CHOICES):
-            application.status = new_status
-            application.reviewed_by = request.user
-            application.reviewed_at = timezone.now()
-            application.save()
-            
-            return Response({
-                'success': True,
-                'application': ApplicationSerializer(application).data
-            })
+        if new_status in ('approved', 'rejected'):
+            return Response({'error': 'Use Approve or Reject to decide an application'}, status=status.HTTP_400_BAD_REQUEST)
+        if new_status not in self.UPDATABLE_STATUSES:
+            return Response({'error': 'Invalid status'}, status=status.HTTP_400_BAD_REQUEST)
         
-        return Response({'error': 'Invalid status'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            won = application.transition(new_status, reviewed_by=request.user, reviewed_at=timezone.now())
+        except ValidationError as e:
+            return Response({'error': e.messages[0]}, status=status.HTTP_400_BAD_REQUEST)
+        if not won:
+            return Response({'error': 'This application was updated by someone else. Reload it and try again.'}, status=status.HTTP_409_CONFLICT)
+        
+        return Response({
+            'success': True,
+            'application': ApplicationSerializer(application).data
+        })
     
-    @action(detail=True, methods=['post'], permission_classes=[IsAuthenticated])
+    @action(detail=True, methods=['post'], permission_classes=[IsReviewer])
     def verify_payment(self, request, pk=None):
         """Verify payment (Admin/Supervisor only)"""
-        if request.user.profile.role not in ['admin', 'supervisor']:
-            return Response({'error': 'Permission denied'}, status=status.HTTP_403_FORBIDDEN)
-        
         application = self.get_object()
         
         if not application.payment_proof:
@@ -544,12 +500,9 @@ class ApplicationViewSet(viewsets.ModelViewSet):
             'application': ApplicationSerializer(application).data
         })
     
-    @action(detail=True, methods=['post'], permission_classes=[IsAuthenticated])
+    @action(detail=True, methods=['post'], permission_classes=[IsReviewer])
     def reject_payment(self, request, pk=None):
         """Reject payment (Admin/Supervisor only)"""
-        if request.user.profile.role not in ['admin', 'supervisor']:
-            return Response({'error': 'Permission denied'}, status=status.HTTP_403_FORBIDDEN)
-        
         application = self.get_object()
         reason = request.data.get('reason', '')
         
@@ -565,31 +518,67 @@ class ApplicationViewSet(viewsets.ModelViewSet):
             'message': 'Payment rejected',
             'application': ApplicationSerializer(application).data
         })
+    
+    @action(detail=True, methods=['get'])
+    def history(self, request, pk=None):
+        """Timeline of status, payment and document changes"""
+        application = self.get_object()
+        events = ApplicationEvent.objects.filter(application_id=application.pk).select_related('actor')
+        return Response(ApplicationEventSerializer(events, many=True).data)
 
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
 def submit_application(request):
     """Submit a new application"""
     try:
+        # Documents sent through the resumable upload API are referenced by token
+        try:
+            uploads, upload_files = claim_uploads(request.user, request.data)
+        except UploadError as e:
+            return Response({'error': e.message}, status=e.status_code)
+        
+        for field_name, uploaded in request.FILES.items():
+            # Field names come from the client; keep the label set bounded
+            label = field_name if field_name in DOCUMENT_FIELDS else 'other'
+            UPLOAD_SIZE.labels(label, 'multipart').observe(uploaded.size)
+        
         # Use the serializer to handle validation and creation
         serializer = ApplicationSerializer(data=request.data, context={'request': request})
         
         if serializer.is_valid():
-            application = serializer.save()
+            try:
+                with document_storage().atomic():
+                    application = serializer.save(**upload_files)
+            except Exception:
+                release_uploads(uploads, upload_files)
+                raise
+            release_uploads(uploads, upload_files, application)
             
             # Send application received email
             try:
                 send_application_received_email(application)
             except Exception as email_error:
-                print(f"Failed to send email: {email_error}")
+                logger.error(f"Failed to send application received email for {application.confirmation_number}: {email_error}")
                 # Don't fail the application submission if email fails
             
+            # Photo and signature may already have been normalized (always
+            # when INGEST_ASYNC is off); images still being processed are
+            # listed in 'processing' without URLs, as their files are replaced
+            application.refresh_from_db()
+            data = ApplicationSerializer(application).data
+            processing = pending_images(application)
+            for field_name in processing:
+                data[field_name] = None
+                data[f'{field_name}_srcset'] = None
+            
             return Response({
                 'success': True,
                 'message': 'Application submitted successfully',
-                'application': ApplicationSerializer(application).data
+                'application': data,
+                'processing': processing,
             }, status=status.HTTP_201_CREATED)
         else:
+            release_uploads(uploads, upload_files)
             # Return validation errors
             return Response({
                 'error': 'Validation failed',
@@ -601,149 +590,114 @@ def submit_application(request):
             'error': f'Failed to submit application: {str(e)}'
         }, status=status.HTTP_400_BAD_REQUEST)
 
-@api_view(['GET'])
+# Resumable Upload Views
+def _upload_response(upload, status_code=status.HTTP_200_OK):
+    """Upload status with tus-style offset headers"""
+    response = Response({
+        'success': True,
+        'upload': DocumentUploadSerializer(upload).data
+    }, status=status_code)
+    response['Upload-Offset'] = str(upload.offset)
+    response['Upload-Length'] = str(upload.size)
+    response['Cache-Control'] = 'no-store'
+    return response
+
+@api_view(['POST'])
 @permission_classes([IsAuthenticated])
-def statistics_view(request):
-    """Get application statistics (Admin only)"""
-    if request.user.profile.role not in ['admin', 'officer', 'supervisor']:
-        return Response({'error': 'Permission denied'}, status=status.HTTP_403_FORBIDDEN)
-    
-    total = Application.objects.count()
-    by_status = Application.objects.values('status').annotate(count=Count('id'))
-    by_type = Application.objects.values('application_type').annotate(count=Count('id'))
-    
-    stats = {
-        'total': total,
-        'by_status': {item['status']: item['count'] for item in by_status},
-        'by_type': {item['application_type']: item['count'] for item in by_type}
-    }
+def create_upload(request):
+    """
+    Start a resumable document upload
+    POST /api/uploads/ {field, filename, size, content_type, sha256}
+    When sha256 matches a document this user already stored, the upload is
+    returned as completed and no bytes need to be sent.
+    """
+    serializer = DocumentUploadSerializer(data=request.data)
+    if not serializer.is_valid():
+        return Response({
+            'error': 'Validation failed',
+            'details': serializer.errors
+        }, status=status.HTTP_400_BAD_REQUEST)
     
-    return Response({'success': True, 'statistics': stats})
+    upload = serializer.save(user=request.user)
+    # Known document: nothing needs to be sent, the upload is already complete
+    reuse_existing_blob(upload)
+    response = _upload_response(upload, status.HTTP_201_CREATED)
+    response['Location'] = reverse('upload-detail', args=[upload.token])
+    return response
 
-# Payment Views
-@api_view(['POST'])
+@api_view(['GET', 'HEAD', 'PATCH', 'DELETE'])
 @permission_classes([IsAuthenticated])
-def initialize_payment(request):
-    """Initialize Paystack payment for an application"""
+def upload_detail(request, token):
+    """
+    Resume, continue or cancel a resumable upload
+    HEAD/GET returns the acknowledged offset, PATCH appends the request body at
+    the Upload-Offset header, DELETE cancels an upload that was not attached.
+    """
     try:
-        application_id = request.data.get('application_id')
-        
-        if not application_id:
-            return Response({
-                'error': 'Application ID is required'
-            }, status=status.HTTP_400_BAD_REQUEST)
-        
-        # Get the application
+        upload = DocumentUpload.objects.get(token=token, user=request.user)
+    except DocumentUpload.DoesNotExist:
+        return Response({'error': 'Upload not found'}, status=status.HTTP_404_NOT_FOUND)
+    
+    if request.method == 'PATCH':
         try:
-            application = Application.objects.get(id=application_id, user=request.user)
-        except Application.DoesNotExist:
-            return Response({
-                'error': 'Application not found'
-            }, status=status.HTTP_404_NOT_FOUND)
-        
-        # Check if payment is already completed
-        if application.payment_status == 'completed':
-            return Response({
-                'error': 'Payment already completed for this application'
-            }, status=status.HTTP_400_BAD_REQUEST)
+            offset = int(request.META.get('HTTP_UPLOAD_OFFSET', ''))
+            length = int(request.META.get('CONTENT_LENGTH') or 0)
+        except ValueError:
+            return Response({'error': 'Upload-Offset header is required'}, status=status.HTTP_400_BAD_REQUEST)
         
-        # Determine payment amount based on application type
-        amount_map = {
-            'passport-first': 50000,  # 500 SSP or NGN
-            'passport-replacement': 30000,  # 300 SSP or NGN
-            'nationalid-first': 20000,  # 200 SSP or NGN
-            'nationalid-replacement': 15000,  # 150 SSP or NGN
+        try:
+            append_chunk(upload, offset, request.stream, length)
+        except UploadError as e:
+            response = Response({'error': e.message}, status=e.status_code)
+            response['Upload-Offset'] = str(upload.offset)
+            return response
+    
+    elif request.method == 'DELETE':
+        if upload.application_id:
+            return Response({'error': 'Upload is already attached to an application'}, status=status.HTTP_409_CONFLICT)
+        discard_spool(upload)
+        upload.delete()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+    
+    return _upload_response(upload)
+
+@api_view(['GET'])
+@permission_classes([IsStaffRole])
+def statistics_view(request):
+    """Get application statistics (Admin only)"""
+    def compute():
+        total = Application.objects.count()
+        by_status = Application.objects.values('status').annotate(count=Count('id'))
+        by_type = Application.objects.values('application_type').annotate(count=Count('id'))
+        return {
+            'total': total,
+            'by_status': {item['status']: item['count'] for item in by_status},
+            'by_type': {item['application_type']: item['count'] for item in by_type}
         }
-        
-        amount = amount_map.get(application.application_type, 50000)
-        
-        # Generate unique reference
-        reference = f"PAY-{application.confirmation_number}-{int(timezone.now().timestamp())}"
-        
-        # Initialize payment with Paystack
-        paystack = PaystackService()
-        callback_url = request.data.get('callback_url', 'http://localhost:5173/payment/verify')
-        
-        result = paystack.initialize_transaction(
-            email=application.email,
-            amount=amount,
-            reference=reference,
-            callback_url=callback_url
-        )
-        
-        if result.get('status'):
-            # Update application with payment reference
-            application.payment_reference = reference
-            application.payment_amount = amount / 100  # Convert from kobo
-            application.payment_method = 'credit_card'
-            application.save()
-            
-            return Response({
-                'success': True,
-                'authorization_url': result['data']['authorization_url'],
-                'access_code': result['data']['access_code'],
-                'reference': reference
-            })
-        else:
-            return Response({
-                'error': result.get('message', 'Payment initialization failed')
-            }, status=status.HTTP_400_BAD_REQUEST)
     
-    except Exception as e:
-        return Response({
-            'error': f'Payment initialization failed: {str(e)}'
-        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+    stats = cache.get_or_set('statistics', compute, tags=[cache.STATISTICS_TAG], timeout=300)
+    return Response({'success': True, 'statistics': stats})
 
 
 @api_view(['GET'])
-@permission_classes([IsAuthenticated])
-def verify_payment(request):
-    """Verify Paystack payment"""
-    try:
-        reference = request.query_params.get('reference')
-        
-        if not reference:
-            return Response({
-                'error': 'Payment reference is required'
-            }, status=status.HTTP_400_BAD_REQUEST)
-        
-        # Verify payment with Paystack
-        paystack = PaystackService()
-        result = paystack.verify_transaction(reference)
-        
-        if result.get('status') and result.get('data', {}).get('status') == 'success':
-            # Find the application
-            try:
-                application = Application.objects.get(payment_reference=reference)
-            except Application.DoesNotExist:
-                return Response({
-                    'error': 'Application not found for this payment'
-                }, status=status.HTTP_404_NOT_FOUND)
-            
-            # Update application payment status
-            application.payment_status = 'completed'
-            application.payment_date = timezone.now()
-            application.payment_verified_at = timezone.now()
-            application.save()
-            
-            return Response({
-                'success': True,
-                'message': 'Payment verified successfully',
-                'application': ApplicationSerializer(application).data
-            })
-        else:
-            return Response({
-                'success': False,
-                'message': 'Payment verification failed',
-                'details': result.get('message', 'Unknown error')
-            }, status=status.HTTP_400_BAD_REQUEST)
-    
-    except Exception as e:
-        return Response({
-            'error': f'Payment verification failed: {str(e)}'
-        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+@permission_classes([IsStaffRole])
+def database_pool_view(request):
+    """Connection pool stats of the worker process that served the request (Admin only)"""
+    return Response({
+        'success': True,
+        'mode': settings.DATABASE_POOL,
+        'pools': pool_stats(),
+        'pid': os.getpid(),
+    })
 
 
+@api_view(['GET'])
+@permission_classes([IsStaffRole])
+def cache_stats_view(request):
+    """Cache hit/miss counters of the worker process that served the request (Admin only)"""
+    return Response({'success': True, 'cache': cache.stats(), 'pid': os.getpid()})
+
+# Payment Views (initialize/verify are in async_views.py)
 @api_view(['GET'])
 @permission_classes([AllowAny])
 def get_paystack_public_key(request):
@@ -770,6 +724,16 @@ class NewsArticleViewSet(viewsets.ReadOnlyModelViewSet):
         if featured == 'true':
             queryset = queryset.filter(featured=True)
         return queryset
+    
+    def list(self, request, *args, **kwargs):
+        data = cache.get_or_set(
+            'news_list',
+            lambda: news_list.serialize(news_list.values(self.get_queryset()), request),
+            # Image URLs are absolute, so they depend on the host
+            key_parts=[request.build_absolute_uri('/'), request.query_params.get('featured')],
+            tags=[cache.NEWS_TAG],
+        )
+        return Response(data)
 
 
 class BlogPostViewSet(viewsets.ReadOnlyModelViewSet):
@@ -789,10 +753,24 @@ class BlogPostViewSet(viewsets.ReadOnlyModelViewSet):
         if category:
             queryset = queryset.filter(category=category)
         return queryset
+    
+    def list(self, request, *args, **kwargs):
+        data = cache.get_or_set(
+            'blog_list',
+            lambda: blog_list.serialize(blog_list.values(self.get_queryset()), request),
+            key_parts=[
+                request.build_absolute_uri('/'),
+                request.query_params.get('featured'),
+                request.query_params.get('category'),
+            ],
+            tags=[cache.BLOG_TAG],
+        )
+        return Response(data)
 
 
 @api_view(['GET'])
 @permission_classes([AllowAny])
+@use_primary  # a GET that writes: its existence checks must see its own writes
 def create_sample_content(request):
     """
     Create sample content for News, Blog, and Gallery
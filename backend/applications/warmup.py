@@ -0,0 +1,96 @@
+"""
+Worker warm-up
+
+Heavy modules are imported lazily so that starting the app stays cheap, but
+the first request a fresh worker serves should not pay for them either.
+``warm_up()`` is called from gunicorn's ``post_fork`` hook (see
+gunicorn.conf.py), before the worker accepts connections.
+"""
+import importlib
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+# Modules deferred at import time that requests will need sooner or later
+WARM_IMPORTS = [
+    'PIL.Image',
+    'PIL.ImageOps',
+    'reportlab.pdfgen.canvas',
+    'applications.payment_service',
+    'aiosmtplib',
+]
+
+
+def _timed(timings, name, func):
+    start = time.perf_counter()
+    try:
+        func()
+    except Exception as e:
+        logger.warning(f"Warm-up step {name} failed: {e}")
+    timings[name] = (time.perf_counter() - start) * 1000
+
+
+def _import_modules():
+    for module in WARM_IMPORTS:
+        importlib.import_module(module)
+
+
+def _load_urls():
+    from django.urls import get_resolver
+
+    # Imports every view module and builds the reverse lookup tables
+    get_resolver().reverse_dict
+
+
+def _connect_databases():
+    """
+    Check every database answers, then close the connection
+
+    Connections belong to the thread that opened them, and requests run in
+    other threads, so a connection left open here would never be used. With
+    DATABASE_POOL=internal closing returns it to the worker's pool, where the
+    first request picks it up; otherwise this only fails fast on a bad
+    database configuration.
+    """
+    from django.db import connections
+
+    for alias in connections:
+        try:
+            with connections[alias].cursor() as cursor:
+                cursor.execute('SELECT 1')
+        finally:
+            connections[alias].close()
+
+
+def _touch_caches():
+    from django.core.cache import caches
+
+    for alias in caches:
+        caches[alias].get('warm-up')
+
+
+def _prime_validators():
+    from . import validators
+
+    validators.validate_first_name('Warm')
+    validators.validate_phone_number('+211912345678')
+    validators.validate_password_strength('Warm-up1')
+    validators.validate_email_address('warm-up@example.com')
+
+
+def warm_up():
+    """
+    Load everything the first request would otherwise load
+
+    Returns:
+        dict: milliseconds spent per step
+    """
+    timings = {}
+    _timed(timings, 'imports', _import_modules)
+    _timed(timings, 'urls', _load_urls)
+    _timed(timings, 'databases', _connect_databases)
+    _timed(timings, 'caches', _touch_caches)
+    _timed(timings, 'validators', _prime_validators)
+    logger.info('Worker warm-up: ' + ', '.join(f'{name} {ms:.1f} ms' for name, ms in timings.items()))
+    return timings
@@ -0,0 +1,36 @@
+"""
+Gunicorn configuration (read automatically from the working directory)
+Run with: gunicorn immigration_portal.asgi:application
+"""
+import os
+import shutil
+import tempfile
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+worker_class = 'uvicorn_worker.UvicornWorker'
+workers = int(os.environ.get('WEB_CONCURRENCY', 2))
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 60))
+
+# Import Django and the app once in the master; workers are forked with it
+# already loaded. Connections are opened per worker in post_fork.
+preload_app = True
+
+# Prometheus metrics: every worker writes to files here and /metrics sums
+# them. Cleared when the config is loaded, before the app is preloaded,
+# because samples left over from a previous run would be added to this one.
+os.environ.setdefault('PROMETHEUS_MULTIPROC_DIR', os.path.join(tempfile.gettempdir(), 'immigration-portal-metrics'))
+shutil.rmtree(os.environ['PROMETHEUS_MULTIPROC_DIR'], ignore_errors=True)
+os.makedirs(os.environ['PROMETHEUS_MULTIPROC_DIR'], exist_ok=True)
+
+
+def post_fork(server, worker):
+    from applications.warmup import warm_up
+
+    timings = warm_up()
+    server.log.info(f"Worker {worker.pid} warmed up in {sum(timings.values()):.0f} ms")
+
+
+def child_exit(server, worker):
+    from prometheus_client import multiprocess
+
+    multiprocess.mark_process_dead(worker.pid)
@@ -2,4 +2,26 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'immigration_portal.settings')
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+
+async def lifespan(receive, send):
+    """Startup and shutdown of the server's event loop (Django only handles HTTP)"""
+    from applications import payment_service
+
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            # Outbound HTTP clients live as long as the loop and are closed with it
+            payment_service.share_async_client()
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            await payment_service.aclose_async_client()
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+
+async def application(scope, receive, send):
+    if scope['type'] == 'lifespan':
+        return await lifespan(receive, send)
+    return await django_application(scope, receive, send)
@@ -0,0 +1,146 @@
+"""
+Logging setup
+
+Request threads only put records on an in-memory queue (``QueueLogHandler``);
+a listener thread formats them and writes them to stdout. A slow or blocked
+stdout therefore never stalls a request. When the queue is full, records are
+dropped and counted rather than waited on.
+
+Output is one JSON object per line (``LOG_FORMAT=json``) or plain text for
+development. Before anything is written, secrets and personal data are
+masked: values of sensitive keys in ``extra`` data, bearer tokens, Paystack
+keys, email addresses and phone numbers in messages.
+"""
+import atexit
+import json
+import logging
+import os
+import queue
+import re
+import sys
+from logging.handlers import QueueHandler, QueueListener
+
+REDACTED = '[REDACTED]'
+
+# Keys whose values are never logged (matched case-insensitively, as substrings)
+SENSITIVE_KEYS = ('password', 'secret', 'token', 'authorization', 'api_key', 'cookie', 'session', 'signature', 'card', 'cvv')
+
+# (pattern, replacement) applied to every message
+REDACTIONS = [
+    (re.compile(r'(?i)\bbearer\s+[A-Za-z0-9._~+/=-]+'), f'Bearer {REDACTED}'),
+    (re.compile(r'\b(sk|pk)_(live|test)_[A-Za-z0-9]+'), REDACTED),
+    (re.compile(r'''(?i)(['"]?(?:password|secret|token|api_key)['"]?\s*[:=]\s*)(['"]?)[^'",\s}]+'''), rf'\1\2{REDACTED}'),
+    # Keep the first character and the domain of email addresses
+    (re.compile(r'\b([A-Za-z0-9])[A-Za-z0-9._%+-]*@([A-Za-z0-9.-]+\.[A-Za-z]{2,})\b'), r'\1***@\2'),
+    # Keep the last three digits of phone numbers
+    (re.compile(r'(?<![\w-])\+?\d[\d \-]{6,}(\d{3})\b'), r'***\1'),
+]
+
+# Attributes every LogRecord has; anything else was passed with ``extra=``
+_RECORD_ATTRS = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+
+def redact_text(text):
+    for pattern, replacement in REDACTIONS:
+        text = pattern.sub(replacement, text)
+    return text
+
+
+def redact_value(value, key=''):
+    if key and any(sensitive in key.lower() for sensitive in SENSITIVE_KEYS):
+        return REDACTED
+    if isinstance(value, dict):
+        return {k: redact_value(v, str(k)) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [redact_value(v) for v in value]
+    if isinstance(value, str):
+        return redact_text(value)
+    return value
+
+
+class RedactingFilter(logging.Filter):
+    """Masks secrets and personal data in the message and extra fields"""
+
+    def filter(self, record):
+        record.msg = redact_text(record.getMessage())
+        record.args = None
+        if record.exc_text:
+            record.exc_text = redact_text(record.exc_text)
+        for key in set(vars(record)) - _RECORD_ATTRS:
+            setattr(record, key, redact_value(getattr(record, key), key))
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record, including ``extra`` fields"""
+
+    def format(self, record):
+        data = {
+            'time': f"{self.formatTime(record, '%Y-%m-%dT%H:%M:%S')}.{int(record.msecs):03d}",
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            'process': record.process,
+        }
+        for key in set(vars(record)) - _RECORD_ATTRS:
+            data[key] = getattr(record, key)
+        if record.exc_text:
+            data['exception'] = record.exc_text
+        return json.dumps(data, default=str)
+
+
+class QueueLogHandler(QueueHandler):
+    """
+    Hands records to a listener thread that writes them to stdout
+
+    Used from settings.LOGGING. Each process gets its own queue and listener;
+    a forked gunicorn worker starts fresh ones (threads do not survive fork).
+    """
+
+    def __init__(self, json_format=True, max_queue_size=10000):
+        super().__init__(queue.Queue(max_queue_size))
+        self.json_format = json_format
+        self.max_queue_size = max_queue_size
+        self.dropped = 0
+        self._listener = None
+        self._start()
+        os.register_at_fork(after_in_child=self._restart)
+        atexit.register(self._stop)
+
+    def _output_handler(self):
+        handler = logging.StreamHandler(sys.stdout)
+        handler.setFormatter(JsonFormatter() if self.json_format else logging.Formatter(
+            '%(asctime)s %(levelname)s %(name)s: %(message)s'
+        ))
+        handler.addFilter(RedactingFilter())
+        return handler
+
+    def _start(self):
+        self._listener = QueueListener(self.queue, self._output_handler(), respect_handler_level=True)
+        self._listener.start()
+
+    def _restart(self):
+        # Records the parent had not written yet belong to the parent
+        self.queue = queue.Queue(self.max_queue_size)
+        self._start()
+
+    def _stop(self):
+        if self._listener is not None:
+            self._listener.stop()
+            self._listener = None
+
+    def prepare(self, record):
+        # Only what is needed to format the record later, on the listener thread
+        record = logging.makeLogRecord(vars(record))
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
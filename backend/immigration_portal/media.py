@@ -0,0 +1,272 @@
+"""
+Media file delivery
+
+Replaces ``django.views.static.serve`` for ``/media/``. Depending on
+``MEDIA_DELIVERY`` the file is either handed off to the front server
+(``X-Accel-Redirect`` for nginx, ``X-Sendfile`` for Apache/lighttpd) so no
+Python worker is held while bytes are sent, or streamed with a
+``FileResponse`` that supports single byte ranges. Under WSGI the file object
+goes to the server's ``file_wrapper``, which can use ``sendfile``. Django's
+ASGI handler would read a plain file response into memory before sending it,
+so under ASGI the file is read in chunks in a worker thread and sent as they
+arrive; the front-server offloads remain the cheapest option there. Responses
+carry strong ETags and long-lived cache headers; conditional requests are
+answered with 304.
+
+Application documents (``MEDIA_SIGNED_PREFIXES``) are only served through
+HMAC-signed URLs that expire. Signatures are checked without touching the
+database, and a signed response may be cached by browsers and proxies until
+the URL expires.
+"""
+import math
+import mimetypes
+import os
+import posixpath
+import re
+import time
+from email.utils import formatdate
+from urllib.parse import quote
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.core.handlers.asgi import ASGIRequest
+from django.http import FileResponse, Http404, HttpResponse, HttpResponseNotAllowed
+from django.utils._os import safe_join
+from django.utils.crypto import constant_time_compare, salted_hmac
+from django.utils.http import parse_etags
+
+# Content-addressed documents never change, so they can be cached forever
+IMMUTABLE_PATTERN = re.compile(r'^documents/sha256/[0-9a-f]{2}/[0-9a-f]{2}/(?P<digest>[0-9a-f]{64})\.')
+
+RANGE_PATTERN = re.compile(r'^bytes=(?P<start>\d*)-(?P<end>\d*)$')
+
+ONE_YEAR = 365 * 24 * 60 * 60
+
+SIGNING_SALT = 'immigration_portal.media'
+
+# Bytes read per worker-thread hop when streaming under ASGI
+ASYNC_CHUNK_SIZE = 256 * 1024
+
+
+class RangeFile:
+    """Read-only view of ``length`` bytes of a file starting at ``start``"""
+
+    def __init__(self, file, start, length):
+        self.file = file
+        self.remaining = length
+        file.seek(start)
+
+    def read(self, size=-1):
+        if self.remaining <= 0:
+            return b''
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def close(self):
+        self.file.close()
+
+
+async def _read_chunks(file, chunk_size=ASYNC_CHUNK_SIZE):
+    """Chunks of ``file``, read without blocking the event loop"""
+    read = sync_to_async(file.read, thread_sensitive=False)
+    try:
+        while chunk := await read(chunk_size):
+            yield chunk
+    finally:
+        file.close()
+
+
+def _stream(request, file, **kwargs):
+    """FileResponse sending ``file``, as an async iterator under ASGI"""
+    if not isinstance(request, ASGIRequest):
+        # A real file object lets the WSGI server's file_wrapper use sendfile
+        return FileResponse(file, **kwargs)
+    response = FileResponse(_read_chunks(file), **kwargs)
+    # Closes the file if the client goes away before streaming starts
+    response._resource_closers.append(file.close)
+    return response
+
+
+def media_signature(path, expires):
+    """HMAC-SHA256 of a media path and its expiry, keyed by SECRET_KEY"""
+    return salted_hmac(SIGNING_SALT, f'{path}:{expires}', algorithm='sha256').hexdigest()[:32]
+
+
+def is_protected(path):
+    """True for media that may only be fetched through a signed URL"""
+    return path.startswith(tuple(settings.MEDIA_SIGNED_PREFIXES))
+
+
+def sign_media_path(path, now=None):
+    """
+    Signed MEDIA_URL for a storage name
+
+    The expiry is rounded up to MEDIA_SIGNED_URL_BUCKET so the same document
+    gets the same URL for a while, which keeps browser and proxy caches warm.
+    """
+    now = now or time.time()
+    bucket = settings.MEDIA_SIGNED_URL_BUCKET
+    expires = int(math.ceil((now + settings.MEDIA_SIGNED_URL_TTL) / bucket) * bucket)
+    return f"{settings.MEDIA_URL}{quote(path)}?e={expires}&s={media_signature(path, expires)}"
+
+
+def signed_url(name, storage):
+    """URL of a stored file, signed when it is a protected local media file"""
+    url = storage.url(name)
+    if url.startswith(settings.MEDIA_URL) and is_protected(name):
+        return sign_media_path(name)
+    return url
+
+
+def _check_signature(request, path):
+    """
+    Validate the signature of a protected media request
+
+    Returns:
+        int: seconds until the URL expires, or None if it is missing/invalid
+    """
+    try:
+        expires = int(request.GET.get('e', ''))
+    except ValueError:
+        return None
+    remaining = expires - int(time.time())
+    if remaining <= 0:
+        return None
+    if not constant_time_compare(request.GET.get('s', ''), media_signature(path, expires)):
+        return None
+    return remaining
+
+
+def _etag(path, stat):
+    match = IMMUTABLE_PATTERN.match(path)
+    if match:
+        return f'"{match.group("digest")}"'
+    return f'"{stat.st_size:x}-{stat.st_mtime_ns:x}"'
+
+
+def _cache_control(path, lifetime=None):
+    if is_protected(path):
+        if lifetime is None:
+            return 'private, no-cache'
+        # A signed URL is only good until it expires
+        return f'public, max-age={lifetime}'
+    if IMMUTABLE_PATTERN.match(path):
+        return f'public, max-age={ONE_YEAR}, immutable'
+    return f'public, max-age={settings.MEDIA_CACHE_MAX_AGE}'
+
+
+def _add_cors_headers(response):
+    response['Access-Control-Allow-Origin'] = '*'
+    response['Access-Control-Allow-Methods'] = 'GET, OPTIONS'
+    response['Access-Control-Allow-Headers'] = 'Content-Type, Range'
+    response['Access-Control-Expose-Headers'] = 'Accept-Ranges, Content-Length, Content-Range, ETag'
+    response['Cross-Origin-Resource-Policy'] = 'cross-origin'
+    return response
+
+
+def _parse_range(header, size):
+    """
+    Parse a single-range ``Range`` header
+
+    Returns:
+        (start, end) inclusive, None to serve the whole file (absent, malformed
+        or multi-range header), or False when the range cannot be satisfied.
+    """
+    match = RANGE_PATTERN.match(header.strip()) if header else None
+    if not match:
+        return None
+    start, end = match.group('start'), match.group('end')
+    if not start and not end:
+        return None
+    if not start:
+        # Suffix range: the last N bytes
+        length = int(end)
+        if length == 0:
+            return False
+        return max(size - length, 0), size - 1
+    start = int(start)
+    end = min(int(end), size - 1) if end else size - 1
+    if start >= size or end < start:
+        return False
+    return start, end
+
+
+def serve_media(request, path):
+    """Serve a file from MEDIA_ROOT"""
+    if request.method == 'OPTIONS':
+        return _add_cors_headers(HttpResponse())
+    if request.method not in ('GET', 'HEAD'):
+        return HttpResponseNotAllowed(['GET', 'HEAD', 'OPTIONS'])
+
+    path = posixpath.normpath(path).lstrip('/')
+    lifetime = None
+    if is_protected(path):
+        lifetime = _check_signature(request, path)
+        # Staff browsing the Django admin get plain links; fall back to the session
+        if lifetime is None and not request.user.is_staff:
+            return HttpResponse('Invalid or expired link', status=403, content_type='text/plain')
+
+    try:
+        fullpath = safe_join(settings.MEDIA_ROOT, path)
+        stat = os.stat(fullpath)
+    except (OSError, ValueError, SuspiciousFileOperation):
+        raise Http404('File not found')
+    if not os.path.isfile(fullpath):
+        raise Http404('File not found')
+
+    etag = _etag(path, stat)
+    content_type, encoding = mimetypes.guess_type(fullpath)
+    content_type = content_type or 'application/octet-stream'
+
+    if etag in parse_etags(request.META.get('HTTP_IF_NONE_MATCH', '')):
+        response = HttpResponse(status=304)
+    elif settings.MEDIA_DELIVERY == 'x-accel-redirect':
+        response = HttpResponse(content_type=content_type)
+        response['X-Accel-Redirect'] = settings.MEDIA_ACCEL_REDIRECT_PREFIX.rstrip('/') + '/' + path
+    elif settings.MEDIA_DELIVERY == 'x-sendfile':
+        response = HttpResponse(content_type=content_type)
+        response['X-Sendfile'] = fullpath
+    else:
+        response = _file_response(request, fullpath, stat.st_size, etag, content_type)
+
+    response['ETag'] = etag
+    response['Last-Modified'] = formatdate(stat.st_mtime, usegmt=True)
+    response['Cache-Control'] = _cache_control(path, lifetime)
+    response['Accept-Ranges'] = 'bytes'
+    if encoding:
+        response['Content-Encoding'] = encoding
+    return _add_cors_headers(response)
+
+
+def _file_response(request, fullpath, size, etag, content_type):
+    """Stream a file, honouring a single byte range"""
+    byte_range = None
+    if_range = request.META.get('HTTP_IF_RANGE')
+    if not if_range or if_range == etag:
+        byte_range = _parse_range(request.META.get('HTTP_RANGE'), size)
+
+    if byte_range is False:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{size}'
+        return response
+
+    if request.method == 'HEAD':
+        response = HttpResponse(content_type=content_type)
+        response['Content-Length'] = size
+        return response
+
+    if byte_range is None:
+        response = _stream(request, open(fullpath, 'rb'), content_type=content_type)
+        response['Content-Length'] = size
+        return response
+
+    start, end = byte_range
+    length = end - start + 1
+    response = _stream(request, RangeFile(open(fullpath, 'rb'), start, length), status=206, content_type=content_type)
+    response['Content-Length'] = length
+    response['Content-Range'] = f'bytes {start}-{end}/{size}'
+    return response
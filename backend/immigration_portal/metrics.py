@@ -0,0 +1,120 @@
+"""
+Prometheus metrics
+
+Served at ``/metrics``. Under gunicorn every worker writes its samples to
+files in ``PROMETHEUS_MULTIPROC_DIR`` (set up in gunicorn.conf.py), and the
+endpoint adds up all workers, so the numbers are the same whichever worker
+answers the scrape. Without that variable (runserver, management commands)
+metrics are kept in the process.
+
+Request latency is labelled by view: the function name for function views
+(``submit_application``, ``verify_payment``) and ``ViewSet.action`` for
+viewset routes (``ApplicationViewSet.approve``).
+"""
+import os
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.http import Http404, HttpResponse
+from django.utils.crypto import constant_time_compare
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Histogram, generate_latest, multiprocess,
+)
+
+REQUEST_LATENCY = Histogram(
+    'http_request_duration_seconds', 'Time to produce a response, by view',
+    ['view', 'method'],
+)
+REQUESTS = Counter(
+    'http_requests_total', 'Responses by view and status code',
+    ['view', 'method', 'status'],
+)
+PAYSTACK_LATENCY = Histogram(
+    'paystack_request_duration_seconds', 'Paystack API call latency',
+    ['operation'],
+)
+PAYSTACK_ERRORS = Counter(
+    'paystack_errors_total', 'Paystack API calls that failed or returned an HTTP error',
+    ['operation'],
+)
+PDF_DURATION = Histogram(
+    'pdf_generation_duration_seconds', 'Time to render an approval PDF',
+)
+EMAIL_DURATION = Histogram(
+    'email_send_duration_seconds', 'Time to hand an email to the mail server',
+    ['kind'],
+)
+EMAILS = Counter(
+    'emails_total', 'Emails by kind and outcome (sent/failed)',
+    ['kind', 'outcome'],
+)
+UPLOAD_SIZE = Histogram(
+    'upload_size_bytes', 'Size of uploaded application documents',
+    ['field', 'source'],
+    buckets=[10_000, 50_000, 100_000, 250_000, 500_000, 1_000_000, 2_500_000, 5_000_000, 10_000_000, 25_000_000, 50_000_000],
+)
+
+
+def view_name(request):
+    """Metric label for the view that handled ``request``"""
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return 'unmatched'
+    func = match.func
+    cls = getattr(func, 'cls', None)
+    actions = getattr(func, 'actions', None)
+    if cls is not None and actions:
+        return f"{cls.__name__}.{actions.get(request.method.lower(), request.method.lower())}"
+    if cls is not None:
+        # @api_view names its generated class after the function
+        return cls.__name__
+    return getattr(func, '__name__', match.view_name)
+
+
+class MetricsMiddleware:
+    """Records the latency and status of every request"""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        start = time.perf_counter()
+        response = self.get_response(request)
+        self._record(request, response, time.perf_counter() - start)
+        return response
+
+    async def __acall__(self, request):
+        start = time.perf_counter()
+        response = await self.get_response(request)
+        self._record(request, response, time.perf_counter() - start)
+        return response
+
+    def _record(self, request, response, seconds):
+        view = view_name(request)
+        REQUEST_LATENCY.labels(view, request.method).observe(seconds)
+        REQUESTS.labels(view, request.method, response.status_code).inc()
+
+
+def metrics_view(request):
+    """Prometheus text exposition of all workers' metrics"""
+    token = settings.METRICS_TOKEN
+    if token:
+        if not constant_time_compare(request.headers.get('Authorization', ''), f'Bearer {token}'):
+            return HttpResponse('Unauthorized', status=401, content_type='text/plain')
+    elif not settings.DEBUG:
+        raise Http404
+
+    if 'PROMETHEUS_MULTIPROC_DIR' in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return HttpResponse(generate_latest(registry), content_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,15 @@
+"""
+PostgreSQL backend with a per-process connection pool
+
+Enable with ``DATABASE_POOL=internal`` (see settings.py). Django opens and
+closes a connection around every request when CONN_MAX_AGE is 0; this
+backend hands the connection back to a bounded pool instead of closing it,
+so a worker keeps at most ``DATABASE_POOL_SIZE`` connections open (plus
+``DATABASE_POOL_MAX_OVERFLOW`` during bursts) however many threads it runs,
+and requests wait up to ``DATABASE_POOL_TIMEOUT`` seconds for one to free up
+rather than opening more. The worst case against Postgres ``max_connections``
+is workers x (size + overflow).
+"""
+from .pool import PoolTimeout, pool_stats
+
+__all__ = ['PoolTimeout', 'pool_stats']
@@ -0,0 +1,56 @@
+"""
+Django database backend: the stock PostgreSQL backend with pooled connections
+"""
+from django.db.backends.postgresql.base import DatabaseWrapper as PostgresDatabaseWrapper
+from django.db.backends.postgresql.base import Database
+from psycopg2 import extensions
+
+from .pool import PoolTimeout, get_pool
+
+POOL_DEFAULTS = {
+    'size': 5,
+    'max_overflow': 5,
+    'timeout': 10.0,
+    'recycle': 300.0,
+}
+
+
+class DatabaseWrapper(PostgresDatabaseWrapper):
+    """
+    Takes connections from the process pool and returns them on close
+
+    Pool options come from ``DATABASES[alias]['POOL']``.
+    """
+
+    @property
+    def pool(self):
+        options = {**POOL_DEFAULTS, **self.settings_dict.get('POOL', {})}
+        return get_pool(self.alias, options)
+
+    def get_new_connection(self, conn_params):
+        try:
+            return self.pool.acquire(lambda: super(DatabaseWrapper, self).get_new_connection(conn_params))
+        except PoolTimeout as e:
+            raise Database.OperationalError(str(e)) from e
+
+    def _close(self):
+        if self.connection is None:
+            return
+        with self.wrap_database_errors:
+            self.pool.release(self.connection, reusable=self._reset_for_pool(self.connection))
+
+    def _reset_for_pool(self, connection):
+        """Leave the connection as a new one would be, or report it unusable"""
+        if connection.closed:
+            return False
+        status = connection.get_transaction_status()
+        if status == extensions.TRANSACTION_STATUS_UNKNOWN:
+            return False
+        if status != extensions.TRANSACTION_STATUS_IDLE:
+            try:
+                connection.rollback()
+            except Database.Error:
+                return False
+        if not connection.autocommit:
+            connection.autocommit = True
+        return True
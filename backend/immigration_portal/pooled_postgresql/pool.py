@@ -0,0 +1,195 @@
+"""
+Bounded connection pool
+
+Driver-agnostic: connections are opened by a callable supplied on checkout
+and only need ``close()``. The backend decides whether a returned connection
+can be reused.
+"""
+import logging
+import os
+import threading
+import time
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+# Checkouts that wait longer than this are logged
+SLOW_WAIT_SECONDS = 0.1
+
+
+class PoolTimeout(Exception):
+    """No connection became available within the pool timeout"""
+
+
+class ConnectionPool:
+    """
+    Up to ``size`` connections kept open, ``max_overflow`` more opened under
+    load and closed again when returned
+
+    Idle connections are reused most-recently-returned first, so the rest age
+    out after ``recycle`` seconds when traffic drops.
+    """
+
+    def __init__(self, size=5, max_overflow=5, timeout=10.0, recycle=300.0):
+        self.size = size
+        self.max_overflow = max_overflow
+        self.timeout = timeout
+        self.recycle = recycle
+        self._condition = threading.Condition()
+        self._idle = deque()  # (connection, returned at)
+        self._open = 0
+        self._in_use = 0
+        self._waiting = 0
+        self._counters = {
+            'checkouts': 0,
+            'connections_created': 0,
+            'connections_closed': 0,
+            'waits': 0,
+            'wait_seconds_total': 0.0,
+            'wait_seconds_max': 0.0,
+            'timeouts': 0,
+        }
+
+    def acquire(self, connect):
+        """
+        Check out a connection, opening one with ``connect()`` if allowed
+
+        Raises:
+            PoolTimeout: if none is free within ``timeout`` seconds
+        """
+        start = time.monotonic()
+        deadline = start + self.timeout
+        waited = False
+        stale = []
+        try:
+            with self._condition:
+                while True:
+                    connection = self._take_idle(stale)
+                    if connection is not None:
+                        self._checked_out(start, waited)
+                        return connection
+                    if self._open < self.size + self.max_overflow:
+                        # Reserve the slot; the connection is opened outside the lock
+                        self._open += 1
+                        self._checked_out(start, waited)
+                        break
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._counters['timeouts'] += 1
+                        raise PoolTimeout(
+                            f"No database connection available after {self.timeout:g}s "
+                            f"({self._in_use} in use, pool size {self.size} + overflow {self.max_overflow})"
+                        )
+                    waited = True
+                    self._waiting += 1
+                    try:
+                        self._condition.wait(remaining)
+                    finally:
+                        self._waiting -= 1
+        finally:
+            for connection in stale:
+                self._close(connection)
+
+        try:
+            connection = connect()
+        except Exception:
+            with self._condition:
+                self._open -= 1
+                self._in_use -= 1
+                self._condition.notify()
+            raise
+        with self._condition:
+            self._counters['connections_created'] += 1
+        return connection
+
+    def release(self, connection, reusable=True):
+        """Return a checked-out connection; it is closed if not reusable or surplus"""
+        with self._condition:
+            self._in_use -= 1
+            # Surplus connections are closed unless someone is waiting for one
+            keep = reusable and (self._open <= self.size or self._waiting > 0)
+            if keep:
+                self._idle.append((connection, time.monotonic()))
+            else:
+                self._open -= 1
+            self._condition.notify()
+        if not keep:
+            self._close(connection)
+
+    def close_idle(self):
+        """Close every idle connection (e.g. before the process exits)"""
+        with self._condition:
+            idle = [connection for connection, _ in self._idle]
+            self._idle.clear()
+            self._open -= len(idle)
+            self._condition.notify_all()
+        for connection in idle:
+            self._close(connection)
+
+    def stats(self):
+        with self._condition:
+            return {
+                'size': self.size,
+                'max_overflow': self.max_overflow,
+                'open': self._open,
+                'in_use': self._in_use,
+                'idle': len(self._idle),
+                'overflow': max(0, self._open - self.size),
+                'waiting': self._waiting,
+                **self._counters,
+            }
+
+    def _take_idle(self, stale):
+        now = time.monotonic()
+        while self._idle:
+            connection, returned_at = self._idle.pop()
+            if getattr(connection, 'closed', False) or now - returned_at > self.recycle:
+                self._open -= 1
+                stale.append(connection)
+                continue
+            return connection
+        return None
+
+    def _checked_out(self, start, waited):
+        self._in_use += 1
+        self._counters['checkouts'] += 1
+        if waited:
+            wait = time.monotonic() - start
+            self._counters['waits'] += 1
+            self._counters['wait_seconds_total'] += wait
+            self._counters['wait_seconds_max'] = max(self._counters['wait_seconds_max'], wait)
+            if wait > SLOW_WAIT_SECONDS:
+                logger.warning(f"Waited {wait * 1000:.0f} ms for a database connection ({self._in_use} in use)")
+
+    def _close(self, connection):
+        with self._condition:
+            self._counters['connections_closed'] += 1
+        try:
+            connection.close()
+        except Exception as e:
+            logger.debug(f"Error closing pooled connection: {e}")
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+_pid = os.getpid()
+
+
+def get_pool(alias, options):
+    """Process-wide pool for a database alias (a forked worker starts with none)"""
+    global _pid
+    with _pools_lock:
+        if os.getpid() != _pid:
+            # Connections inherited from the parent must not be shared
+            _pools.clear()
+            _pid = os.getpid()
+        if alias not in _pools:
+            _pools[alias] = ConnectionPool(**options)
+        return _pools[alias]
+
+
+def pool_stats():
+    """Stats of every pool in this process, by database alias"""
+    with _pools_lock:
+        pools = dict(_pools)
+    return {alias: pool.stats() for alias, pool in pools.items()}
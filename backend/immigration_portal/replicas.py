@@ -0,0 +1,109 @@
+"""
+Read-replica routing
+
+When ``DATABASE_REPLICA_URL`` is set, reads made while serving a GET or HEAD
+request go to the ``replica`` database; everything else (writes, reads in
+POST/PUT/PATCH/DELETE requests, management commands, background tasks) uses
+``default``.
+
+A client that has just written is pinned to the primary for
+``REPLICA_STICKY_SECONDS`` with a short-lived cookie, so it reads its own
+writes (e.g. ``my_applications`` right after ``submit_application``) even
+while the replica lags behind.
+"""
+import asyncio
+import functools
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import connections
+from django.utils.deprecation import MiddlewareMixin
+
+DEFAULT_DB = 'default'
+REPLICA_DB = 'replica'
+
+STICKY_COOKIE = 'use_primary'
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+_read_from_replica = ContextVar('read_from_replica', default=False)
+
+
+def replica_configured():
+    return REPLICA_DB in connections.databases
+
+
+@contextmanager
+def primary():
+    """Send every read in the block to the primary"""
+    token = _read_from_replica.set(False)
+    try:
+        yield
+    finally:
+        _read_from_replica.reset(token)
+
+
+def use_primary(view):
+    """Decorator for safe-method views that read data they are about to write"""
+    if asyncio.iscoroutinefunction(view):
+        @functools.wraps(view)
+        async def async_wrapper(*args, **kwargs):
+            with primary():
+                return await view(*args, **kwargs)
+        return async_wrapper
+
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        with primary():
+            return view(*args, **kwargs)
+    return wrapper
+
+
+class ReplicaRouter:
+    """Database router for the default/replica pair"""
+
+    def db_for_read(self, model, **hints):
+        if not _read_from_replica.get() or not replica_configured():
+            return DEFAULT_DB
+        # Related objects are read from wherever their instance came from
+        instance = hints.get('instance')
+        if instance is not None and instance._state.db:
+            return instance._state.db
+        return REPLICA_DB
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB, REPLICA_DB}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db != REPLICA_DB
+
+
+class ReplicaStickinessMiddleware(MiddlewareMixin):
+    """Chooses the database for a request's reads and pins writers to the primary"""
+
+    def process_request(self, request):
+        # Set on every request: WSGI threads reuse their context
+        _read_from_replica.set(
+            request.method in SAFE_METHODS
+            and STICKY_COOKIE not in request.COOKIES
+            and replica_configured()
+        )
+
+    def process_response(self, request, response):
+        _read_from_replica.set(False)
+        if request.method not in SAFE_METHODS and response.status_code < 400 and replica_configured():
+            response.set_cookie(
+                STICKY_COOKIE, '1',
+                max_age=settings.REPLICA_STICKY_SECONDS,
+                httponly=True,
+                secure=settings.SESSION_COOKIE_SECURE,
+                samesite=settings.SESSION_COOKIE_SAMESITE,
+            )
+        return response
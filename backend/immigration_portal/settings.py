@@ -1,4 +1,5 @@
 import os
+import tempfile
 from pathlib import Path
 from decouple import config
 
@@ -24,10 +25,12 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'immigration_portal.metrics.MetricsMiddleware',
+    'immigration_portal.timing.ServerTimingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',  # Add WhiteNoise for static files
     'corsheaders.middleware.CorsMiddleware',
-    'immigration_portal.middleware.CorsMediaMiddleware',
+    'immigration_portal.replicas.ReplicaStickinessMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -58,16 +61,71 @@ WSGI_APPLICATION = 'immigration_portal.wsgi.application'
 
 import dj_database_url
 
+# Seconds a connection is kept for reuse. Under ASGI every request runs its
+# sync code in a new thread, and a persistent connection stays open with that
+# thread, so the default closes connections at the end of each request; use
+# DATABASE_POOL below to reuse them. Only raise this under a WSGI server.
+CONN_MAX_AGE = config('CONN_MAX_AGE', default=0, cast=int)
+
 # Database configuration
 # Use DATABASE_URL if available (for Render/Heroku), otherwise use individual settings
 DATABASES = {
     'default': dj_database_url.config(
         default=f"postgresql://{config('DB_USER', default='postgres')}:{config('DB_PASSWORD', default='postgres')}@{config('DB_HOST', default='localhost')}:{config('DB_PORT', default='5432')}/{config('DB_NAME', default='immigration_db')}",
-        conn_max_age=600,
-        conn_health_checks=True,
+        conn_max_age=CONN_MAX_AGE,
+        conn_health_checks=CONN_MAX_AGE > 0,
     )
 }
 
+# Optional read replica: GET/HEAD requests read from it (see
+# immigration_portal/replicas.py). Point it at the primary's URL to try the
+# routing locally with two aliases.
+DATABASE_REPLICA_URL = config('DATABASE_REPLICA_URL', default='')
+if DATABASE_REPLICA_URL:
+    DATABASES['replica'] = dj_database_url.parse(
+        DATABASE_REPLICA_URL,
+        conn_max_age=CONN_MAX_AGE,
+        conn_health_checks=CONN_MAX_AGE > 0,
+    )
+    DATABASES['replica']['TEST'] = {'MIRROR': 'default'}
+
+DATABASE_ROUTERS = ['immigration_portal.replicas.ReplicaRouter']
+
+# Seconds a client reads from the primary after writing (replication lag margin)
+REPLICA_STICKY_SECONDS = config('REPLICA_STICKY_SECONDS', default=15, cast=int)
+
+# Connection pooling: 'internal' keeps a bounded pool per worker process
+# (immigration_portal/pooled_postgresql), 'pgbouncer' is for a DATABASE_URL
+# that points at PgBouncer in transaction mode. Either way the most
+# connections a deployment can open is workers x (size + overflow).
+DATABASE_POOL = config('DATABASE_POOL', default='off')
+for database in DATABASES.values():
+    if DATABASE_POOL == 'internal' and 'postgresql' in database['ENGINE']:
+        database.update({
+            'ENGINE': 'immigration_portal.pooled_postgresql',
+            # Connections go back to the pool at the end of each request
+            'CONN_MAX_AGE': 0,
+            'CONN_HEALTH_CHECKS': False,
+            'POOL': {
+                'size': config('DATABASE_POOL_SIZE', default=5, cast=int),
+                'max_overflow': config('DATABASE_POOL_MAX_OVERFLOW', default=5, cast=int),
+                'timeout': config('DATABASE_POOL_TIMEOUT', default=10.0, cast=float),
+                'recycle': config('DATABASE_POOL_RECYCLE', default=300.0, cast=float),
+            },
+        })
+    elif DATABASE_POOL == 'pgbouncer':
+        # Named cursors do not survive PgBouncer handing the server connection
+        # to another client between transactions
+        database['DISABLE_SERVER_SIDE_CURSORS'] = True
+
+# Loads request.user with its profile in one query. ModelBackend stays listed
+# because sessions created before the switch name it as their backend, and
+# Django logs those users out if it is missing.
+AUTHENTICATION_BACKENDS = [
+    'applications.backends.ProfileModelBackend',
+    'django.contrib.auth.backends.ModelBackend',
+]
+
 AUTH_PASSWORD_VALIDATORS = [
     {'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator'},
     {'NAME': 'django.contrib.auth.password_validation.MinimumLengthValidator'},
@@ -97,8 +155,70 @@ else:
     MEDIA_URL = '/media/'
     MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# How /media/ files are sent: 'django' streams them (range requests; sendfile
+# under WSGI, chunked reads in a thread under ASGI), 'x-accel-redirect' (nginx)
+# or 'x-sendfile' (Apache) offload to the front server
+MEDIA_DELIVERY = config('MEDIA_DELIVERY', default='django')
+MEDIA_ACCEL_REDIRECT_PREFIX = config('MEDIA_ACCEL_REDIRECT_PREFIX', default='/protected-media/')
+MEDIA_CACHE_MAX_AGE = config('MEDIA_CACHE_MAX_AGE', default=86400, cast=int)
+
+# Application documents are only served through signed, expiring URLs
+MEDIA_SIGNED_PREFIXES = ['documents/', 'payment_proofs/', 'approved_pdfs/']
+MEDIA_SIGNED_URL_TTL = config('MEDIA_SIGNED_URL_TTL', default=14400, cast=int)
+MEDIA_SIGNED_URL_BUCKET = config('MEDIA_SIGNED_URL_BUCKET', default=3600, cast=int)
+
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# Shared cache: login throttling counters and the shared tier of
+# applications/cache.py. The file-based default is shared by the workers of
+# one machine; use django.core.cache.backends.redis.RedisCache with a
+# redis:// CACHE_LOCATION when running on several.
+CACHES = {
+    'default': {
+        'BACKEND': config('CACHE_BACKEND', default='django.core.cache.backends.filebased.FileBasedCache'),
+        'LOCATION': config('CACHE_LOCATION', default=os.path.join(tempfile.gettempdir(), 'immigration-portal-cache')),
+        # Bump to retire every cached entry at once
+        'VERSION': config('CACHE_VERSION', default=1, cast=int),
+    }
+}
+
+# Logging: records are queued and written by a background thread as JSON
+# lines (LOG_FORMAT=text for development), with secrets and personal data
+# masked (immigration_portal/logs.py). LOG_LEVELS sets per-logger levels,
+# e.g. "applications.payment_service=DEBUG,django.db.backends=DEBUG".
+LOG_LEVEL = config('LOG_LEVEL', default='INFO')
+LOG_LEVELS = dict(
+    item.split('=', 1) for item in config('LOG_LEVELS', default='').split(',') if '=' in item
+)
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'queue': {
+            '()': 'immigration_portal.logs.QueueLogHandler',
+            'json_format': config('LOG_FORMAT', default='json') == 'json',
+        },
+    },
+    'root': {'handlers': ['queue'], 'level': LOG_LEVEL},
+    'loggers': {
+        # Replaces Django's console handlers so nothing is written twice
+        'django': {'handlers': ['queue'], 'level': 'INFO', 'propagate': False},
+        'django.server': {'handlers': ['queue'], 'level': 'INFO', 'propagate': False},
+        **{name.strip(): {'level': level.strip().upper()} for name, level in LOG_LEVELS.items()},
+    },
+}
+
+# Share of requests that get a Server-Timing header and a timing log line
+# (immigration_portal/timing.py)
+SERVER_TIMING_SAMPLE_RATE = config('SERVER_TIMING_SAMPLE_RATE', default=0.1, cast=float)
+
+# Bearer token required to scrape /metrics (without one it is only served with DEBUG)
+METRICS_TOKEN = config('METRICS_TOKEN', default='')
+
+# Per-process LRU in front of the shared cache (applications/cache.py)
+CACHE_LOCAL_MAX_ENTRIES = config('CACHE_LOCAL_MAX_ENTRIES', default=1000, cast=int)
+CACHE_LOCAL_TIMEOUT = config('CACHE_LOCAL_TIMEOUT', default=5, cast=int)
+
 CORS_ALLOWED_ORIGINS = [
     'http://localhost:3000',
     'http://127.0.0.1:3000',
@@ -120,8 +240,10 @@ CORS_ALLOW_HEADERS = [
     'user-agent',
     'x-csrftoken',
     'x-requested-with',
+    'upload-length',
+    'upload-offset',
 ]
-CORS_EXPOSE_HEADERS = ['Content-Type', 'X-CSRFToken']
+CORS_EXPOSE_HEADERS = ['Content-Type', 'X-CSRFToken', 'Location', 'Upload-Length', 'Upload-Offset']
 
 # CSRF Settings
 CSRF_TRUSTED_ORIGINS = [
@@ -137,12 +259,12 @@ CSRF_TRUSTED_ORIGINS = [
 ]
 CSRF_COOKIE_HTTPONLY = False
 CSRF_COOKIE_SAMESITE = 'None'
-CSRF_COOKIE_SECURE = True
+CSRF_COOKIE_SECURE = config('CSRF_COOKIE_SECURE', default=True, cast=bool)
 CSRF_COOKIE_NAME = 'csrftoken'
 
 # Session cookie settings for cross-origin
 SESSION_COOKIE_SAMESITE = 'None'
-SESSION_COOKIE_SECURE = True
+SESSION_COOKIE_SECURE = config('SESSION_COOKIE_SECURE', default=True, cast=bool)
 
 # Disable CSRF for DRF views (we're using session auth with CORS)
 from rest_framework.authentication import SessionAuthentication
@@ -160,9 +282,20 @@ REST_FRAMEWORK = {
     ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 20,
+    'EXCEPTION_HANDLER': 'applications.exceptions.api_exception_handler',
+    # Brute-force protection on login and password reset (see applications/throttles.py)
+    'DEFAULT_THROTTLE_RATES': {
+        'login_ip': config('THROTTLE_LOGIN_IP', default='30/min'),
+        'login_account': config('THROTTLE_LOGIN_ACCOUNT', default='10/min'),
+        'password_reset_ip': config('THROTTLE_PASSWORD_RESET_IP', default='10/hour'),
+        'password_reset_account': config('THROTTLE_PASSWORD_RESET_ACCOUNT', default='3/hour'),
+    },
+    # Proxies in front of the app (Render adds one); the client IP is taken
+    # from X-Forwarded-For accordingly so it cannot be spoofed
+    'NUM_PROXIES': config('NUM_PROXIES', default=1, cast=int),
 }
 
-EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
+EMAIL_BACKEND = config('EMAIL_BACKEND', default='django.core.mail.backends.smtp.EmailBackend')
 EMAIL_HOST = config('EMAIL_HOST', default='smtp.gmail.com')
 EMAIL_PORT = config('EMAIL_PORT', default=587, cast=int)
 EMAIL_USE_TLS = True
@@ -172,3 +305,12 @@ DEFAULT_FROM_EMAIL = config('DEFAULT_FROM_EMAIL', default='junubanimation@gmail.
 
 FILE_UPLOAD_MAX_MEMORY_SIZE = 5242880
 DATA_UPLOAD_MAX_MEMORY_SIZE = 5242880
+
+# Resumable document uploads (spooled to local disk, attached by token)
+UPLOAD_SPOOL_DIR = config('UPLOAD_SPOOL_DIR', default=os.path.join(tempfile.gettempdir(), 'immigration_uploads'))
+RESUMABLE_UPLOAD_MAX_SIZE = config('RESUMABLE_UPLOAD_MAX_SIZE', default=20971520, cast=int)
+RESUMABLE_UPLOAD_EXPIRY_HOURS = config('RESUMABLE_UPLOAD_EXPIRY_HOURS', default=24, cast=int)
+
+# Background ingest of applicant photos/signatures (normalize + renditions)
+INGEST_ASYNC = config('INGEST_ASYNC', default=True, cast=bool)
+INGEST_WORKERS = config('INGEST_WORKERS', default=2, cast=int)
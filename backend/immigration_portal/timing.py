@@ -0,0 +1,157 @@
+"""
+Per-request timing breakdown
+
+``ServerTimingMiddleware`` samples a share of requests
+(``SERVER_TIMING_SAMPLE_RATE``). For those it adds up the time spent in SQL,
+in serializers, in outbound HTTP to Paystack and in SMTP. The totals are
+returned in a ``Server-Timing`` header (shown in the browser's network
+panel) and written as one log line per request.
+
+Code measures a section with ``with timed('paystack'):``. Outside a sampled
+request that costs one context variable lookup. Timings are kept in a
+context variable, so they follow a request into ``sync_to_async`` threads
+and async views.
+
+SQL is measured by an execute wrapper that every database connection gets
+when it is opened. It records nothing unless the current request is sampled.
+"""
+import logging
+import random
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+logger = logging.getLogger(__name__)
+
+# Metric name -> Server-Timing description
+METRICS = {
+    'db': 'SQL',
+    'serialize': 'Serializers',
+    'paystack': 'Paystack API',
+    'smtp': 'Email',
+}
+
+_current = ContextVar('request_timings', default=None)
+
+
+class RequestTimings:
+    """Accumulated seconds and call counts per metric for one request"""
+
+    def __init__(self):
+        self.totals = {}
+        self.counts = {}
+        self.active = set()
+        self._lock = threading.Lock()
+
+    def add(self, name, seconds):
+        with self._lock:
+            self.totals[name] = self.totals.get(name, 0.0) + seconds
+            self.counts[name] = self.counts.get(name, 0) + 1
+
+
+@contextmanager
+def timed(name):
+    """Add the time spent in the block to metric ``name`` of the current request"""
+    timings = _current.get()
+    # Nested sections of the same metric (e.g. nested serializers) count once
+    if timings is None or name in timings.active:
+        yield
+        return
+    timings.active.add(name)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.active.discard(name)
+        timings.add(name, time.perf_counter() - start)
+
+
+def _execute_wrapper(execute, sql, params, many, context):
+    timings = _current.get()
+    if timings is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timings.add('db', time.perf_counter() - start)
+
+
+def _install(connection):
+    # Pooled and persistent connections reconnect on the same wrapper object
+    if _execute_wrapper not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_execute_wrapper)
+
+
+@receiver(connection_created)
+def install_execute_wrapper(sender, connection, **kwargs):
+    _install(connection)
+
+
+class ServerTimingMiddleware:
+    """Adds a Server-Timing header and a timing log line to sampled requests"""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        # Connections opened before this module was imported
+        for connection in connections.all(initialized_only=True):
+            _install(connection)
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not self._sampled():
+            return self.get_response(request)
+        timings = RequestTimings()
+        token = _current.set(timings)
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self._finish(request, response, timings, time.perf_counter() - start)
+
+    async def __acall__(self, request):
+        if not self._sampled():
+            return await self.get_response(request)
+        timings = RequestTimings()
+        token = _current.set(timings)
+        start = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self._finish(request, response, timings, time.perf_counter() - start)
+
+    def _sampled(self):
+        rate = settings.SERVER_TIMING_SAMPLE_RATE
+        return rate >= 1 or (rate > 0 and random.random() < rate)
+
+    def _finish(self, request, response, timings, total):
+        entries = []
+        for name, description in METRICS.items():
+            if name in timings.totals:
+                count = timings.counts[name]
+                entries.append(f'{name};dur={timings.totals[name] * 1000:.1f};desc="{description} ({count})"')
+        entries.append(f'total;dur={total * 1000:.1f}')
+        response['Server-Timing'] = ', '.join(entries)
+
+        fields = {'method': request.method, 'path': request.path, 'status': response.status_code,
+                  'total_ms': round(total * 1000, 1)}
+        for name, seconds in timings.totals.items():
+            fields[f'{name}_ms'] = round(seconds * 1000, 1)
+            fields[f'{name}_count'] = timings.counts[name]
+        logger.info(' '.join(f'{key}={value}' for key, value in fields.items()), extra={'timing': fields})
+        return response